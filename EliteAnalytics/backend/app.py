@@ -1,5 +1,5 @@
 from fastapi import FastAPI, Depends, HTTPException
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
@@ -7,7 +7,9 @@ from sqlalchemy import func
 import math
 import os
 
-from EliteAnalytics.backend.database import get_session, Match, Team, Player, Event
+from EliteAnalytics.backend.database import get_session, Match, Team, Player, Event, Possession
+from EliteAnalytics.backend.assets import ensure_asset, srcset_manifest
+from EliteAnalytics.backend import series, pressing, per90
 
 app = FastAPI(title="Elite Barca Analytics API")
 
@@ -21,6 +23,15 @@ app.add_middleware(
 
 _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 PROJECT_ROOT = os.path.dirname(_ROOT)
+
+# Registered ahead of the /assets mount so missing maps are rendered on first request
+@app.get("/assets/{subdir}/{filename}")
+def get_asset(subdir: str, filename: str):
+    path = ensure_asset(subdir, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    return FileResponse(path)
+
 app.mount("/static", StaticFiles(directory=os.path.join(_ROOT, "frontend", "static")), name="static")
 app.mount("/assets", StaticFiles(directory=os.path.join(PROJECT_ROOT, "assets")), name="assets")
 
@@ -75,11 +86,8 @@ def get_match_stats(match_id: int, db: Session = Depends(get_db)):
     af_passes = db.query(func.count(Event.id)).filter(Event.match_id==match_id, Event.team_id==aid, Event.type_name=="Pass", Event.x > 66.6).scalar() or 0
     total_f_passes = hf_passes + af_passes or 1
 
-    # PPDA
-    # Home PPDA = Away Passes in Home's Def 60% / Home Def Actions
-    # Def actions = Tackle, Interception, Foul, Challenge
-    h_def_actions = db.query(func.count(Event.id)).filter(Event.match_id==match_id, Event.team_id==hid, Event.type_name.in_(["Tackle", "Interception", "Foul", "Challenge"])).scalar() or 1
-    a_def_actions = db.query(func.count(Event.id)).filter(Event.match_id==match_id, Event.team_id==aid, Event.type_name.in_(["Tackle", "Interception", "Foul", "Challenge"])).scalar() or 1
+    # PPDA, high turnovers and counter-press regains, stored at ingest
+    press = pressing.load(db, match_id) or pressing.rebuild(db, match_id)
     
     return {
         "home_team": match.home_team.name,
@@ -91,8 +99,10 @@ def get_match_stats(match_id: int, db: Session = Depends(get_db)):
         "away_possession": round((away_passes / total_passes)*100, 1),
         "home_field_tilt": round((hf_passes / total_f_passes)*100, 1),
         "away_field_tilt": round((af_passes / total_f_passes)*100, 1),
-        "home_ppda": round(away_passes / h_def_actions, 1),
-        "away_ppda": round(home_passes / a_def_actions, 1),
+        "home_ppda": press[hid]["ppda"],
+        "away_ppda": press[aid]["ppda"],
+        "home_pressing": press[hid],
+        "away_pressing": press[aid],
     }
 
 @app.get("/api/matches/{match_id}/events")
@@ -121,30 +131,69 @@ def get_match_events(match_id: int, db: Session = Depends(get_db)):
         })
     return res
 
+@app.get("/api/matches/{match_id}/possessions")
+def get_match_possessions(match_id: int, team: str = None, ends_in_shot: bool = None, min_passes: int = 0,
+                          db: Session = Depends(get_db)):
+    """ Possession chains of a match, e.g. ?ends_in_shot=true&min_passes=5 for build-ups ending in a shot """
+    query = db.query(Possession).filter(Possession.match_id == match_id)
+    if team:
+        query = query.join(Team, Possession.team_id == Team.id).filter(Team.name == team)
+    if ends_in_shot is not None:
+        query = query.filter(Possession.ends_in_shot == ends_in_shot)
+    if min_passes:
+        query = query.filter(Possession.passes >= min_passes)
+    res = []
+    for p in query.order_by(Possession.chain_id).all():
+        res.append({
+            "chain_id": p.chain_id,
+            "team": p.team.name if p.team else None,
+            "period": p.period,
+            "minute": p.start_minute,
+            "second": p.start_second,
+            "duration": p.duration,
+            "passes": p.passes,
+            "completed_passes": p.completed_passes,
+            "vertical_progress": p.vertical_progress,
+            "xt_gained": p.xt_gained,
+            "shots": p.shots,
+            "xg": p.xg,
+            "ends_in_shot": p.ends_in_shot,
+            "ends_in_goal": p.ends_in_goal,
+            "start_type": p.start_type,
+            "end_type": p.end_type,
+            "from_set_piece": p.from_set_piece
+        })
+    return res
+
+@app.get("/api/matches/{match_id}/assets")
+def get_match_assets(match_id: int):
+    """ Returns srcset strings per rendered image so the dashboard can pick format and density """
+    return srcset_manifest(match_id)
+
+def _match_series(db, match_id):
+    data = series.load(db, match_id)
+    if data is None:
+        if db.query(Match).filter(Match.id == match_id).first() is None:
+            raise HTTPException(status_code=404, detail="Match not found")
+        # Ingested before series existed: compute once and keep
+        series.rebuild(db, match_id)
+        data = series.load(db, match_id)
+    return data
+
+def _check_smoothing(smoothing):
+    if smoothing is not None and smoothing not in series.SMOOTHING:
+        raise HTTPException(status_code=400, detail=f"smoothing must be one of {', '.join(series.SMOOTHING)}")
+
 @app.get("/api/matches/{match_id}/momentum")
-def get_match_momentum(match_id: int, db: Session = Depends(get_db)):
-    """ Returns cumulative xT and xG per minute for danger level graph """
-    events = db.query(Event).filter(Event.match_id == match_id, Event.minute <= 100).order_by(Event.minute).all()
-    
-    home_id = db.query(Match).filter(Match.id == match_id).first().home_team_id
-    
-    minutes = list(range(0, 100))
-    home_danger = [0.0] * 100
-    away_danger = [0.0] * 100
-    
-    for e in events:
-        min_idx = e.minute if e.minute < 100 else 99
-        val = (e.xg or 0) * 5 + (e.xt or 0) # Rough danger formula
-        if e.team_id == home_id:
-            home_danger[min_idx] += val
-        else:
-            away_danger[min_idx] += val
-            
-    return {
-        "minutes": minutes,
-        "home_danger": home_danger,
-        "away_danger": away_danger
-    }
+def get_match_momentum(match_id: int, smoothing: str = None, span: int = 5, db: Session = Depends(get_db)):
+    """ Per-minute danger (xG * 5 + xT), field tilt and game state from the stored series; smoothing=ewm|rolling over `span` minutes """
+    _check_smoothing(smoothing)
+    return series.momentum(_match_series(db, match_id), smoothing, max(span, 1))
+
+@app.get("/api/matches/{match_id}/xg-flow")
+def get_match_xg_flow(match_id: int, db: Session = Depends(get_db)):
+    """ Cumulative xG per minute and goal minutes for each side """
+    return series.xg_flow(_match_series(db, match_id))
 
 @app.get("/api/matches/{match_id}/pass-network")
 def get_pass_network(match_id: int, team: str = None, progressive_only: bool = False, db: Session = Depends(get_db)):
@@ -239,29 +288,33 @@ def get_zonal_dominance(match_id: int, db: Session = Depends(get_db)):
     return dominance
 
 @app.get("/api/season/leaderboard")
-def get_season_leaderboard(db: Session = Depends(get_db)):
-    """ Aggregate season stats across all matches """
-    from sqlalchemy import func, Integer
-    stats = db.query(
-        Player.name,
-        Team.name.label("team_name"),
-        func.sum(Event.xg).label("total_xg"),
-        func.sum(Event.xt).label("total_xt"),
-        func.sum(func.cast(Event.is_progressive_pass, Integer)).label("prog_passes")
-    ).join(Player, Event.player_id == Player.id)\
-     .join(Team, Player.team_id == Team.id)\
-     .group_by(Player.id)\
-     .having(func.sum(Event.xt) > 0)\
-     .order_by(func.sum(Event.xt).desc())\
-     .limit(100).all()
-     
-    res = []
-    for s in stats:
-        res.append({
-            "player": s.name,
-            "team": s.team_name,
-            "xg": round(s.total_xg or 0, 2),
-            "xt": round(s.total_xt or 0, 3),
-            "prog_passes": s.prog_passes or 0
-        })
-    return res
+def get_season_leaderboard(min_minutes: int = per90.MIN_MINUTES, sort: str = "xt_p90", team: str = None, db: Session = Depends(get_db)):
+    """ Season totals and per-90 rates per player (grouped sum over player_matches), ranked by `sort` """
+    team_id = None
+    if team:
+        team_row = db.query(Team).filter(func.lower(Team.name) == team.lower()).first()
+        if not team_row:
+            raise HTTPException(status_code=404, detail="Team not found")
+        team_id = team_row.id
+    rows = per90.season_table(db, min_minutes, sort, team_id)
+    # Keep the original field name for progressive passes
+    return [dict(r, prog_passes=r["progressive_passes"]) for r in rows]
+
+@app.get("/api/matches/{match_id}/players")
+def get_match_players(match_id: int, db: Session = Depends(get_db)):
+    """ Minutes played, totals and per-90 rates of every player in the match """
+    if db.query(Match).filter(Match.id == match_id).first() is None:
+        raise HTTPException(status_code=404, detail="Match not found")
+    return per90.match_table(db, match_id)
+
+@app.get("/api/season/momentum")
+def get_season_momentum(team: str, metric: str = "danger", smoothing: str = None, span: int = 5, db: Session = Depends(get_db)):
+    """ Average per-minute profile of a team (for and against) across every stored match """
+    _check_smoothing(smoothing)
+    if metric != "danger" and metric not in series.METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be danger or one of {', '.join(series.METRICS)}")
+    team_row = db.query(Team).filter(func.lower(Team.name) == team.lower()).first()
+    if not team_row:
+        raise HTTPException(status_code=404, detail="Team not found")
+    profile = series.team_profile(db, team_row.id, metric, smoothing, max(span, 1))
+    return dict(profile, team=team_row.name, metric=metric)
@@ -0,0 +1,143 @@
+import os
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ASSETS_DIR = os.path.join(_ROOT, "assets")
+PNG_DIR = os.path.join(ASSETS_DIR, "png")
+
+# Preferred first: browsers take the first <source> type they support
+SRCSET_FORMATS = ("avif", "webp", "png")
+_VARIANT_RE = re.compile(r"^(?P<stem>.+?)(?:@(?P<scale>\d)x)?\.(?P<fmt>avif|webp|png)$")
+
+# Variants written by a lazy render. The API process is not started with the batch renderer's
+# ASSET_FORMATS/ASSET_SCALES, so it has its own defaults; a requested variant outside them is
+# rendered on its own.
+LAZY_FORMATS = tuple(os.environ.get("LAZY_ASSET_FORMATS", "png,webp").split(","))
+LAZY_SCALES = tuple(int(s) for s in os.environ.get("LAZY_ASSET_SCALES", "1,2").split(","))
+
+# pyplot is not thread-safe, so every lazy render runs on a single worker thread
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asset-render")
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# A failed render is not retried for this long, so a broken match is not re-rendered on every request
+FAILED_TTL = 300
+_failed = {} # task -> monotonic time of the failure
+
+
+def _resolve(subdir, filename):
+    """Return the absolute path for assets/<subdir>/<filename>, or None if it escapes ASSETS_DIR."""
+    path = os.path.realpath(os.path.join(ASSETS_DIR, subdir, filename))
+    if not path.startswith(os.path.realpath(ASSETS_DIR) + os.sep):
+        return None
+    return path
+
+
+def _generator():
+    # Imported lazily: pulls in matplotlib, mplsoccer and plotly. The API has no display, so the
+    # backend is fixed before pyplot is first imported
+    import matplotlib
+    matplotlib.use("Agg")
+    import generate_all_assets
+    return generate_all_assets
+
+
+def _render(task, formats=LAZY_FORMATS, scales=LAZY_SCALES):
+    generator = _generator()
+    previous = (generator.OUTPUT_FORMATS, generator.OUTPUT_SCALES)
+    try:
+        generator.configure_output(formats, scales)
+    except ValueError as e:
+        return {"status": "failed", "error": str(e)}
+    try:
+        return generator.render_task(task)
+    finally:
+        generator.configure_output(*previous)
+
+
+def _task_for(filename):
+    return _generator().asset_task(filename)
+
+
+def ensure_asset(subdir, filename):
+    """
+    Returns the path of a dashboard asset, rendering it from the cached match events
+    on first request. Concurrent requests for assets produced by the same task share
+    a single render. Returns None if the asset cannot be served.
+    """
+    path = _resolve(subdir, filename)
+    if path is None:
+        return None
+    if os.path.exists(path):
+        return path
+
+    task = _task_for(filename)
+    if task is None or not os.path.exists(task[0]):
+        return None
+
+    formats, scales, key = LAZY_FORMATS, LAZY_SCALES, task
+    variant = _VARIANT_RE.match(filename)
+    if variant is not None:
+        fmt, scale = variant.group("fmt"), int(variant.group("scale") or 1)
+        if fmt not in formats or scale not in scales:
+            formats, scales = tuple(dict.fromkeys(formats + (fmt,))), tuple(sorted(set(scales) | {scale}))
+            key = (task, fmt, scale)
+
+    with _inflight_lock:
+        failed_at = _failed.get(key)
+        if failed_at is not None and time.monotonic() - failed_at < FAILED_TTL:
+            return None
+        fut = _inflight.get(key)
+        started = fut is None
+        if started:
+            fut = _executor.submit(_render, task, formats, scales)
+            _inflight[key] = fut
+    if started:
+        # Outside the lock: a render that already finished runs the callback right here
+        fut.add_done_callback(lambda f, key=key: _forget(key, f))
+
+    entry = fut.result()
+    if entry["status"] == "failed":
+        print(f"Lazy render failed for {filename}: {entry['error']}")
+    return path if os.path.exists(path) else None
+
+
+def _forget(key, fut):
+    with _inflight_lock:
+        _inflight.pop(key, None)
+        if fut.exception() is None and fut.result()["status"] == "failed":
+            _failed[key] = time.monotonic()
+        else:
+            _failed.pop(key, None)
+
+
+def srcset_manifest(match_id):
+    """
+    Lists the rendered image variants of a match as srcset strings:
+    {"<match>_home_total_passes": {"webp": "/assets/png/...webp 1x, /assets/png/...@2x.webp 2x", ...}}
+    """
+    prefix = f"{match_id}_"
+    variants = {}
+    try:
+        names = os.listdir(PNG_DIR)
+    except FileNotFoundError:
+        return {}
+    for name in names:
+        if not name.startswith(prefix):
+            continue
+        m = _VARIANT_RE.match(name)
+        if not m:
+            continue
+        scale = int(m.group("scale") or 1)
+        variants.setdefault(m.group("stem"), {}).setdefault(m.group("fmt"), []).append((scale, name))
+
+    manifest = {}
+    for stem, by_fmt in variants.items():
+        manifest[stem] = {
+            fmt: ", ".join(f"/assets/png/{name} {scale}x" for scale, name in sorted(by_fmt[fmt]))
+            for fmt in SRCSET_FORMATS if fmt in by_fmt
+        }
+    return manifest
@@ -0,0 +1,222 @@
+"""
+Long-lived pool of Selenium drivers shared by the WhoScored scrapers.
+
+Starting Chrome and getting past the Cloudflare check is the dominant fixed cost of a scrape,
+so drivers are kept alive between pages (and between daemon cycles) instead of being created
+and quit per run:
+
+    pool = BrowserPool(chrome_driver)
+    with pool.driver() as driver:
+        driver.get(url)
+    ...
+    pool.shutdown()
+
+    - a driver is health-checked before it is handed out and replaced if the check fails,
+    - it is recycled after `max_pages` checkouts or `max_age` seconds, or when the caller's block raises a
+      WebDriver error (a crashed or wedged browser),
+    - cookies are saved to `cookie_path` when a driver is retired and loaded into every new
+      driver, so a solved Cloudflare challenge survives recycling and process restarts,
+    - shutdown() (also registered with atexit) saves the cookies and quits every driver.
+
+The driver factory is any zero-argument callable returning a Selenium-like driver, which
+keeps this module free of a hard selenium import and lets it run offline with a stub.
+"""
+import os
+import json
+import time
+import queue
+import atexit
+import threading
+from contextlib import contextmanager
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COOKIE_PATH = os.path.join(_ROOT, "data", "whoscored_cookies.json")
+BASE_URL = "https://www.whoscored.com"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+MAX_PAGES = 50
+MAX_AGE = 6 * 3600 # Seconds before a browser is retired even if it is still healthy
+
+
+def chrome_driver():
+    """Standard Chrome with the scrapers' anti-automation flags."""
+    from selenium import webdriver
+    options = webdriver.ChromeOptions()
+    options.add_argument(f"user-agent={USER_AGENT}")
+    options.add_argument('--window-size=1920,1080')
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    driver = webdriver.Chrome(options=options)
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    return driver
+
+
+def undetected_chrome_driver():
+    """undetected-chromedriver, for pages where the standard driver is challenged."""
+    import undetected_chromedriver as uc
+    options = uc.ChromeOptions()
+    options.add_argument("--window-size=1920,1080")
+    return uc.Chrome(options=options)
+
+
+def _is_driver_error(exc):
+    """
+    WebDriver failures mean the browser is unusable; anything else is the caller's problem.
+    Matched by class name, so selenium is not imported here and stub drivers can raise their own.
+    """
+    return any(cls.__name__ == "WebDriverException" for cls in type(exc).__mro__)
+
+
+class _Slot:
+    """A driver plus its bookkeeping."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created = time.time()
+
+
+class BrowserPool:
+    def __init__(self, factory=chrome_driver, size=1, max_pages=MAX_PAGES, max_age=MAX_AGE,
+                 cookie_path=COOKIE_PATH, base_url=BASE_URL):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.max_age = max_age
+        self.cookie_path = cookie_path
+        self.base_url = base_url
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        self.stats = {"started": 0, "recycled": 0, "crashed": 0, "checkouts": 0}
+        atexit.register(self.shutdown)
+
+    # -- cookies -------------------------------------------------------------
+    def _load_cookies(self, driver):
+        if not self.cookie_path or not os.path.exists(self.cookie_path):
+            return 0
+        try:
+            with open(self.cookie_path, "r", encoding="utf-8") as f:
+                cookies = json.load(f)
+            # Cookies can only be set for the domain currently loaded
+            driver.get(self.base_url)
+            for cookie in cookies:
+                if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+                    cookie.pop("sameSite", None)
+                driver.add_cookie(cookie)
+            return len(cookies)
+        except Exception as e:
+            print(f"[pool] Could not restore cookies: {e}")
+            return 0
+
+    def save_cookies(self, driver):
+        if not self.cookie_path:
+            return
+        try:
+            cookies = driver.get_cookies()
+        except Exception:
+            return
+        if not cookies:
+            return
+        os.makedirs(os.path.dirname(self.cookie_path), exist_ok=True)
+        tmp = self.cookie_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cookies, f)
+        os.replace(tmp, self.cookie_path)
+
+    # -- lifecycle -----------------------------------------------------------
+    def _start(self):
+        driver = self.factory()
+        self.stats["started"] += 1
+        restored = self._load_cookies(driver)
+        if restored:
+            print(f"[pool] New browser with {restored} saved cookies.")
+        return _Slot(driver)
+
+    def _retire(self, slot, crashed=False):
+        if not crashed:
+            self.save_cookies(slot.driver)
+        try:
+            slot.driver.quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+        self.stats["crashed" if crashed else "recycled"] += 1
+
+    def healthy(self, slot):
+        try:
+            return slot.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _checkout(self, timeout=None):
+        if self._closed:
+            raise RuntimeError("BrowserPool has been shut down")
+        while True:
+            try:
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_start = self._created < self.size
+                    if can_start:
+                        self._created += 1
+                if can_start:
+                    try:
+                        return self._start()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                slot = self._idle.get(timeout=timeout)
+            if self.healthy(slot):
+                return slot
+            print("[pool] Browser failed its health check, replacing it.")
+            self._retire(slot, crashed=True)
+
+    def _checkin(self, slot):
+        if self._closed or slot.pages >= self.max_pages or time.time() - slot.created >= self.max_age:
+            self._retire(slot)
+        else:
+            self._idle.put(slot)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Check a driver out for one page (or a few); it goes back to the pool afterwards."""
+        slot = self._checkout(timeout)
+        slot.pages += 1
+        self.stats["checkouts"] += 1
+        try:
+            yield slot.driver
+        except Exception as e:
+            if _is_driver_error(e):
+                print(f"[pool] Browser error, recycling: {type(e).__name__}")
+                self._retire(slot, crashed=True)
+            else:
+                self._checkin(slot)
+            raise
+        else:
+            self._checkin(slot)
+
+    def shutdown(self):
+        """Save cookies and quit every idle driver. Safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        while True:
+            try:
+                slot = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(slot)
+
+
+_shared = {}
+
+
+def get_pool(factory=chrome_driver, **kwargs):
+    """Process-wide pool per driver factory, so every entry point in a process shares browsers."""
+    pool = _shared.get(factory)
+    if pool is None or pool._closed:
+        pool = _shared[factory] = BrowserPool(factory, **kwargs)
+    return pool
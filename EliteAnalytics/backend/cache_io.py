@@ -0,0 +1,127 @@
+"""
+Reading and writing match cache files (match_<id>_cache.json).
+
+    write_cache(path, data)      # compact JSON, temp file + fsync + atomic rename
+    data = read_cache(path)      # plain, gzip or zstd, detected from the first bytes
+
+Caches used to be written with indent=4 straight to the final path: about twice the size
+of compact JSON, and a reader (the watcher, the parser) could open a half-written file.
+write_cache writes next to the target, fsyncs, then os.replace()s it into place, so readers
+only ever see the old file or the complete new one.
+
+Compression is chosen with CACHE_COMPRESSION=none|gzip|zstd (default none). The file name
+stays match_<id>_cache.json whatever the encoding, so every glob and path in the project keeps
+working; read_cache recognises gzip and zstd by their magic bytes. zstd needs the optional
+`zstandard` package; without it writes fall back to gzip.
+"""
+import os
+import glob
+import gzip
+import json
+import argparse
+import tempfile
+
+COMPRESSION = os.environ.get("CACHE_COMPRESSION", "none").lower()
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+_warned = False
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def encode(data, compression=None):
+    """Compact UTF-8 JSON bytes, compressed as requested."""
+    compression = (compression or COMPRESSION).lower()
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if compression == "zstd":
+        zstandard = _zstd()
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+        global _warned
+        if not _warned:
+            print("[cache] zstandard is not installed, writing gzip instead.")
+            _warned = True
+        compression = "gzip"
+    if compression == "gzip":
+        # mtime=0 keeps the bytes identical for identical data
+        return gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+    if compression not in ("none", ""):
+        raise ValueError(f"Unknown cache compression: {compression}")
+    return raw
+
+
+def decode(blob):
+    if blob.startswith(GZIP_MAGIC):
+        blob = gzip.decompress(blob)
+    elif blob.startswith(ZSTD_MAGIC):
+        zstandard = _zstd()
+        if zstandard is None:
+            raise RuntimeError("Cache is zstd-compressed but the zstandard package is not installed")
+        blob = zstandard.ZstdDecompressor().decompressobj().decompress(blob)
+    return json.loads(blob)
+
+
+def read_cache(path):
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+
+def write_cache(path, data, compression=None):
+    """Atomically replace `path` with `data`. Returns the number of bytes written."""
+    return write_bytes(path, encode(data, compression))
+
+
+def write_bytes(path, blob):
+    """Atomically replace `path` with `blob` (temp file, fsync, rename). Returns len(blob)."""
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    # Same folder, so the rename never crosses file systems; the name does not look like a cache
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file owner-only
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself
+        dir_fd = os.open(folder, os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    return len(blob)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rewrite existing match caches compactly (and optionally compressed).")
+    parser.add_argument("folders", nargs="+", help="Folders holding match_<id>_cache.json files")
+    parser.add_argument("--compression", default=COMPRESSION, choices=("none", "gzip", "zstd"))
+    args = parser.parse_args(argv)
+    before = after = 0
+    for folder in args.folders:
+        for path in sorted(glob.glob(os.path.join(folder, "match_*_cache.json"))):
+            before += os.path.getsize(path)
+            after += write_cache(path, read_cache(path), args.compression)
+    print(f"Rewrote caches: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
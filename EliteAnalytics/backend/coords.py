@@ -0,0 +1,81 @@
+"""
+Coordinate systems of the data providers and vectorized transforms between them.
+
+    WhoScored   0-100 x 0-100, y=0 on the right touchline, both teams attack towards x=100
+    Sofascore   0-100 x 0-100 (average positions), same orientation as StatsBomb
+    StatsBomb   120 x 80, y=0 on the left touchline (mplsoccer pitch_type="statsbomb")
+
+WhoScored x is not a linear stretch of StatsBomb x: a plain 1.20 scaling is about one
+unit off at the penalty spot. It is mapped through a calibration table of pitch landmarks
+and interpolated linearly between them (extrapolated with the end segments outside 0-100).
+Every function takes scalars or arrays and returns NumPy arrays.
+
+>>> ws_to_sb_x([0, 50, 89, 100]).tolist()
+[0.0, 60.0, 108.0, 120.0]
+>>> sb_to_ws_x([0, 60, 108, 120]).tolist()
+[0.0, 50.0, 89.0, 100.0]
+>>> ws_to_sb_y([0, 50, 100]).tolist()
+[80.0, 40.0, 0.0]
+"""
+import numpy as np
+
+SB_LENGTH, SB_WIDTH = 120.0, 80.0
+
+# WhoScored x -> StatsBomb x calibration points
+#   goal line, halfway line, penalty spot, goal line
+WS_X_POINTS = np.array([0.0, 50.0, 89.0, 100.0])
+SB_X_POINTS = np.array([0.0, 60.0, 108.0, 120.0])
+
+# WhoScored y is a linear 0.80 stretch, flipped
+WS_Y_SCALE = SB_WIDTH / 100.0
+
+SOFASCORE_X_SCALE = SB_LENGTH / 100.0
+SOFASCORE_Y_SCALE = SB_WIDTH / 100.0
+
+
+def _piecewise(values, xp, fp):
+    """
+    Linear interpolation through the lookup table (xp, fp), extrapolating the end segments.
+    A value on a knot belongs to the segment below it.
+    """
+    values = np.asarray(values, dtype=float)
+    seg = np.searchsorted(xp[1:-1], values, side="left")
+    slope = (fp[1:] - fp[:-1]) / (xp[1:] - xp[:-1])
+    return fp[seg] + (values - xp[seg]) * slope[seg]
+
+
+def ws_to_sb_x(x):
+    return _piecewise(x, WS_X_POINTS, SB_X_POINTS)
+
+
+def sb_to_ws_x(x):
+    return _piecewise(x, SB_X_POINTS, WS_X_POINTS)
+
+
+def ws_to_sb_y(y):
+    return SB_WIDTH - np.asarray(y, dtype=float) * WS_Y_SCALE
+
+
+def sb_to_ws_y(y):
+    return (SB_WIDTH - np.asarray(y, dtype=float)) / WS_Y_SCALE
+
+
+def ws_to_sb(x, y):
+    """WhoScored (x, y) arrays -> StatsBomb (x, y) arrays."""
+    return ws_to_sb_x(x), ws_to_sb_y(y)
+
+
+def sb_to_ws(x, y):
+    return sb_to_ws_x(x), sb_to_ws_y(y)
+
+
+def sofascore_to_sb(x, y):
+    """Sofascore average positions (x, y) -> StatsBomb (x, y)."""
+    return np.asarray(x, dtype=float) * SOFASCORE_X_SCALE, np.asarray(y, dtype=float) * SOFASCORE_Y_SCALE
+
+
+def events_to_sb(events, x_key="x", y_key="y"):
+    """StatsBomb (x, y) arrays for a list of WhoScored event dicts (missing values read as 0)."""
+    xs = np.fromiter(((ev.get(x_key) or 0) for ev in events), dtype=float, count=len(events))
+    ys = np.fromiter(((ev.get(y_key) or 0) for ev in events), dtype=float, count=len(events))
+    return ws_to_sb(xs, ys)
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, ForeignKey, JSON
+from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, ForeignKey, JSON, LargeBinary, inspect, text
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 import os
 
@@ -52,6 +52,7 @@ class Event(Base):
     player_id = Column(Integer, ForeignKey("players.id"), nullable=True)
     
     event_id = Column(Integer) # Original provider ID
+    period = Column(Integer, nullable=True) # 1, 2 (3, 4 extra time, 5 shootout)
     minute = Column(Integer)
     second = Column(Integer)
     
@@ -72,11 +73,14 @@ class Event(Base):
     is_big_chance = Column(Boolean, default=False)
     is_penalty = Column(Boolean, default=False)
     
-    # Advanced Passing Logic
+    # Advanced Passing Logic (backend/passes.py)
     is_final_third_pass = Column(Boolean, default=False)
     is_progressive_pass = Column(Boolean, default=False)
+    is_box_entry = Column(Boolean, default=False)
+    is_switch = Column(Boolean, default=False)
+    is_through_ball = Column(Boolean, default=False)
     
-    # Sequence Analysis
+    # Sequence Analysis (backend/possessions.py)
     possession_chain_id = Column(Integer, nullable=True)
     
     qualifiers = Column(JSON, nullable=True) # Store raw qualifiers for deep analysis
@@ -86,8 +90,130 @@ class Event(Base):
     player = relationship("Player", back_populates="events")
 
 
+class Possession(Base):
+    __tablename__ = "possessions"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    match_id = Column(Integer, ForeignKey("matches.id"), index=True)
+    chain_id = Column(Integer) # events.possession_chain_id within the match
+    team_id = Column(Integer, ForeignKey("teams.id"), index=True)
+    period = Column(Integer)
+    start_minute = Column(Integer)
+    start_second = Column(Integer)
+    duration = Column(Float) # Seconds
+    
+    n_events = Column(Integer)
+    passes = Column(Integer)
+    completed_passes = Column(Integer)
+    start_x = Column(Float) # StatsBomb x of the first / last on-ball action of the team
+    end_x = Column(Float)
+    vertical_progress = Column(Float)
+    xt_gained = Column(Float)
+    
+    shots = Column(Integer)
+    xg = Column(Float)
+    ends_in_shot = Column(Boolean, index=True)
+    ends_in_goal = Column(Boolean)
+    start_type = Column(String)
+    end_type = Column(String)
+    from_set_piece = Column(Boolean)
+    
+    match = relationship("Match")
+    team = relationship("Team")
+
+
+class ModelStats(Base):
+    __tablename__ = "model_stats"
+    
+    # Sufficient statistics of a grid model, updated as each match is ingested
+    name = Column(String, primary_key=True) # e.g. "xt_16x12"
+    grid_l = Column(Integer)
+    grid_w = Column(Integer)
+    
+    # float64 arrays stored as raw bytes: per-cell counts and the cell -> cell transition matrix
+    moves = Column(LargeBinary)
+    shots = Column(LargeBinary)
+    goals = Column(LargeBinary)
+    transitions = Column(LargeBinary)
+    
+    match_ids = Column(JSON) # Matches already counted, so re-ingesting never double counts
+    updated_at = Column(String)
+
+
+class MatchSeries(Base):
+    __tablename__ = "match_series"
+
+    # Per-minute metric arrays of one team in one match, written at ingest (backend/series.py)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    match_id = Column(Integer, ForeignKey("matches.id"), index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), index=True)
+    is_home = Column(Boolean)
+    n_minutes = Column(Integer)
+    metrics = Column(JSON) # Row order of the matrix, e.g. ["xg", "xt", "passes", ...]
+    data = Column(LargeBinary) # float32 matrix (len(metrics), n_minutes) as raw bytes
+
+
+class Pressing(Base):
+    __tablename__ = "pressing"
+
+    # Pressing metrics of one team in one match, written at ingest (backend/pressing.py)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    match_id = Column(Integer, ForeignKey("matches.id"), index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"), index=True)
+
+    ppda = Column(Float, nullable=True) # Null when the team made no defensive action in the zone
+    opponent_passes = Column(Integer)
+    defensive_actions = Column(Integer)
+    high_turnovers = Column(Integer)
+    high_turnover_shots = Column(Integer)
+    possession_losses = Column(Integer)
+    counterpress_regains = Column(Integer)
+
+
+class PlayerMatch(Base):
+    __tablename__ = "player_matches"
+
+    # Minutes and metric totals of one player in one match, written at ingest (backend/per90.py)
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    match_id = Column(Integer, ForeignKey("matches.id"), index=True)
+    player_id = Column(Integer, ForeignKey("players.id"), index=True)
+    team_id = Column(Integer, ForeignKey("teams.id"))
+
+    started = Column(Boolean)
+    minute_on = Column(Float, nullable=True) # Elapsed minutes of play, stoppage time included
+    minute_off = Column(Float, nullable=True)
+    minutes = Column(Float)
+
+    xg = Column(Float)
+    xt = Column(Float)
+    shots = Column(Integer)
+    goals = Column(Integer)
+    passes = Column(Integer)
+    completed_passes = Column(Integer)
+    progressive_passes = Column(Integer)
+    take_ons = Column(Integer)
+    defensive_actions = Column(Integer)
+
+
+def ensure_columns(bind=engine):
+    """
+    create_all never alters existing tables: add any model column missing from an older
+    database file (nullable, no backfill) so new fields can be written straight away.
+    """
+    inspector = inspect(bind)
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(bind.dialect)}'))
+
+
 def init_db():
     Base.metadata.create_all(engine)
+    ensure_columns(engine)
 
 def get_session():
     Session = sessionmaker(bind=engine)
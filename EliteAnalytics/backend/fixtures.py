@@ -0,0 +1,224 @@
+"""
+Fixture discovery and the scraper daemon's work queue.
+
+The team schedule (match id, kickoff, whether a score is shown) is read from the WhoScored fixtures page at most
+once per SCHEDULE_TTL and cached as JSON. From it the daemon knows when each match should be
+over, so instead of a blind hourly cycle it
+    - queues a match once kickoff + FULL_TIME_AFTER has passed and it has no cache file,
+    - retries a queued match that is not available yet every RETRY_AFTER (then less often),
+    - otherwise sleeps until the next expected full time or schedule refresh.
+
+The queue is a JSON file, so matches found while the daemon was down, or not yet available
+when it last looked, are picked up after a restart.
+"""
+import os
+import re
+import json
+import time
+import datetime
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCHEDULE_PATH = os.path.join(_PROJECT_ROOT, "data", "fixtures_schedule.json")
+QUEUE_PATH = os.path.join(_PROJECT_ROOT, "data", "scrape_queue.json")
+FIXTURES_URL = "https://www.whoscored.com/teams/65/fixtures/spain-barcelona"
+
+SCHEDULE_TTL = 12 * 3600
+FULL_TIME_AFTER = 115 * 60 # Kickoff to final whistle, stoppage time included
+RETRY_AFTER = 5 * 60 # First retries of a finished match that has no data yet
+RETRY_MAX = 2 * 3600
+GIVE_UP_AFTER = 7 * 24 * 3600
+MIN_SLEEP, MAX_SLEEP = 60, 6 * 3600
+
+# Runs in the fixtures page: every match link with the text of the row around it
+FIXTURE_ROWS_JS = """
+var out = [], seen = {};
+document.querySelectorAll('a[href*="/Matches/"], a[href*="/matches/"]').forEach(function (a) {
+    var m = a.href.match(/\\/matches\\/(\\d+)\\//i);
+    if (!m || seen[m[1]]) return;
+    seen[m[1]] = true;
+    var row = a.closest('tr, .divtable-row, li') || a.parentElement;
+    out.push({id: m[1], text: (row ? row.innerText : a.innerText) || ''});
+});
+return out;
+"""
+
+_DATE = re.compile(r"(\d{1,2})-(\d{1,2})-(\d{2,4})")
+_TIME = re.compile(r"\b(\d{1,2}):(\d{2})\b")
+_SCORE = re.compile(r"\b\d+\s*:\s*\d+\b")
+
+
+def _now():
+    return time.time()
+
+
+def parse_row(match_id, text):
+    """One fixture from a row's text: dd-mm-yy date, HH:MM kickoff, played when a score is shown."""
+    fixture = {"match_id": str(match_id), "kickoff": None, "played": False}
+    date = _DATE.search(text or "")
+    if date:
+        day, month, year = (int(g) for g in date.groups())
+        year += 2000 if year < 100 else 0
+        rest = text[date.end():]
+        clock = _TIME.search(rest)
+        hour, minute = (int(clock.group(1)), int(clock.group(2))) if clock else (0, 0)
+        try:
+            fixture["kickoff"] = datetime.datetime(year, month, day, hour, minute).timestamp()
+        except ValueError:
+            pass
+        # Before kickoff the row shows "vs" or the time; afterwards the score
+        fixture["played"] = bool(_SCORE.search(rest[clock.end():] if clock else rest))
+    return fixture
+
+
+def discover(driver, url):
+    """Fixtures listed on the team page, in page order."""
+    driver.get(url)
+    rows = driver.execute_script(FIXTURE_ROWS_JS) or []
+    return [parse_row(r.get("id"), r.get("text")) for r in rows if r.get("id")]
+
+
+def refresh(schedule, pool, url=FIXTURES_URL, force=False, now=None):
+    """
+    Re-read the fixtures page when the cached schedule is older than SCHEDULE_TTL (or `force`).
+    Returns the ids that are new or rescheduled. An empty page (challenge, layout change) keeps
+    the old schedule and is retried after RETRY_MAX rather than on every cycle.
+    """
+    now = now or _now()
+    if not force and not schedule.stale(now):
+        return []
+    with pool.driver() as driver:
+        found = discover(driver, url)
+    if not found:
+        print("[fixtures] No fixtures found on the team page, keeping the cached schedule.")
+        schedule.fetched_at = now - SCHEDULE_TTL + RETRY_MAX
+        return []
+    changed = schedule.update(found, now)
+    print(f"[fixtures] {len(found)} fixtures on the team page, {len(changed)} new or rescheduled.")
+    return changed
+
+
+class Schedule:
+    """Cached team schedule: {match_id: fixture} plus the time it was fetched."""
+
+    def __init__(self, path=SCHEDULE_PATH):
+        self.path = path
+        self.fixtures, self.fetched_at = {}, 0.0
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.fixtures = state.get("fixtures", {})
+            self.fetched_at = state.get("fetched_at", 0.0)
+
+    def stale(self, now=None, ttl=SCHEDULE_TTL):
+        return (now or _now()) - self.fetched_at >= ttl
+
+    def update(self, fixtures, now=None):
+        """Merge freshly discovered fixtures; returns the ids that are new or were rescheduled."""
+        changed = []
+        for fx in fixtures:
+            old = self.fixtures.get(fx["match_id"])
+            if fx["kickoff"] is None and old:
+                fx["kickoff"] = old.get("kickoff")
+            if old is None or old.get("kickoff") != fx["kickoff"]:
+                changed.append(fx["match_id"])
+            self.fixtures[fx["match_id"]] = fx
+        self.fetched_at = now or _now()
+        self.save()
+        return changed
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": self.fetched_at, "fixtures": self.fixtures}, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def finished(self, now=None):
+        """Ids whose expected full time has passed (or shown as played)."""
+        now = now or _now()
+        return [m for m, fx in self.fixtures.items()
+                if fx.get("played") or (fx.get("kickoff") and fx["kickoff"] + FULL_TIME_AFTER <= now)]
+
+    def next_full_time(self, exclude=(), now=None):
+        now = now or _now()
+        upcoming = [fx["kickoff"] + FULL_TIME_AFTER for m, fx in self.fixtures.items()
+                    if m not in exclude and fx.get("kickoff") and fx["kickoff"] + FULL_TIME_AFTER > now]
+        return min(upcoming) if upcoming else None
+
+
+class WorkQueue:
+    """
+    Persistent queue of finished matches still to scrape, with per-match retry times. Matches
+    given up on are kept in `abandoned`, so the next schedule pass does not queue them again.
+    """
+
+    def __init__(self, path=QUEUE_PATH):
+        self.path = path
+        self.items = {}
+        self.abandoned = {} # id -> time it was given up
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if "items" in state:
+                self.items, self.abandoned = state["items"], state.get("abandoned", {})
+            else:
+                # Older files held the items only
+                self.items = state
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"items": self.items, "abandoned": self.abandoned}, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def add(self, match_ids, now=None):
+        now = now or _now()
+        added = [m for m in match_ids if m not in self.items and m not in self.abandoned]
+        for m in added:
+            self.items[m] = {"added": now, "attempts": 0, "next_attempt": now}
+        if added:
+            self.save()
+        return added
+
+    def ready(self, now=None):
+        now = now or _now()
+        return sorted(m for m, item in self.items.items() if item["next_attempt"] <= now)
+
+    def done(self, match_ids):
+        for m in match_ids:
+            self.items.pop(m, None)
+        self.save()
+
+    def defer(self, match_ids, now=None):
+        """Not available yet: retry after RETRY_AFTER, doubling up to RETRY_MAX; abandon after GIVE_UP_AFTER."""
+        now = now or _now()
+        for m in match_ids:
+            item = self.items.get(m)
+            if item is None:
+                continue
+            if now - item["added"] >= GIVE_UP_AFTER:
+                print(f"[{m}] Still unavailable after {GIVE_UP_AFTER // 86400} days, abandoned.")
+                del self.items[m]
+                self.abandoned[m] = now
+                continue
+            item["attempts"] += 1
+            item["next_attempt"] = now + min(RETRY_AFTER * 2 ** (item["attempts"] - 1), RETRY_MAX)
+        self.save()
+
+    def next_attempt(self):
+        return min((item["next_attempt"] for item in self.items.values()), default=None)
+
+
+def sleep_for(schedule, queue, cached=(), now=None):
+    """Seconds the daemon can sleep: until the next retry, full time or schedule refresh."""
+    now = now or _now()
+    wakes = [schedule.fetched_at + SCHEDULE_TTL]
+    for t in (queue.next_attempt(), schedule.next_full_time(exclude=set(cached), now=now)):
+        if t is not None:
+            wakes.append(t)
+    return int(min(max(min(wakes) - now, MIN_SLEEP), MAX_SLEEP))
@@ -0,0 +1,210 @@
+"""
+Shared HTTP client for the JSON/HTML sources (Understat, SofaScore, FotMob).
+
+    from EliteAnalytics.backend.http_client import get_client
+    r = get_client().get("https://understat.com/match/29395", headers={...})
+    r.status_code, r.text, r.json(), r.from_cache
+
+    - one requests.Session per process: keep-alive connection pooling, and retries with backoff
+      on 5xx / connection errors,
+    - an on-disk cache: per request a small metadata file (status, validators, fetch time), and
+      the body stored once under its SHA-256, so identical payloads are kept once,
+    - per-endpoint TTLs (TTLS, first matching URL pattern wins): within the TTL the cached body
+      is returned without a request; after it the request is conditional (If-None-Match /
+      If-Modified-Since) and a 304 just refreshes the entry,
+    - a network error or 5xx with a cached copy serves the stale copy,
+    - offline replay (HTTP_OFFLINE=1, or offline=True): only the cache is read and a miss raises
+      OfflineMiss, so dashboards rebuild without touching the network.
+
+Only 200 responses are cached. WhoScored pages are not fetched through here: their status codes
+feed the scraper's block detection and must not be answered from a cache.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from EliteAnalytics.backend.cache_io import write_bytes
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(_ROOT, "data", "http_cache")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+OFFLINE = os.environ.get("HTTP_OFFLINE", "0") == "1"
+TIMEOUT = 15
+RETRIES = 3
+BACKOFF = 1.0
+POOL_SIZE = 8
+DEFAULT_TTL = 3600
+
+# (URL pattern, seconds): finished matches do not change, season lists do after every matchday
+TTLS = (
+    (r"understat\.com/match/", 30 * 86400),
+    (r"understat\.com/team/", 6 * 3600),
+    (r"sofascore\.com/api/v1/event/\d+/(incidents|lineups|statistics|shotmap|coordinates)", 7 * 86400),
+    (r"sofascore\.com/api/v1/event/", 3600),
+    (r"fotmob\.com/api/matchDetails", 86400),
+)
+
+# Request headers that change the response, so they are part of the cache key
+_KEY_HEADERS = ("accept", "accept-language")
+
+
+class OfflineMiss(requests.ConnectionError):
+    """Offline mode and the request is not in the cache."""
+
+
+class CachedResponse:
+    """The parts of requests.Response the callers use."""
+
+    def __init__(self, url, status_code, headers, content, from_cache):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code} for {self.url}", response=self)
+
+
+class HttpClient:
+    def __init__(self, cache_dir=CACHE_DIR, ttls=TTLS, default_ttl=DEFAULT_TTL, offline=OFFLINE,
+                 timeout=TIMEOUT, retries=RETRIES, backoff=BACKOFF, pool_size=POOL_SIZE, clock=time.time):
+        self.cache_dir = cache_dir
+        self.ttls = [(re.compile(p), ttl) for p, ttl in ttls]
+        self.default_ttl = default_ttl
+        self.offline = offline
+        self.timeout = timeout
+        self._clock = clock
+        self.stats = {"requests": 0, "hits": 0, "revalidated": 0, "stale": 0}
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=frozenset(["GET"]), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    # -- cache layout ----------------------------------------------------------
+    def ttl_for(self, url):
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def cache_key(self, url, headers=None):
+        parts = [url] + [f"{k}:{v}" for k, v in sorted((headers or {}).items()) if k.lower() in _KEY_HEADERS]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _meta_path(self, key):
+        return os.path.join(self.cache_dir, "meta", key[:2], f"{key}.json")
+
+    def _body_path(self, digest):
+        return os.path.join(self.cache_dir, "bodies", digest[:2], digest)
+
+    def _load(self, key):
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(self._body_path(meta["body"]), "rb") as f:
+                return meta, f.read()
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def _store(self, key, url, resp):
+        digest = hashlib.sha256(resp.content).hexdigest()
+        body_path = self._body_path(digest)
+        if not os.path.exists(body_path):
+            write_bytes(body_path, resp.content)
+        meta = {
+            "url": url,
+            "status": resp.status_code,
+            "fetched_at": self._clock(),
+            "body": digest,
+            "headers": {k: resp.headers[k] for k in ("Content-Type", "ETag", "Last-Modified") if k in resp.headers},
+        }
+        self._save_meta(key, meta)
+        return meta
+
+    def _save_meta(self, key, meta):
+        write_bytes(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+
+    def _cached(self, url, meta, body):
+        return CachedResponse(url, meta["status"], meta["headers"], body, from_cache=True)
+
+    # -- requests ---------------------------------------------------------------
+    def get(self, url, params=None, headers=None, ttl=None, timeout=None):
+        """GET through the cache. `ttl` overrides the endpoint TTL (0 always revalidates)."""
+        if params:
+            url = requests.Request("GET", url, params=params).prepare().url
+        key = self.cache_key(url, headers)
+        meta, body = self._load(key)
+        ttl = self.ttl_for(url) if ttl is None else ttl
+
+        if meta is not None and (self.offline or self._clock() - meta["fetched_at"] < ttl):
+            self.stats["hits"] += 1
+            return self._cached(url, meta, body)
+        if self.offline:
+            raise OfflineMiss(f"Not in the HTTP cache (offline mode): {url}")
+
+        send = dict(headers or {})
+        if meta is not None:
+            if "ETag" in meta["headers"]:
+                send["If-None-Match"] = meta["headers"]["ETag"]
+            if "Last-Modified" in meta["headers"]:
+                send["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+        self.stats["requests"] += 1
+        try:
+            resp = self.session.get(url, headers=send, timeout=timeout or self.timeout)
+        except requests.RequestException as e:
+            if meta is None:
+                raise
+            print(f"[http] {type(e).__name__} for {url}, serving the cached copy.")
+            self.stats["stale"] += 1
+            return self._cached(url, meta, body)
+        if resp.status_code >= 500 and meta is not None:
+            print(f"[http] HTTP {resp.status_code} for {url}, serving the cached copy.")
+            self.stats["stale"] += 1
+            return self._cached(url, meta, body)
+
+        if resp.status_code == 304 and meta is not None:
+            self.stats["revalidated"] += 1
+            meta["fetched_at"] = self._clock()
+            self._save_meta(key, meta)
+            return self._cached(url, meta, body)
+        if resp.status_code == 200:
+            self._store(key, url, resp)
+        return CachedResponse(url, resp.status_code, dict(resp.headers), resp.content, from_cache=False)
+
+    def close(self):
+        self.session.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_client(**kwargs):
+    """Process-wide client, so every caller shares the connection pool and the cache."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpClient(**kwargs)
+        return _shared
@@ -1,47 +1,22 @@
 import math
+from EliteAnalytics.backend.xg import estimate_xg
+from EliteAnalytics.backend.coords import ws_to_sb
+
+def calculate_xg_array(x_ws, y_ws, is_penalty, is_big_chance, is_header):
+    """
+    Vectorized xG for many shots in WhoScored coordinates (0-100 x 0-100).
+    Scores a match or a whole season of shots in one array operation.
+    """
+    x_sb, y_sb = ws_to_sb(x_ws, y_ws)
+    return estimate_xg(x_sb, y_sb, is_penalty, is_big_chance, is_header)
 
 def calculate_xg(x_ws, y_ws, is_penalty=False, is_big_chance=False, body_part="Unknown"):
     """
     Calculates expected goals for a shot using WhoScored coordinates (0-100 x 0-100).
     Penalties are fixed at 0.76. Big chances get a massive multiplier.
-    Aligns with the 'True' formula from shotmap_whoscored.py.
+    Single-shot wrapper around the shared engine in xg.py.
     """
-    if is_penalty:
-        return 0.76
-
-    # Piecewise-linear WhoScored x → StatsBomb x using calibration points
-    if x_ws <= 50:
-        x_sb = x_ws * (60.0 / 50.0)
-    elif x_ws <= 89:
-        x_sb = 60.0 + (x_ws - 50) * (48.0 / 39.0)
-    else:
-        x_sb = 108.0 + (x_ws - 89) * (12.0 / 11.0)
-
-    # 0.80 multiplier on the Y axis
-    y_sb = 80 - y_ws * 0.80
-    
-    goal_x, goal_y = 120.0, 40.0
-    dx = goal_x - x_sb
-    dy = goal_y - y_sb
-    distance = max(math.sqrt(dx**2 + dy**2), 0.5)
-    
-    half_goal = 4.0
-    angle = math.atan2(half_goal, distance)
-    
-    # Base geometry xG (matching shotmap_whoscored)
-    base_xg = (angle / (math.pi / 2)) * (1 / (1 + distance / 30))
-    
-    if body_part == "Header":
-        base_xg *= 0.4
-        
-    if is_big_chance:
-        base_xg = max(0.35, base_xg * 3.5)
-        base_xg = min(0.65, base_xg)
-        
-    if distance > 18:
-        base_xg *= (18 / distance)**2
-        
-    return round(min(max(base_xg, 0.01), 0.95), 3)
+    return float(calculate_xg_array(x_ws, y_ws, is_penalty, is_big_chance, body_part == "Header"))
 
 def calculate_xt(x_start, y_start, x_end, y_end):
     """
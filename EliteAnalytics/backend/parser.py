@@ -1,15 +1,25 @@
-import json
 import os
 from sqlalchemy.orm import Session
-from EliteAnalytics.backend.database import engine, Match, Team, Player, Event, Base
-from EliteAnalytics.backend.metrics import calculate_xg, calculate_xt
+from EliteAnalytics.backend.database import engine, Match, Team, Player, Event, Base, ensure_columns
+from EliteAnalytics.backend.database import Possession, Pressing, PlayerMatch, MatchSeries
+from EliteAnalytics.backend.metrics import calculate_xt
+from EliteAnalytics.backend.coords import ws_to_sb
+from EliteAnalytics.backend.passes import classify_passes, is_through_ball
+from EliteAnalytics.backend import xt as xt_model
+from EliteAnalytics.backend import possessions
+from EliteAnalytics.backend import series
+from EliteAnalytics.backend import pressing
+from EliteAnalytics.backend import per90
+from EliteAnalytics.backend import xg_model
+from EliteAnalytics.backend.xg_model import shot_table, score_shots
+from EliteAnalytics.backend.cache_io import read_cache
+from EliteAnalytics.backend.understat import attach as attach_understat
 
 _ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DATA_DIR = os.path.join(_ROOT, "assets", "data")
 
-def parse_match_data(session: Session, json_path: str):
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+def parse_match_data(session: Session, json_path: str, refresh=True):
+    data = read_cache(json_path)
         
     # 1. Teams
     home_data = data.get("home", {})
@@ -65,27 +75,26 @@ def parse_match_data(session: Session, json_path: str):
     session.commit()
     
     # 4. Events & Sequences
+    # Re-ingesting (a rewritten or re-scraped cache) replaces the match instead of appending to it;
+    # the deletes are committed together with the new events
+    clear_match(session, match.id)
     events_raw = data.get("events", [])
     
-    current_chain_id = 1
-    current_team_possession = None
-    
     home_goals = 0
     away_goals = 0
     
+    # Shots and completed passes are scored together once the event loop is done
+    pending_shots = []
+    pending_passes = []
+    # Fitted xT surface if one exists, else the distance-based placeholder
+    xt_surface = xt_model.load_surface()
+    
     for i, ev in enumerate(events_raw):
         ev_type = ev.get("type", {}).get("displayName", "Unknown")
         ev_outcome = ev.get("outcomeType", {}).get("displayName", "Successful")
         team_id = ev.get("teamId")
         player_id = ev.get("playerId")
         
-        # Determine Sequence (Possession Chain)
-        # Change chain if team changes or play stops (e.g. ball out, foul)
-        if team_id != current_team_possession and ev_outcome == "Successful":
-            if ev_type in ["Pass", "TakeOn", "Clearance", "Recovery", "Interception"]:
-                current_team_possession = team_id
-                current_chain_id += 1
-                
         # Qualifiers parsing
         quals = {q.get("type", {}).get("displayName", ""): q for q in ev.get("qualifiers", [])}
         
@@ -98,11 +107,6 @@ def parse_match_data(session: Session, json_path: str):
         is_big_chance = "BigChance" in quals
         is_penalty = ev_type == "Goal" and "Penalty" in quals or "Penalty" in quals
         
-        body_part = "Foot"
-        if "Head" in quals: body_part = "Header"
-        if "RightFoot" in quals: body_part = "Right Foot"
-        if "LeftFoot" in quals: body_part = "Left Foot"
-
         x = ev.get("x")
         y = ev.get("y")
         end_x = None
@@ -113,44 +117,16 @@ def parse_match_data(session: Session, json_path: str):
             if q.get("type", {}).get("displayName") == "PassEndY":
                 end_y = float(q.get("value", 0))
                 
-        # Metrics Calculation
+        # Metrics (xG, xT, pass flags) are filled in after the loop
         xg = None
         xt = None
-        is_final_third_pass = False
-        is_progressive_pass = False
-        
-        if is_shot and x is not None and y is not None:
-            xg = calculate_xg(float(x), float(y), is_penalty, is_big_chance, body_part)
-            
-        if ev_type == "Pass" and ev_outcome == "Successful" and x is not None and y is not None and end_x is not None and end_y is not None:
-            xt = calculate_xt(float(x), float(y), float(end_x), float(end_y))
-            
-            # Map coordinates to 120x80 scale
-            sx = float(x) * 1.20
-            sy = 80 - float(y) * 0.80
-            s_end_x = float(end_x) * 1.20
-            
-            # Category 2: Final Third Pass (ends in attacking 25%, > 80/120)
-            if s_end_x > 80.0:
-                is_final_third_pass = True
-                
-            # Category 3: Progressive Pass
-            # 1. Originates outside own 40% (x >= 48)
-            if sx >= 48.0:
-                distance_forward = s_end_x - sx
-                # 2. Distance threshold based on origin
-                if sx < 60.0:
-                    if distance_forward >= 30.0: is_progressive_pass = True
-                elif sx < 90.0:
-                    if distance_forward >= 15.0: is_progressive_pass = True
-                else:
-                    if distance_forward >= 10.0: is_progressive_pass = True
 
         db_event = Event(
             match_id=match.id,
             team_id=team_id,
             player_id=player_id,
             event_id=ev.get("eventId") or ev.get("id"),
+            period=ev.get("period", {}).get("value"),
             minute=ev.get("minute"),
             second=ev.get("second"),
             type_name=ev_type,
@@ -165,22 +141,112 @@ def parse_match_data(session: Session, json_path: str):
             under_pressure=under_pressure,
             is_big_chance=is_big_chance,
             is_penalty=is_penalty,
-            is_final_third_pass=is_final_third_pass,
-            is_progressive_pass=is_progressive_pass,
-            possession_chain_id=current_chain_id,
             qualifiers=ev.get("qualifiers")
         )
         session.add(db_event)
         
+        if is_shot and x is not None and y is not None:
+            pending_shots.append((db_event, ev))
+        if ev_type == "Pass" and ev_outcome == "Successful" and x is not None and y is not None and end_x is not None and end_y is not None:
+            pending_passes.append((db_event, float(x), float(y), end_x, end_y, is_through_ball(ev.get("qualifiers"))))
+        
+    if pending_shots:
+        shot_events, raw = zip(*pending_shots)
+        for db_event, xg in zip(shot_events, score_shots(shot_table(raw))):
+            db_event.xg = float(xg)
+            
+    if pending_passes:
+        pass_events, xs, ys, exs, eys, through = zip(*pending_passes)
+        if xt_surface is not None:
+            xts = xt_model.move_value(xt_surface, xs, ys, exs, eys).tolist()
+        else:
+            xts = [calculate_xt(*p) for p in zip(xs, ys, exs, eys)]
+        # Pass categories in StatsBomb 120x80 coordinates
+        sx, sy = ws_to_sb(xs, ys)
+        sex, sey = ws_to_sb(exs, eys)
+        flags = classify_passes(sx, sy, sex, sey, through)
+        for i, db_event in enumerate(pass_events):
+            db_event.xt = xts[i]
+            db_event.is_progressive_pass = bool(flags["progressive"][i])
+            db_event.is_final_third_pass = bool(flags["final_third"][i])
+            db_event.is_box_entry = bool(flags["box_entry"][i])
+            db_event.is_switch = bool(flags["switch"][i])
+            db_event.is_through_ball = bool(flags["through_ball"][i])
+        
     match.home_score = home_goals
     match.away_score = away_goals
     session.commit()
     
+    # Possession chains need the final xT / xG of every event
+    possessions.rebuild(session, match.id)
+    pressing.rebuild(session, match.id)
+    # Minutes need the lineups and period lengths, which only the raw payload has
+    per90.rebuild(session, match.id, data)
+    # Shot rows for the warm-started xG refit in refresh_models
+    xg_model.update_training(match.id, attach_understat(data, json_path))
+    
+    # Batch callers (pipeline.ingest, main) pass refresh=False and call refresh_models once
+    if refresh:
+        refresh_models(session, [match.id])
+    
     print(f"Match {match.id} loaded successfully. Found {len(events_raw)} events.")
+    return match.id
+
+
+def refresh_models(session: Session, match_ids):
+    """
+    Fold the matches into the xT counts and the xG refit, then build their series. Passes are
+    re-valued only if the surface moved, shots re-scored only if the refit saved a new version.
+    """
+    if not match_ids:
+        return
+    metrics = []
+    if xt_model.refresh(session, match_ids):
+        print(f"xT surface updated with {len(match_ids)} match(es).")
+        metrics.append("xt")
+    model_path = xg_model.refresh()
+    if model_path:
+        print(f"xG model refit with {len(match_ids)} match(es): {model_path}")
+        recompute_xg(session)
+        metrics.append("xg")
+    if metrics:
+        # Every stored pass or shot was re-valued, so every match's series, possessions and player totals are stale
+        series.rebuild_all(session)
+        possessions.rebuild_all(session)
+        per90.refresh_totals(session, metrics=metrics)
+    else:
+        for match_id in match_ids:
+            series.rebuild(session, match_id)
+
+
+def clear_match(session: Session, match_id):
+    """Drop a match's events and derived rows (and its xT counts) without committing."""
+    xt_model.remove_matches(session, [match_id])
+    for model in (Event, Possession, Pressing, PlayerMatch, MatchSeries):
+        session.query(model).filter(model.match_id == match_id).delete(synchronize_session=False)
+
+
+def recompute_xg(session: Session, match_ids=None):
+    """Re-score every stored shot (optionally limited to match_ids) in one vectorized pass, e.g. after training a new xG model."""
+    query = session.query(Event.id, Event.type_name, Event.x, Event.y, Event.qualifiers)\
+        .filter(Event.is_shot == True, Event.x.isnot(None), Event.y.isnot(None))
+    if match_ids:
+        query = query.filter(Event.match_id.in_(match_ids))
+    rows = query.all()
+    if not rows:
+        return 0
+    
+    ids = [r.id for r in rows]
+    raw = [{"type": {"displayName": r.type_name}, "x": r.x, "y": r.y, "qualifiers": r.qualifiers} for r in rows]
+    xg = score_shots(shot_table(raw))
+    session.bulk_update_mappings(Event, [{"id": i, "xg": float(v)} for i, v in zip(ids, xg)])
+    session.commit()
+    return len(ids)
 
 
 def main():
     Base.metadata.create_all(engine)
+    ensure_columns(engine)
     session = Session(bind=engine)
     
     if not os.path.exists(DATA_DIR):
@@ -193,14 +259,16 @@ def main():
     if not match_files:
         print(f"No match cache files found in {DATA_DIR}")
     else:
+        loaded = []
         for filename in match_files:
             file_path = os.path.join(DATA_DIR, filename)
             try:
                 print(f"Parsing {filename}...")
-                parse_match_data(session, file_path)
+                loaded.append(parse_match_data(session, file_path, refresh=False))
             except Exception as e:
                 print(f"Error parsing {filename}: {e}")
                 session.rollback()
+        refresh_models(session, loaded)
 
     session.close()
 
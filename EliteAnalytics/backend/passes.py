@@ -0,0 +1,162 @@
+"""
+Vectorized pass classification shared by ingest (parser) and rendering (generate_all_assets).
+
+All coordinates are StatsBomb 120x80 (see coords.py), attacking towards x=120. Every
+function works on whole arrays, so a match or a season is tagged in one call.
+
+    progressive    starts outside the own 40% (x >= 48) and gains at least 30 units
+                   (start in own half), 15 (start before x=90) or 10 (start from x=90)
+    final_third    enters the final third: starts before x=80 and ends at or beyond it
+    box_entry      ends in the opponent's penalty area having started outside it
+    switch         travels at least 40 units across the pitch (half its width)
+    through_ball   tagged Throughball by WhoScored
+
+The parser and the renderer used to implement the first two with different boundaries;
+`python -m EliteAnalytics.backend.passes` prints a parity report between those legacy
+definitions and this classifier over the cached matches.
+"""
+import os
+import glob
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+from EliteAnalytics.backend.coords import ws_to_sb
+from EliteAnalytics.backend.cache_io import read_cache
+
+PROGRESSIVE_MIN_X = 48.0
+# (start x below, minimum forward gain); the last band covers everything beyond
+PROGRESSIVE_BANDS = ((60.0, 30.0), (90.0, 15.0), (np.inf, 10.0))
+FINAL_THIRD_X = 80.0
+BOX_X, BOX_Y_MIN, BOX_Y_MAX = 102.0, 18.0, 62.0
+SWITCH_MIN_WIDTH = 40.0
+THROUGH_BALL_QUALIFIER = "Throughball"
+
+FLAGS = ("progressive", "final_third", "box_entry", "switch", "through_ball")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CACHE_DIR = os.path.join(_ROOT, "assets", "data")
+
+
+def _in_box(x, y):
+    return (x >= BOX_X) & (y >= BOX_Y_MIN) & (y <= BOX_Y_MAX)
+
+
+def progressive(x, end_x):
+    x = np.asarray(x, dtype=float)
+    gain = np.asarray(end_x, dtype=float) - x
+    bounds = np.array([b for b, _ in PROGRESSIVE_BANDS])
+    min_gain = np.array([g for _, g in PROGRESSIVE_BANDS])[np.searchsorted(bounds, x, side="right")]
+    return (x >= PROGRESSIVE_MIN_X) & (gain >= min_gain)
+
+
+def classify_passes(x, y, end_x, end_y, through_ball=False):
+    """Dict of boolean arrays (one per FLAGS entry) for passes given as StatsBomb arrays."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    end_x, end_y = np.asarray(end_x, dtype=float), np.asarray(end_y, dtype=float)
+    return {
+        "progressive": progressive(x, end_x),
+        "final_third": (x < FINAL_THIRD_X) & (end_x >= FINAL_THIRD_X),
+        "box_entry": _in_box(end_x, end_y) & ~_in_box(x, y),
+        "switch": np.abs(end_y - y) >= SWITCH_MIN_WIDTH,
+        "through_ball": np.broadcast_to(np.asarray(through_ball, dtype=bool), x.shape).copy(),
+    }
+
+
+def is_through_ball(qualifiers):
+    return any(q.get("type", {}).get("displayName") == THROUGH_BALL_QUALIFIER for q in qualifiers or [])
+
+
+def pass_frame(events):
+    """
+    WhoScored events -> DataFrame of passes with an end location, in StatsBomb coordinates,
+    tagged with every classifier flag. Keeps the event index and outcome for the caller.
+    """
+    rows = []
+    for i, ev in enumerate(events):
+        if ev.get("type", {}).get("displayName") != "Pass":
+            continue
+        end_x, end_y = ev.get("endX"), ev.get("endY")
+        if end_x is None or end_y is None or ev.get("x") is None or ev.get("y") is None:
+            continue
+        rows.append((i, ev.get("teamId"), ev.get("outcomeType", {}).get("displayName", ""),
+                     ev["x"], ev["y"], float(end_x), float(end_y), is_through_ball(ev.get("qualifiers"))))
+    df = pd.DataFrame(rows, columns=["index", "team_id", "outcome", "x", "y", "end_x", "end_y", "through_ball"])
+    if df.empty:
+        for flag in FLAGS:
+            df[flag] = pd.Series(dtype=bool)
+        return df
+    df["x"], df["y"] = ws_to_sb(df["x"], df["y"])
+    df["end_x"], df["end_y"] = ws_to_sb(df["end_x"], df["end_y"])
+    for flag, values in classify_passes(df["x"], df["y"], df["end_x"], df["end_y"], df["through_ball"]).items():
+        df[flag] = values
+    return df
+
+
+# ---------------------------------------------------------------------------
+# Parity report against the two definitions this classifier replaced
+# ---------------------------------------------------------------------------
+def _legacy_parser(x, end_x):
+    """parser.parse_match_data before the shared classifier: bands split at x<60 / x<90."""
+    gain = end_x - x
+    prog = (x >= 48) & (((x < 60) & (gain >= 30)) | ((x >= 60) & (x < 90) & (gain >= 15)) | ((x >= 90) & (gain >= 10)))
+    return prog, end_x > 80.0
+
+
+def _legacy_renderer(x, end_x):
+    """generate_all_assets._passmap_df before the shared classifier: bands split at x<60 / x<=90."""
+    gain = end_x - x
+    prog = (x >= 48) & (((x < 60) & (gain >= 30)) | ((x >= 60) & (x <= 90) & (gain >= 15)) | ((x > 90) & (gain >= 10)))
+    return prog, (x < 80) & (end_x >= 80)
+
+
+def parity_report(cache_files=None):
+    """Counts of completed passes flagged by each definition and where they disagree."""
+    if cache_files is None:
+        cache_files = sorted(glob.glob(os.path.join(CACHE_DIR, "match_*_cache.json")))
+    frames = []
+    for path in cache_files:
+        frames.append(pass_frame(read_cache(path).get("events", [])))
+    df = pd.concat(frames, ignore_index=True) if frames else pass_frame([])
+    df = df[df["outcome"] == "Successful"]
+    x, end_x = df["x"].to_numpy(), df["end_x"].to_numpy()
+
+    parser_prog, parser_ft = _legacy_parser(x, end_x)
+    render_prog, render_ft = _legacy_renderer(x, end_x)
+    shared_prog, shared_ft = df["progressive"].to_numpy(), df["final_third"].to_numpy()
+
+    def compare(a, b):
+        return {"both": int((a & b).sum()), "only_first": int((a & ~b).sum()), "only_second": int((~a & b).sum())}
+
+    return {
+        "matches": len(cache_files),
+        "completed_passes": int(len(df)),
+        "progressive": {
+            "parser": int(parser_prog.sum()), "renderer": int(render_prog.sum()), "shared": int(shared_prog.sum()),
+            "parser_vs_renderer": compare(parser_prog, render_prog),
+            "parser_vs_shared": compare(parser_prog, shared_prog),
+            "renderer_vs_shared": compare(render_prog, shared_prog),
+        },
+        "final_third": {
+            "parser": int(parser_ft.sum()), "renderer": int(render_ft.sum()), "shared": int(shared_ft.sum()),
+            "parser_vs_renderer": compare(parser_ft, render_ft),
+            "parser_vs_shared": compare(parser_ft, shared_ft),
+            "renderer_vs_shared": compare(render_ft, shared_ft),
+        },
+        "other_flags": {flag: int(df[flag].sum()) for flag in ("box_entry", "switch", "through_ball")},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parity report between the legacy pass definitions and the shared classifier.")
+    parser.add_argument("--matches", default=None, help="Comma-separated match ids (default: every cached match)")
+    args = parser.parse_args(argv)
+    files = None
+    if args.matches:
+        files = [os.path.join(CACHE_DIR, f"match_{m.strip()}_cache.json") for m in args.matches.split(",")]
+    print(json.dumps(parity_report(files), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Minutes played and per-90 player metrics.
+
+Minutes come from the raw WhoScored match payload: starters (isFirstEleven) are on from kick-off,
+SubstitutionOn / SubstitutionOff events and red cards (Red, SecondYellow) open and close a
+player's interval, and periodEndMinutes gives the real length of every period including stoppage
+time. Match clock times are converted to elapsed playing time, so a first-half stoppage-time
+substitution is not double counted with the start of the second half.
+
+One row per player and match is stored in player_matches with the minutes and the metric totals
+(rolled up from the events table in one groupby), so a season per-90 table is a grouped sum.
+"""
+import argparse
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+
+from EliteAnalytics.backend.database import Event, Match, Player, PlayerMatch, Team
+from EliteAnalytics.backend.cache_io import read_cache
+
+RED_CARDS = ("Red", "SecondYellow")
+# Match-clock minute each period starts at
+PERIOD_START = {1: 0, 2: 45, 3: 90, 4: 105}
+DEFENSIVE_TYPES = ("Tackle", "Interception", "BlockedPass", "Clearance", "BallRecovery")
+SHOT_TYPES = ("MissedShots", "SavedShot", "ShotOnPost", "Goal")
+
+METRICS = ("xg", "xt", "shots", "goals", "passes", "completed_passes", "progressive_passes", "take_ons",
+           "defensive_actions")
+MIN_MINUTES = 270
+
+
+def _period(ev):
+    period = ev.get("period")
+    return period.get("value") if isinstance(period, dict) else period
+
+
+def period_bounds(data):
+    """{period: (clock start, clock end, elapsed minutes before it)} for the periods played."""
+    ends = {int(p): float(m) for p, m in (data.get("periodEndMinutes") or {}).items() if int(p) in PERIOD_START}
+    if not ends:
+        ends = {1: 45.0, 2: 90.0}
+    bounds, elapsed = {}, 0.0
+    for p in sorted(ends):
+        start = PERIOD_START[p]
+        bounds[p] = (start, max(ends[p], start), elapsed)
+        elapsed += max(ends[p], start) - start
+    return bounds
+
+
+def elapsed_minutes(bounds, period, minute, second=0):
+    """Match clock (period, minute, second) -> minutes of play since kick-off."""
+    if period not in bounds:
+        period = max(bounds)
+    start, end, before = bounds[period]
+    clock = min(max(minute + (second or 0) / 60.0, start), end)
+    return before + clock - start
+
+
+def resolve_minutes(data):
+    """
+    {player_id: {"team_id", "started", "minute_on", "minute_off", "minutes"}} for every player who
+    took part, from a raw WhoScored match payload. minute_on / minute_off are elapsed minutes.
+    """
+    bounds = period_bounds(data)
+    total = sum(end - start for start, end, _ in bounds.values())
+    on, off, team, started = {}, {}, {}, set()
+
+    for side in ("home", "away"):
+        for p in data.get(side, {}).get("players", []):
+            if p.get("isFirstEleven"):
+                on[p["playerId"]] = 0.0
+                team[p["playerId"]] = data[side].get("teamId")
+                started.add(p["playerId"])
+
+    for ev in data.get("events", []):
+        kind = ev.get("type", {}).get("displayName")
+        pid = ev.get("playerId")
+        if pid is None:
+            continue
+        sent_off = kind == "Card" and (ev.get("cardType") or {}).get("displayName") in RED_CARDS
+        if kind not in ("SubstitutionOn", "SubstitutionOff") and not sent_off:
+            continue
+        t = elapsed_minutes(bounds, _period(ev) or 1, ev.get("minute", 0), ev.get("second", 0))
+        team.setdefault(pid, ev.get("teamId"))
+        if kind == "SubstitutionOn":
+            on.setdefault(pid, t)
+        else:
+            off[pid] = min(off.get(pid, total), t)
+
+    out = {}
+    for pid, t_on in on.items():
+        t_off = max(off.get(pid, total), t_on)
+        out[pid] = {"team_id": team.get(pid), "started": pid in started,
+                    "minute_on": round(t_on, 2), "minute_off": round(t_off, 2), "minutes": round(t_off - t_on, 2)}
+    return out
+
+
+def rollup(session, match_id):
+    """Metric totals per player for one match, from the stored events (one vectorized groupby)."""
+    query = session.query(Event.player_id, Event.team_id, Event.type_name, Event.outcome, Event.xg, Event.xt,
+                          Event.is_progressive_pass)\
+        .filter(Event.match_id == match_id, Event.player_id.isnot(None))
+    df = pd.read_sql(query.statement, session.bind)
+    ok = df["outcome"] == "Successful"
+    is_pass = df["type_name"] == "Pass"
+    is_shot = df["type_name"].isin(SHOT_TYPES)
+    df = df.assign(
+        xg=df["xg"].where(is_shot, 0).fillna(0),
+        xt=df["xt"].fillna(0),
+        shots=is_shot,
+        goals=df["type_name"] == "Goal",
+        passes=is_pass,
+        completed_passes=is_pass & ok,
+        progressive_passes=df["is_progressive_pass"].fillna(False).astype(bool),
+        take_ons=(df["type_name"] == "TakeOn") & ok,
+        defensive_actions=df["type_name"].isin(DEFENSIVE_TYPES) & ok,
+    )
+    totals = df.groupby("player_id")[list(METRICS)].sum()
+    totals["team_id"] = df.groupby("player_id")["team_id"].first()
+    return totals
+
+
+def rebuild(session, match_id, data):
+    """Store minutes and metric totals of every player in one match. `data` is the raw match payload."""
+    minutes = resolve_minutes(data)
+    totals = rollup(session, match_id)
+    session.query(PlayerMatch).filter(PlayerMatch.match_id == match_id).delete()
+    rows = []
+    for pid in set(minutes) | set(totals.index):
+        m = minutes.get(pid, {})
+        t = totals.loc[pid] if pid in totals.index else None
+        row = {"match_id": match_id, "player_id": int(pid),
+               "team_id": m.get("team_id") if m.get("team_id") is not None else int(t["team_id"]),
+               "started": m.get("started", False), "minute_on": m.get("minute_on"),
+               "minute_off": m.get("minute_off"), "minutes": m.get("minutes", 0.0)}
+        for metric in METRICS:
+            row[metric] = float(t[metric]) if t is not None else 0.0
+        rows.append(row)
+    session.bulk_insert_mappings(PlayerMatch, rows)
+    session.commit()
+    return len(rows)
+
+
+def refresh_totals(session, match_ids=None, metrics=("xt",)):
+    """
+    Re-sum stored metric totals from the events, e.g. xT after the surface re-valued every pass.
+    Minutes are kept, so the raw payload is not needed. Returns the number of rows updated.
+    """
+    if match_ids is None:
+        match_ids = [m for (m,) in session.query(Match.id).all()]
+    updates = []
+    for match_id in match_ids:
+        totals = rollup(session, match_id)
+        rows = session.query(PlayerMatch.id, PlayerMatch.player_id).filter(PlayerMatch.match_id == match_id)
+        for row_id, pid in rows:
+            updates.append({"id": row_id, **{m: float(totals.at[pid, m]) if pid in totals.index else 0.0
+                                             for m in metrics}})
+    session.bulk_update_mappings(PlayerMatch, updates)
+    session.commit()
+    return len(updates)
+
+
+def per90(totals, minutes):
+    """Per-90 rates; 0 where no minutes were played."""
+    minutes = np.asarray(minutes, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(minutes > 0, np.asarray(totals, dtype=float) * 90.0 / minutes, 0.0)
+
+
+def match_table(session, match_id):
+    """Per-player rows of one match with totals and per-90 rates."""
+    rows = session.query(PlayerMatch, Player.name, Team.name.label("team_name"))\
+        .join(Player, PlayerMatch.player_id == Player.id)\
+        .join(Team, PlayerMatch.team_id == Team.id)\
+        .filter(PlayerMatch.match_id == match_id).all()
+    out = []
+    for pm, name, team_name in rows:
+        row = {"player": name, "team": team_name, "started": pm.started, "minutes": round(pm.minutes or 0, 1)}
+        for metric in METRICS:
+            value = getattr(pm, metric) or 0
+            row[metric] = round(value, 3)
+            row[f"{metric}_p90"] = round(float(per90(value, pm.minutes or 0)), 3)
+        out.append(row)
+    return sorted(out, key=lambda r: (-r["minutes"], r["player"]))
+
+
+def season_table(session, min_minutes=MIN_MINUTES, sort="xt_p90", team_id=None, limit=100):
+    """Season totals and per-90 rates per player: a grouped sum over player_matches."""
+    query = session.query(
+        PlayerMatch.player_id, Player.name, Team.name.label("team_name"),
+        func.count(PlayerMatch.match_id).label("matches"),
+        func.sum(PlayerMatch.minutes).label("minutes"),
+        *[func.sum(getattr(PlayerMatch, m)).label(m) for m in METRICS]
+    ).join(Player, PlayerMatch.player_id == Player.id)\
+     .join(Team, Player.team_id == Team.id)\
+     .group_by(PlayerMatch.player_id)\
+     .having(func.sum(PlayerMatch.minutes) >= min_minutes)
+    if team_id is not None:
+        query = query.filter(PlayerMatch.team_id == team_id)
+    df = pd.DataFrame(query.all())
+    if df.empty:
+        return []
+    for metric in METRICS:
+        df[f"{metric}_p90"] = per90(df[metric], df["minutes"]).round(3)
+    df["minutes"] = df["minutes"].round(0).astype(int)
+    df = df.sort_values(sort if sort in df.columns else "xt_p90", ascending=False).head(limit)
+    return df.rename(columns={"name": "player", "team_name": "team"}).drop(columns="player_id").round(3).to_dict("records")
+
+
+def main(argv=None):
+    import os
+    from EliteAnalytics.backend.database import get_session, init_db
+    from EliteAnalytics.backend.passes import CACHE_DIR
+    parser = argparse.ArgumentParser(description="Rebuild player minutes and per-90 rollups from the cached matches.")
+    parser.add_argument("--matches", default=None, help="Comma-separated match ids (default: every stored match)")
+    args = parser.parse_args(argv)
+    init_db()
+    session = get_session()
+    if args.matches:
+        match_ids = [int(m) for m in args.matches.split(",")]
+    else:
+        match_ids = [m for (m,) in session.query(Match.id).all()]
+    done = 0
+    for match_id in match_ids:
+        path = os.path.join(CACHE_DIR, f"match_{match_id}_cache.json")
+        if not os.path.exists(path):
+            print(f"No cache for match {match_id}, skipped.")
+            continue
+        rebuild(session, match_id, read_cache(path))
+        done += 1
+    print(f"Rebuilt player minutes for {done} matches.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+In-process ETL for newly scraped matches.
+
+    from EliteAnalytics.backend import pipeline
+    pipeline.process(["1968936"])    # ingest, then render if PREGENERATE_ASSETS=1
+
+The scraper daemon and the cache watcher used to spawn `python parser.py` and
+`python generate_all_assets.py` per new match, paying the pandas / SQLAlchemy / matplotlib
+imports every time and re-parsing every cached match. Here
+    - ingest(match_ids) parses only the given cache files into the database, on one long-lived
+      session factory (SQLite has a single writer, so ingest is serialized by a lock), and
+      refreshes the xT surface once for the whole batch,
+    - render(match_ids) renders only those matches' assets on a process pool that is started
+      once and kept warm, so workers import matplotlib/mplsoccer a single time,
+    - submit(match_ids) runs both on a background thread and returns a Future.
+"""
+import os
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The parser's folder first, then the scraper daemon's output folder
+CACHE_DIRS = (os.path.join(_ROOT, "assets", "data"), os.path.join(_ROOT, "data"))
+
+# Dashboard maps are rendered lazily by the API on first view; set PREGENERATE_ASSETS=1 to batch-render after ingest
+PREGENERATE_ASSETS = os.environ.get("PREGENERATE_ASSETS", "0") == "1"
+
+_ingest_lock = threading.Lock()
+_db_ready = False
+_render_pool = None
+_render_lock = threading.Lock()
+# Background runs of submit(): one at a time, in arrival order
+_runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline")
+
+
+def cache_path(match_id):
+    """The match's cache file, or None when no cache folder has it."""
+    for folder in CACHE_DIRS:
+        path = os.path.join(folder, f"match_{match_id}_cache.json")
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _ensure_db():
+    global _db_ready
+    if not _db_ready:
+        from EliteAnalytics.backend.database import engine, Base, ensure_columns
+        Base.metadata.create_all(engine)
+        ensure_columns(engine)
+        _db_ready = True
+
+
+def ingest(match_ids, bind=None):
+    """Parse the given matches' cache files into the database. Returns the ids that loaded."""
+    from sqlalchemy.orm import Session
+    from EliteAnalytics.backend.database import engine
+    from EliteAnalytics.backend.parser import parse_match_data, refresh_models
+
+    loaded, match_pks = [], []
+    with _ingest_lock:
+        if bind is None:
+            _ensure_db()
+        session = Session(bind=bind or engine)
+        try:
+            for match_id in match_ids:
+                path = cache_path(match_id)
+                if path is None:
+                    print(f"[{match_id}] No cache file to ingest.")
+                    continue
+                try:
+                    match_pks.append(parse_match_data(session, path, refresh=False))
+                    loaded.append(str(match_id))
+                except Exception as e:
+                    print(f"[{match_id}] Ingest failed: {e}")
+                    session.rollback()
+            # One xT refresh (and at most one re-score) per batch, not per match
+            refresh_models(session, match_pks)
+        finally:
+            session.close()
+    return loaded
+
+
+def _render_worker_init(formats, scales):
+    # Paid once per worker, not once per match
+    import generate_all_assets
+    generate_all_assets.configure_output(formats, scales)
+
+
+def render_pool():
+    """The warm render pool, started on first use and reused for the life of the process."""
+    global _render_pool
+    with _render_lock:
+        if _render_pool is None:
+            import generate_all_assets
+            _render_pool = ProcessPoolExecutor(
+                max_workers=generate_all_assets.default_workers(),
+                initializer=_render_worker_init,
+                initargs=(generate_all_assets.OUTPUT_FORMATS, generate_all_assets.OUTPUT_SCALES),
+            )
+        return _render_pool
+
+
+def render(match_ids, kinds=None):
+    """Render the dashboard assets of the given matches. Returns the report entries."""
+    import generate_all_assets
+    files = [p for p in (cache_path(m) for m in match_ids) if p]
+    tasks = generate_all_assets.build_tasks(files, kinds)
+    if not tasks:
+        return []
+    pool = render_pool()
+    entries = []
+    for fut in as_completed([pool.submit(generate_all_assets.render_task, t) for t in tasks]):
+        entry = fut.result()
+        if entry["status"] == "failed":
+            print(f"Failed {entry['match_id']} [{entry['kind']}/{entry['side']}]: {entry['error']}")
+        entries.append(entry)
+    return entries
+
+
+def process(match_ids, render_assets=None):
+    """ingest() then, when PREGENERATE_ASSETS (or `render_assets`) is set, render() the loaded matches."""
+    match_ids = [str(m) for m in match_ids]
+    print(f">>> Ingesting {len(match_ids)} match(es)...")
+    loaded = ingest(match_ids)
+    if loaded and (PREGENERATE_ASSETS if render_assets is None else render_assets):
+        print(f">>> Rendering assets for {len(loaded)} match(es)...")
+        render(loaded)
+    print(">>> Pipeline Complete!")
+    return loaded
+
+
+def submit(match_ids, render_assets=None):
+    """process() on the background pipeline thread; returns its Future."""
+    return _runner.submit(process, list(match_ids), render_assets)
+
+
+def shutdown():
+    global _render_pool
+    _runner.shutdown(wait=True)
+    with _render_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown()
+            _render_pool = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest (and optionally render) specific matches in-process.")
+    parser.add_argument("match_ids", nargs="+", help="Match ids with a cache file")
+    parser.add_argument("--render", action="store_true", help="Also render their dashboard assets")
+    args = parser.parse_args(argv)
+    try:
+        process(args.match_ids, render_assets=args.render or None)
+    finally:
+        shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Possession-chain engine.
+
+Segments a match's events into possession chains and aggregates each chain in
+vectorized pandas passes. A new chain starts when
+    - the team in possession changes (only on-ball actions establish possession,
+      so an opponent's tackle or aerial duel does not end a chain on its own),
+    - the period changes,
+    - play was stopped since the previous in-play event (foul, card, offside, goal,
+      substitution, ...),
+    - or the event restarts play from a set piece (throw-in, corner, free kick, goal kick).
+
+Chain ids are written back to events.possession_chain_id and one row per chain is stored
+in the possessions table, so sequence queries ("build-ups ending in a shot") are indexed
+lookups instead of event-table rescans.
+"""
+import numpy as np
+import pandas as pd
+
+from EliteAnalytics.backend.database import Event, Match, Possession
+from EliteAnalytics.backend.coords import ws_to_sb_x
+
+# On-ball actions: the acting team has the ball
+POSSESSION_TYPES = (
+    "Pass", "TakeOn", "BallTouch", "BallRecovery", "Interception", "KeeperPickup", "Claim",
+    "Clearance", "Dispossessed", "OffsidePass", "MissedShots", "SavedShot", "ShotOnPost", "Goal",
+)
+SHOT_TYPES = ("MissedShots", "SavedShot", "ShotOnPost", "Goal")
+# Play is dead after these
+STOPPAGE_TYPES = (
+    "Foul", "Card", "OffsideGiven", "CornerAwarded", "Goal", "End", "Start",
+    "SubstitutionOff", "SubstitutionOn", "FormationChange", "FormationSet", "PenaltyFaced",
+)
+# Bookkeeping events that never belong to a chain
+NON_PLAY_TYPES = ("Start", "End", "FormationSet", "FormationChange", "SubstitutionOff", "SubstitutionOn", "Card")
+SET_PIECE_QUALIFIERS = {"ThrowIn", "CornerTaken", "FreekickTaken", "IndirectFreekickTaken", "GoalKick", "Penalty"}
+
+
+def _set_piece(qualifiers):
+    return any(q.get("type", {}).get("displayName") in SET_PIECE_QUALIFIERS for q in qualifiers or [])
+
+
+def load_events(session, match_id):
+    query = session.query(Event.id, Event.team_id, Event.type_name, Event.outcome, Event.period,
+                          Event.minute, Event.second, Event.x, Event.y, Event.xt, Event.xg, Event.qualifiers)\
+        .filter(Event.match_id == match_id).order_by(Event.id)
+    df = pd.read_sql(query.statement, session.bind)
+    df["set_piece"] = [_set_piece(q) for q in df["qualifiers"]]
+    return df.drop(columns="qualifiers")
+
+
+def segment(df):
+    """
+    Chain number (1..n) for every event of one match, given in chronological order.
+    Bookkeeping events inherit the chain around them.
+    """
+    if df.empty:
+        return np.zeros(0, dtype=int)
+    period = df["period"].fillna(0).to_numpy()
+    in_play = ~df["type_name"].isin(NON_PLAY_TYPES).to_numpy()
+
+    # Team in possession: set by on-ball actions, carried forward within the period
+    owner = df["team_id"].where(df["type_name"].isin(POSSESSION_TYPES))
+    owner = owner.where(in_play).groupby(period).transform(lambda s: s.ffill().bfill())
+
+    # Stoppages seen since the previous in-play event
+    stops = np.cumsum(df["type_name"].isin(STOPPAGE_TYPES).to_numpy())
+    play_idx = np.flatnonzero(in_play)
+    stops_before = stops[play_idx] - df["type_name"].iloc[play_idx].isin(STOPPAGE_TYPES).to_numpy()
+    stopped = np.r_[True, stops_before[1:] != stops[play_idx[:-1]]] if len(play_idx) else np.zeros(0, bool)
+
+    o = owner.to_numpy()[play_idx]
+    p = period[play_idx]
+    new_chain = stopped | np.r_[True, (o[1:] != o[:-1]) & ~(pd.isna(o[1:]) & pd.isna(o[:-1]))] \
+        | np.r_[True, p[1:] != p[:-1]] | df["set_piece"].to_numpy()[play_idx]
+
+    chain = np.full(len(df), np.nan)
+    chain[play_idx] = np.cumsum(new_chain)
+    return pd.Series(chain).ffill().bfill().fillna(0).astype(int).to_numpy()
+
+
+def summarise(df, chain):
+    """One row per chain with its aggregates (vectorized groupby)."""
+    df = df.assign(chain=chain)
+    play = df[~df["type_name"].isin(NON_PLAY_TYPES)].copy()
+    if play.empty:
+        return pd.DataFrame()
+    owned = play["type_name"].isin(POSSESSION_TYPES)
+    play["owner"] = play["team_id"].where(owned).groupby(play["chain"]).transform(lambda s: s.ffill().bfill())
+    play["t"] = play["minute"].fillna(0) * 60 + play["second"].fillna(0)
+    play["sb_x"] = ws_to_sb_x(play["x"])
+    mine = play["team_id"] == play["owner"]
+    play["is_pass"] = mine & (play["type_name"] == "Pass")
+    play["is_complete"] = play["is_pass"] & (play["outcome"] == "Successful")
+    play["is_shot"] = mine & play["type_name"].isin(SHOT_TYPES)
+    play["is_goal"] = mine & (play["type_name"] == "Goal")
+    play["own_xt"] = play["xt"].where(mine, 0).fillna(0)
+    play["own_xg"] = play["xg"].where(play["is_shot"], 0).fillna(0)
+    play["own_x"] = play["sb_x"].where(mine)
+
+    g = play.groupby("chain", sort=True)
+    out = pd.DataFrame({
+        "team_id": g["owner"].first(),
+        "period": g["period"].first(),
+        "start_minute": g["minute"].first(),
+        "start_second": g["second"].first(),
+        "duration": g["t"].max() - g["t"].min(),
+        "n_events": g.size(),
+        "passes": g["is_pass"].sum(),
+        "completed_passes": g["is_complete"].sum(),
+        "start_x": g["own_x"].first(),
+        "end_x": g["own_x"].last(),
+        "xt_gained": g["own_xt"].sum().round(4),
+        "shots": g["is_shot"].sum(),
+        "xg": g["own_xg"].sum().round(3),
+        "ends_in_goal": g["is_goal"].any(),
+        "start_type": g["type_name"].first(),
+        "end_type": g["type_name"].last(),
+        "from_set_piece": g["set_piece"].first(),
+    })
+    out["vertical_progress"] = (out["end_x"] - out["start_x"]).round(2)
+    # Only when the team's last on-ball action of the chain is the shot, not a shot anywhere in it
+    last_action = play[mine & play["type_name"].isin(POSSESSION_TYPES)].groupby("chain")["type_name"].last()
+    out["ends_in_shot"] = last_action.reindex(out.index).isin(SHOT_TYPES)
+    for col in ("team_id", "period", "start_minute", "start_second"):
+        out[col] = out[col].astype("Int64")
+    return out.reset_index().rename(columns={"chain": "chain_id"})
+
+
+def rebuild_all(session):
+    """Rebuild the possessions of every stored match, e.g. after their events were re-valued."""
+    match_ids = [m for (m,) in session.query(Match.id).all()]
+    for match_id in match_ids:
+        rebuild(session, match_id)
+    return len(match_ids)
+
+
+def rebuild(session, match_id):
+    """Segment one stored match, write chain ids back to its events and replace its possessions."""
+    df = load_events(session, match_id)
+    chain = segment(df)
+    session.bulk_update_mappings(Event, [{"id": int(i), "possession_chain_id": int(c)}
+                                         for i, c in zip(df["id"], chain)])
+    session.query(Possession).filter(Possession.match_id == match_id).delete()
+
+    chains = summarise(df, chain)
+    records = chains.astype(object).where(chains.notna(), None).to_dict("records")
+    session.bulk_insert_mappings(Possession, [dict(r, match_id=match_id) for r in records])
+    session.commit()
+    return len(records)
@@ -0,0 +1,137 @@
+"""
+Pressing metrics per team and match, computed at ingest after the possession chains.
+
+    ppda                   opponent passes in their own 60% of the pitch divided by the team's
+                           defensive actions (tackles, interceptions, challenges, fouls committed)
+                           in its attacking 60%, i.e. the same zone seen from the other end
+    high_turnovers         open-play possessions won by the team starting within 40 m of the
+                           opponent's goal (the team's first on-ball action at x >= 76.3)
+    high_turnover_shots    those of them ending in a shot
+    possession_losses      open-play chains of the team followed by an opponent chain
+    counterpress_regains   losses the team won back in open play within COUNTERPRESS_SECONDS
+
+Events are loaded once per match as arrays in StatsBomb coordinates (see coords.py), so every
+zone predicate is a vectorized comparison; a match takes a few milliseconds.
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+from EliteAnalytics.backend.database import Event, Match, Possession, Pressing
+from EliteAnalytics.backend.coords import ws_to_sb_x, SB_LENGTH
+
+DEFENSIVE_ACTIONS = ("Tackle", "Interception", "Challenge", "Foul")
+# Share of the pitch, measured from the team in possession's own goal line
+PPDA_ZONE = 0.6
+PPDA_BUILD_UP_X = SB_LENGTH * PPDA_ZONE           # opponent passes below this x (their frame)
+PPDA_PRESS_X = SB_LENGTH * (1 - PPDA_ZONE)        # defensive actions at or beyond this x (own frame)
+# 40 m from goal in StatsBomb yards
+HIGH_TURNOVER_X = SB_LENGTH - 40 / 0.9144
+COUNTERPRESS_SECONDS = 5.0
+
+FIELDS = ("ppda", "opponent_passes", "defensive_actions", "high_turnovers", "high_turnover_shots",
+          "possession_losses", "counterpress_regains")
+
+
+def load_events(session, match_id):
+    query = session.query(Event.team_id, Event.type_name, Event.outcome, Event.x)\
+        .filter(Event.match_id == match_id, Event.x.isnot(None))
+    df = pd.read_sql(query.statement, session.bind)
+    df["sb_x"] = ws_to_sb_x(df["x"])
+    return df
+
+
+def load_chains(session, match_id):
+    query = session.query(Possession.chain_id, Possession.team_id, Possession.period, Possession.start_minute,
+                          Possession.start_second, Possession.duration, Possession.start_x,
+                          Possession.from_set_piece, Possession.ends_in_shot)\
+        .filter(Possession.match_id == match_id).order_by(Possession.chain_id)
+    return pd.read_sql(query.statement, session.bind)
+
+
+def ppda(events, team_id, opponent_id):
+    """(ppda, opponent passes, defensive actions) for the pressing team."""
+    team = events["team_id"].to_numpy()
+    kind = events["type_name"].to_numpy()
+    sb_x = events["sb_x"].to_numpy()
+    passes = int(((team == opponent_id) & (kind == "Pass") & (sb_x < PPDA_BUILD_UP_X)).sum())
+    # Foul events come in pairs: the committing side is the Unsuccessful one
+    committed = (kind != "Foul") | (events["outcome"].to_numpy() == "Unsuccessful")
+    actions = int(((team == team_id) & np.isin(kind, DEFENSIVE_ACTIONS) & committed & (sb_x >= PPDA_PRESS_X)).sum())
+    return (round(passes / actions, 2) if actions else None), passes, actions
+
+
+def turnovers(chains, team_id):
+    """High turnovers, those ending in a shot, possession losses and counter-press regains for one team."""
+    chains = chains[chains["team_id"].notna()]
+    owner = chains["team_id"].to_numpy()
+    period = chains["period"].to_numpy()
+    open_play = ~chains["from_set_piece"].fillna(False).astype(bool).to_numpy()
+    start = (chains["start_minute"].fillna(0) * 60 + chains["start_second"].fillna(0)).to_numpy(dtype=float)
+    end = start + chains["duration"].fillna(0).to_numpy(dtype=float)
+
+    # Chain i was won from the opponent: the previous chain in the period belonged to them
+    won = np.r_[False, (owner[1:] != owner[:-1]) & (period[1:] == period[:-1])]
+    high = (owner == team_id) & won & open_play & (chains["start_x"].to_numpy(dtype=float) >= HIGH_TURNOVER_X)
+
+    # Loss: team chain followed by an opponent chain started in open play (not a restart)
+    lost = np.r_[(owner[:-1] == team_id) & (owner[1:] != team_id) & (period[1:] == period[:-1]) & open_play[1:], False]
+    # Regain: the chain after the opponent's is the team's again, in open play, soon after the loss
+    regain = np.zeros(len(chains), dtype=bool)
+    if len(chains) > 2:
+        regain[:-2] = lost[:-2] & (owner[2:] == team_id) & (period[2:] == period[:-2]) & open_play[2:] \
+            & (start[2:] - end[:-2] <= COUNTERPRESS_SECONDS)
+    return {
+        "high_turnovers": int(high.sum()),
+        "high_turnover_shots": int((high & chains["ends_in_shot"].fillna(False).astype(bool).to_numpy()).sum()),
+        "possession_losses": int(lost.sum()),
+        "counterpress_regains": int(regain.sum()),
+    }
+
+
+def compute(events, chains, team_id, opponent_id):
+    value, passes, actions = ppda(events, team_id, opponent_id)
+    return dict(turnovers(chains, team_id), ppda=value, opponent_passes=passes, defensive_actions=actions)
+
+
+def rebuild(session, match_id):
+    """Recompute and store the pressing rows of one match (needs its possessions)."""
+    match = session.query(Match).filter(Match.id == match_id).first()
+    if match is None:
+        return None
+    events, chains = load_events(session, match_id), load_chains(session, match_id)
+    session.query(Pressing).filter(Pressing.match_id == match_id).delete()
+    rows = {}
+    for team_id, opponent_id in ((match.home_team_id, match.away_team_id), (match.away_team_id, match.home_team_id)):
+        rows[team_id] = compute(events, chains, team_id, opponent_id)
+        session.add(Pressing(match_id=match_id, team_id=team_id, **rows[team_id]))
+    session.commit()
+    return rows
+
+
+def load(session, match_id):
+    """{team_id: {field: value}} for one match, or None if not computed."""
+    rows = session.query(Pressing).filter(Pressing.match_id == match_id).all()
+    if not rows:
+        return None
+    return {r.team_id: {f: getattr(r, f) for f in FIELDS} for r in rows}
+
+
+def main(argv=None):
+    from EliteAnalytics.backend.database import get_session, init_db
+    parser = argparse.ArgumentParser(description="Recompute the stored pressing metrics.")
+    parser.add_argument("--matches", default=None, help="Comma-separated match ids (default: every match)")
+    args = parser.parse_args(argv)
+    init_db()
+    session = get_session()
+    if args.matches:
+        match_ids = [int(m) for m in args.matches.split(",")]
+    else:
+        match_ids = [m for (m,) in session.query(Match.id).all()]
+    for match_id in match_ids:
+        rebuild(session, match_id)
+    print(f"Rebuilt pressing metrics for {len(match_ids)} matches.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Concurrent, polite scheduling of scrape jobs.
+
+    limiter = HostLimiter(rate_per_min=4, burst=1, jitter=3.0)
+    report = run_jobs(match_ids, task, host="www.whoscored.com", workers=2,
+                      limiter=limiter, checkpoint=Checkpoint(path))
+
+`task(match_id)` does the actual fetch (one browser tab / pooled driver, or a plain HTTP GET)
+and returns True when the match was stored, False when it is not available yet. It raises
+Blocked when the site pushed back (Cloudflare challenge, 403/429); those jobs are retried with
+exponential backoff and jitter, and a block also pauses the whole host for a while so the
+other workers do not keep hammering it.
+
+Every request goes through a per-host token bucket, so the politeness budget (requests per
+minute) holds however many workers run. Completed ids are written to the checkpoint file
+as they finish, so an interrupted backfill resumes where it stopped.
+"""
+import os
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+RATE_PER_MIN = 4.0 # The old fixed 15 s gap
+BURST = 1
+JITTER = 3.0 # Seconds of random extra delay per request
+RETRIES = 3
+BACKOFF = 30.0 # Seconds before the first retry, doubled on every further one
+BLOCK_COOLDOWN = 60.0 # Seconds a host is paused after a block
+
+
+class Blocked(Exception):
+    """The site refused the request (challenge page, 403, 429): retry later."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate_per_min` tokens a minute, at most `burst` saved up."""
+
+    def __init__(self, rate_per_min=RATE_PER_MIN, burst=BURST, jitter=JITTER, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_min / 60.0
+        self.burst = max(1, burst)
+        self.jitter = jitter
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._last = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self._tokens = 0.0
+
+    def acquire(self):
+        """Block until a request may go out. Returns the seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            self._sleep(wait)
+            waited += wait
+        if self.jitter:
+            extra = random.uniform(0, self.jitter)
+            self._sleep(extra)
+            waited += extra
+        return waited
+
+
+class HostLimiter:
+    """One token bucket per host, created on first use with the same settings."""
+
+    def __init__(self, rate_per_min=RATE_PER_MIN, burst=BURST, jitter=JITTER, **kwargs):
+        self._settings = dict(rate_per_min=rate_per_min, burst=burst, jitter=jitter, **kwargs)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(**self._settings)
+            return self._buckets[host]
+
+    def acquire(self, host):
+        return self.bucket(host).acquire()
+
+    def pause(self, host, seconds=BLOCK_COOLDOWN):
+        self.bucket(host).pause(seconds)
+
+
+class Checkpoint:
+    """
+    Done / failed match ids persisted to a JSON file after every change (atomic replace).
+    `exists(match_id)`, when given, confirms a done id still has its output: ids whose output
+    was deleted since are dropped from done, so they are scraped again.
+    """
+
+    def __init__(self, path, exists=None):
+        self.path = path
+        self.exists = exists
+        self._lock = threading.Lock()
+        self.done, self.failed = set(), {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.done = set(state.get("done", []))
+            self.failed = state.get("failed", {})
+
+    def pending(self, match_ids):
+        with self._lock:
+            if self.exists is not None:
+                gone = {str(m) for m in match_ids if str(m) in self.done and not self.exists(str(m))}
+                if gone:
+                    self.done -= gone
+                    self._save()
+            return [m for m in match_ids if str(m) not in self.done]
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"done": sorted(self.done), "failed": self.failed}, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def mark_done(self, match_id):
+        with self._lock:
+            self.done.add(str(match_id))
+            self.failed.pop(str(match_id), None)
+            self._save()
+
+    def mark_failed(self, match_id, reason):
+        with self._lock:
+            self.failed[str(match_id)] = reason
+            self._save()
+
+
+def run_jobs(match_ids, task, host, workers=2, limiter=None, checkpoint=None, retries=RETRIES,
+             backoff=BACKOFF, sleep=time.sleep):
+    """
+    Run task(match_id) for every id not already checkpointed, at most `workers` at a time and
+    never faster than the host's token bucket allows. Returns {"done", "unavailable", "failed"} id lists.
+    """
+    limiter = limiter or HostLimiter()
+    checkpoint = checkpoint or Checkpoint(None)
+    todo = checkpoint.pending([str(m) for m in match_ids])
+    report = {"done": [], "unavailable": [], "failed": []}
+    if not todo:
+        return report
+
+    def job(match_id):
+        for attempt in range(retries + 1):
+            limiter.acquire(host)
+            try:
+                return "done" if task(match_id) else "unavailable"
+            except Blocked as e:
+                limiter.pause(host)
+                if attempt == retries:
+                    checkpoint.mark_failed(match_id, f"blocked: {e}")
+                    return "failed"
+                delay = backoff * 2 ** attempt * random.uniform(0.8, 1.2)
+                print(f"[{match_id}] Blocked ({e}), retry {attempt + 1}/{retries} in {delay:.0f}s")
+                sleep(delay)
+            except Exception as e:
+                checkpoint.mark_failed(match_id, f"{type(e).__name__}: {e}")
+                print(f"[{match_id}] Failed: {e}")
+                return "failed"
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(job, m): m for m in todo}
+        for future in as_completed(futures):
+            match_id, outcome = futures[future], future.result()
+            if outcome == "done":
+                checkpoint.mark_done(match_id)
+            report[outcome].append(match_id)
+    return report
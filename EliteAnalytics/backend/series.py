@@ -0,0 +1,204 @@
+"""
+Per-minute metric series, computed once at ingest.
+
+Every match gets one row per team in the match_series table holding a float32 matrix
+(one row per entry of METRICS, one column per match minute) as raw bytes. The momentum
+and xG-flow endpoints and season-average profiles read these arrays instead of scanning
+the events table; smoothing and derived series (field tilt, danger, game state) are
+cheap array operations on top of them.
+
+WhoScored minutes are match minutes, so first-half stoppage time shares bins with the
+first minutes of the second half.
+"""
+import argparse
+import numpy as np
+import pandas as pd
+
+from EliteAnalytics.backend.database import Event, Match, MatchSeries
+from EliteAnalytics.backend.coords import ws_to_sb_x
+from EliteAnalytics.backend.passes import FINAL_THIRD_X
+
+METRICS = ("xg", "xt", "passes", "completed_passes", "final_third_entries", "final_third_passes", "shots", "goals")
+SHOT_TYPES = ("MissedShots", "SavedShot", "ShotOnPost", "Goal")
+MIN_MINUTES = 91
+# Danger = xG * DANGER_XG_WEIGHT + xT (the weighting the momentum chart has always used)
+DANGER_XG_WEIGHT = 5.0
+SMOOTHING = ("ewm", "rolling")
+
+
+def load_events(session, match_id):
+    query = session.query(Event.team_id, Event.type_name, Event.outcome, Event.minute, Event.x,
+                          Event.xg, Event.xt, Event.is_final_third_pass)\
+        .filter(Event.match_id == match_id, Event.minute.isnot(None))
+    return pd.read_sql(query.statement, session.bind)
+
+
+def compute(df, team_ids):
+    """{team_id: float32 array (len(METRICS), n_minutes)} from one match's events."""
+    n_minutes = max(MIN_MINUTES, int(df["minute"].max()) + 1) if len(df) else MIN_MINUTES
+    minute = df["minute"].clip(lower=0).astype(int).to_numpy()
+    is_pass = (df["type_name"] == "Pass").to_numpy()
+    is_shot = df["type_name"].isin(SHOT_TYPES).to_numpy()
+    values = {
+        "xg": np.where(is_shot, df["xg"].fillna(0).to_numpy(), 0.0),
+        "xt": df["xt"].fillna(0).to_numpy(),
+        "passes": is_pass.astype(float),
+        "completed_passes": (is_pass & (df["outcome"] == "Successful").to_numpy()).astype(float),
+        "final_third_entries": df["is_final_third_pass"].fillna(False).astype(bool).to_numpy().astype(float),
+        "final_third_passes": (is_pass & (ws_to_sb_x(df["x"].fillna(0)) >= FINAL_THIRD_X)).astype(float),
+        "shots": is_shot.astype(float),
+        "goals": (df["type_name"] == "Goal").to_numpy().astype(float),
+    }
+    weights = np.stack([values[m] for m in METRICS])
+    out = {}
+    for team_id in team_ids:
+        own = (df["team_id"] == team_id).to_numpy()
+        # Row offset per metric, so one bincount fills the whole matrix
+        idx = (np.arange(len(METRICS))[:, None] * n_minutes + minute[own][None, :]).ravel()
+        out[team_id] = np.bincount(idx, weights=weights[:, own].ravel(),
+                                   minlength=len(METRICS) * n_minutes).reshape(len(METRICS), n_minutes).astype(np.float32)
+    return out
+
+
+def rebuild(session, match_id):
+    """Recompute and store the series of one match. Returns the number of minutes."""
+    match = session.query(Match).filter(Match.id == match_id).first()
+    if match is None:
+        return 0
+    series = compute(load_events(session, match_id), (match.home_team_id, match.away_team_id))
+    session.query(MatchSeries).filter(MatchSeries.match_id == match_id).delete()
+    for team_id, data in series.items():
+        session.add(MatchSeries(match_id=match_id, team_id=team_id, is_home=team_id == match.home_team_id,
+                                n_minutes=data.shape[1], metrics=list(METRICS), data=data.tobytes()))
+    session.commit()
+    return next(iter(series.values())).shape[1]
+
+
+def rebuild_all(session):
+    match_ids = [m for (m,) in session.query(Match.id).all()]
+    for match_id in match_ids:
+        rebuild(session, match_id)
+    return len(match_ids)
+
+
+def _unpack(row):
+    data = np.frombuffer(row.data, dtype=np.float32).reshape(len(row.metrics), row.n_minutes)
+    return {m: data[i].astype(float) for i, m in enumerate(row.metrics)}
+
+
+def load(session, match_id):
+    """{"home": {metric: array}, "away": {...}} for one match, or None if not computed."""
+    rows = session.query(MatchSeries).filter(MatchSeries.match_id == match_id).all()
+    if len(rows) != 2:
+        return None
+    return {("home" if r.is_home else "away"): _unpack(r) for r in rows}
+
+
+# ---------------------------------------------------------------------------
+# Derived series
+# ---------------------------------------------------------------------------
+def smooth(values, method=None, span=5):
+    """
+    Smooth a per-minute series: "ewm" is an exponential moving average with the given span,
+    "rolling" a trailing mean over `span` minutes. None returns the series unchanged.
+    """
+    values = np.asarray(values, dtype=float)
+    if method is None:
+        return values
+    if method not in SMOOTHING:
+        raise ValueError(f"Unknown smoothing {method!r}, expected one of {SMOOTHING}")
+    s = pd.Series(values)
+    if method == "ewm":
+        return s.ewm(span=span, adjust=False).mean().to_numpy()
+    return s.rolling(span, min_periods=1).mean().to_numpy()
+
+
+def danger(team):
+    return team["xg"] * DANGER_XG_WEIGHT + team["xt"]
+
+
+def field_tilt(team, opponent):
+    """Share (%) of the final-third passes made by the team, per minute. NaN where neither team had one."""
+    total = team["final_third_passes"] + opponent["final_third_passes"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, team["final_third_passes"] / total * 100, np.nan)
+
+
+def game_state(team, opponent):
+    """Goal difference from the team's perspective at the start of each minute."""
+    diff = np.cumsum(team["goals"] - opponent["goals"])
+    return np.r_[0, diff[:-1]]
+
+
+def _round(values, digits=3):
+    return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+
+def momentum(series, method=None, span=5):
+    home, away = series["home"], series["away"]
+    # Tilt is the ratio of the smoothed counts, so quiet minutes do not swing it to 0 / 100
+    tilt = field_tilt({"final_third_passes": smooth(home["final_third_passes"], method, span)},
+                      {"final_third_passes": smooth(away["final_third_passes"], method, span)})
+    return {
+        "minutes": list(range(len(home["xg"]))),
+        "home_danger": _round(smooth(danger(home), method, span), 4),
+        "away_danger": _round(smooth(danger(away), method, span), 4),
+        "home_field_tilt": _round(tilt, 1),
+        "game_state": game_state(home, away).astype(int).tolist(),
+    }
+
+
+def xg_flow(series):
+    home, away = series["home"], series["away"]
+    return {
+        "minutes": list(range(len(home["xg"]))),
+        "home_xg": _round(np.cumsum(home["xg"])),
+        "away_xg": _round(np.cumsum(away["xg"])),
+        "home_goals": [int(m) for m in np.flatnonzero(home["goals"])],
+        "away_goals": [int(m) for m in np.flatnonzero(away["goals"])],
+    }
+
+
+def team_profile(session, team_id, metric="danger", method=None, span=5, n_minutes=MIN_MINUTES):
+    """
+    Average per-minute profile of one team over every stored match, for and against.
+    `metric` is a stored metric or "danger"; longer matches are truncated to n_minutes.
+    """
+    rows = session.query(MatchSeries).filter(MatchSeries.match_id.in_(
+        session.query(MatchSeries.match_id).filter(MatchSeries.team_id == team_id))).all()
+    by_match = {}
+    for r in rows:
+        by_match.setdefault(r.match_id, {})["for" if r.team_id == team_id else "against"] = _unpack(r)
+
+    def pick(team):
+        values = danger(team) if metric == "danger" else team[metric]
+        return values[:n_minutes] if len(values) >= n_minutes else np.pad(values, (0, n_minutes - len(values)))
+
+    pairs = [s for s in by_match.values() if len(s) == 2]
+    if not pairs:
+        return {"matches": 0, "minutes": list(range(n_minutes)), "for": [], "against": []}
+    return {
+        "matches": len(pairs),
+        "minutes": list(range(n_minutes)),
+        "for": _round(smooth(np.mean([pick(s["for"]) for s in pairs], axis=0), method, span), 4),
+        "against": _round(smooth(np.mean([pick(s["against"]) for s in pairs], axis=0), method, span), 4),
+    }
+
+
+def main(argv=None):
+    from EliteAnalytics.backend.database import get_session, init_db
+    parser = argparse.ArgumentParser(description="Recompute the stored per-minute match series.")
+    parser.add_argument("--matches", default=None, help="Comma-separated match ids (default: every match)")
+    args = parser.parse_args(argv)
+    init_db()
+    session = get_session()
+    if args.matches:
+        for m in args.matches.split(","):
+            rebuild(session, int(m))
+        print(f"Rebuilt series for {len(args.matches.split(','))} matches.")
+    else:
+        print(f"Rebuilt series for {rebuild_all(session)} matches.")
+
+
+if __name__ == "__main__":
+    main()
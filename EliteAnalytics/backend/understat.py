@@ -0,0 +1,191 @@
+"""
+Understat cross-referencing for cached WhoScored matches.
+
+    index = UnderstatIndex(fetch_team_matches(url))
+    us = index.lookup("2025-09-21", "Barcelona", "Getafe")
+
+The season list is indexed by (date, home, away) with normalised team names, instead of
+scanning the whole list per match and taking the first game on the same date, which picks the
+wrong fixture when two share a date. Names are folded (accents, case, "FC"/"CF"-style tokens,
+known aliases) and, failing an exact key, matched fuzzily among that date's games; the day
+either side is tried too, since the two sites disagree on dates around midnight.
+
+Enrichment of already-cached matches goes to a small sidecar file in the cache folder
+(understat_enrichment.json, {match_id: understat entry}) instead of rewriting each multi-MB
+cache. `attach(match_data, path)` fills match_data["understat"] from it for readers.
+"""
+import os
+import re
+import json
+import datetime
+import difflib
+import threading
+import unicodedata
+from EliteAnalytics.backend.cache_io import read_cache, write_cache
+from EliteAnalytics.backend.http_client import get_client
+
+SIDECAR_NAME = "understat_enrichment.json"
+FUZZY_CUTOFF = 0.75
+
+# Tokens that differ between providers without changing the club
+_NOISE = {"fc", "cf", "cd", "sc", "ud", "sd", "rcd", "ac", "afc", "club", "de", "deportivo"}
+# Folded name -> canonical folded name
+ALIASES = {
+    "atletico": "atletico madrid",
+    "athletic bilbao": "athletic",
+    "celta": "celta vigo",
+    "betis": "real betis",
+    "oviedo": "real oviedo",
+    "psg": "paris saint germain",
+    "inter": "internazionale",
+    "bayern munich": "bayern",
+    "bayern munchen": "bayern",
+}
+
+_sidecar_lock = threading.Lock()
+
+
+def normalize_team(name):
+    """Provider-independent key for a team name, e.g. "Deportivo Alavés" -> "alaves"."""
+    if not name:
+        return ""
+    folded = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii").lower()
+    tokens = [t for t in re.split(r"[^a-z0-9]+", folded) if t and t not in _NOISE]
+    key = " ".join(tokens)
+    return ALIASES.get(key, key)
+
+
+def _team_title(side):
+    # datesData has {"h": {"title": ...}}; entries scraped from the page DOM have plain names
+    return side.get("title") if isinstance(side, dict) else side
+
+
+def _date_key(value):
+    return (value or "")[:10]
+
+
+class UnderstatIndex:
+    """Understat season entries keyed by (date, home, away), with a per-date list for fuzzy lookups."""
+
+    def __init__(self, matches=()):
+        self.by_key = {}
+        self.by_date = {}
+        for um in matches:
+            date = _date_key(um.get("datetime"))
+            home, away = normalize_team(_team_title(um.get("h"))), normalize_team(_team_title(um.get("a")))
+            self.by_key[(date, home, away)] = um
+            self.by_date.setdefault(date, []).append((home, away, um))
+
+    def __len__(self):
+        return len(self.by_key)
+
+    def _on_date(self, date, home, away):
+        hit = self.by_key.get((date, home, away))
+        if hit is not None:
+            return hit
+        candidates = self.by_date.get(date, [])
+        if not home and not away:
+            # Entries without team names can still be linked when the date is unambiguous
+            return candidates[0][2] if len(candidates) == 1 else None
+        best, best_score = None, FUZZY_CUTOFF
+        for c_home, c_away, um in candidates:
+            if not c_home and not c_away:
+                if len(candidates) == 1:
+                    return um
+                continue
+            score = min(_similarity(home, c_home), _similarity(away, c_away))
+            if score >= best_score:
+                best, best_score = um, score
+        return best
+
+    def lookup(self, date, home, away):
+        """The Understat entry for a fixture (date as 'YYYY-MM-DD...'), or None."""
+        date = _date_key(date)
+        home, away = normalize_team(home), normalize_team(away)
+        hit = self._on_date(date, home, away)
+        if hit is not None or not date:
+            return hit
+        try:
+            day = datetime.date.fromisoformat(date)
+        except ValueError:
+            return None
+        for delta in (-1, 1):
+            hit = self._on_date((day + datetime.timedelta(days=delta)).isoformat(), home, away)
+            if hit is not None:
+                return hit
+        return None
+
+    def lookup_match(self, match_data):
+        """lookup() with the date and team names of a WhoScored matchCentreData dict."""
+        return self.lookup(match_data.get("startTime") or match_data.get("startDate"),
+                           match_data.get("home", {}).get("name"), match_data.get("away", {}).get("name"))
+
+
+def _similarity(a, b):
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    # "atletico madrid" vs "atletico", "alaves" vs "deportivo alaves" after folding
+    ta, tb = set(a.split()), set(b.split())
+    if ta <= tb or tb <= ta:
+        return 0.9
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def fetch_team_matches(url, results_only=True):
+    """The datesData list of an Understat team page (e.g. https://understat.com/team/Barcelona/2025)."""
+    resp = get_client().get(url)
+    resp.raise_for_status()
+    html = resp.text
+    m = re.search(r"var datesData\s*=\s*JSON\.parse\('(.+?)'\);", html)
+    if not m:
+        return []
+    data = json.loads(m.group(1).encode('utf-8').decode('unicode_escape'))
+    return [d for d in data if d.get('isResult') == True] if results_only else data
+
+
+# ---------------------------------------------------------------------------
+# Sidecar enrichment
+# ---------------------------------------------------------------------------
+def sidecar_path(folder):
+    return os.path.join(folder, SIDECAR_NAME)
+
+
+def load_sidecar(folder):
+    path = sidecar_path(folder)
+    return read_cache(path) if os.path.exists(path) else {}
+
+
+def update_sidecar(folder, entries):
+    """Merge {match_id: understat entry} into the folder's sidecar (atomic write). Returns its size."""
+    if not entries:
+        return 0
+    with _sidecar_lock:
+        sidecar = load_sidecar(folder)
+        sidecar.update({str(k): v for k, v in entries.items()})
+        write_cache(sidecar_path(folder), sidecar, compression="none")
+    return len(sidecar)
+
+
+_CACHE_ID = re.compile(r"match_(\d+)_cache\.json$")
+_sidecars = {} # folder -> (mtime, entries)
+
+
+def attach(match_data, cache_path):
+    """Fill match_data["understat"] from the sidecar next to cache_path when the cache has none."""
+    if match_data.get("understat"):
+        return match_data
+    m = _CACHE_ID.search(os.path.basename(cache_path))
+    folder = os.path.dirname(os.path.abspath(cache_path))
+    path = sidecar_path(folder)
+    if not m or not os.path.exists(path):
+        return match_data
+    mtime = os.path.getmtime(path)
+    cached = _sidecars.get(folder)
+    if cached is None or cached[0] != mtime:
+        cached = _sidecars[folder] = (mtime, read_cache(path))
+    entry = cached[1].get(m.group(1))
+    if entry:
+        match_data["understat"] = entry
+    return match_data
@@ -1,36 +1,152 @@
+"""
+Watches the match cache folder and ingests new or rewritten caches.
+
+Events are not acted on directly. A created, modified or renamed-into-place cache file is
+recorded and only dispatched once
+    - no event has arrived for it for QUIET_PERIOD seconds, and
+    - its size and mtime are unchanged between two checks (the writer has finished),
+so a scraper still writing the file, or backfill_understat.py rewriting it in place, does not
+trigger a parse of half a JSON. A settled file whose content hash is the one already dispatched
+(touched, or rewritten with identical bytes) is dropped. Files that settle while an ingest is running are coalesced
+into the next batch, and every batch goes to the single pipeline worker with only the
+affected match ids.
+"""
+import re
 import time
 import os
+import hashlib
+import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-import subprocess
+from EliteAnalytics.backend import pipeline
 
 _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+QUIET_PERIOD = 2.0 # Seconds without events before a file is checked
+POLL_INTERVAL = 0.5
+CACHE_RE = re.compile(r"match_(\d+)_cache\.json$")
+
+
+class CacheBatcher:
+    """Debounces cache file events and hands settled match ids to the pipeline in batches."""
+
+    def __init__(self, dispatch=pipeline.submit, quiet=QUIET_PERIOD, poll=POLL_INTERVAL, clock=time.monotonic):
+        self.dispatch = dispatch
+        self.quiet = quiet
+        self.poll = poll
+        self._clock = clock
+        self._pending = {} # path -> (last event time, last seen (size, mtime))
+        self._ready = set()
+        self._digests = {} # path -> content hash of the last dispatched version
+        self._inflight = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cache-batcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def touch(self, path):
+        if not CACHE_RE.search(os.path.basename(path)):
+            return
+        with self._lock:
+            self._pending[path] = (self._clock(), None)
+
+    def _signature(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
+
+    def _digest(self, path):
+        h = hashlib.sha256()
+        try:
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        except OSError:
+            return None
+        return h.hexdigest()
+
+    def settle(self):
+        """Move files that are quiet and unchanged since the last check into the ready batch."""
+        now = self._clock()
+        with self._lock:
+            for path, (last_event, seen) in list(self._pending.items()):
+                if now - last_event < self.quiet:
+                    continue
+                sig = self._signature(path)
+                if sig is None:
+                    # Deleted, or renamed away before it settled
+                    del self._pending[path]
+                elif sig == seen and sig[0] > 0:
+                    del self._pending[path]
+                    digest = self._digest(path)
+                    if digest is None or digest == self._digests.get(path):
+                        continue
+                    self._digests[path] = digest
+                    self._ready.add(CACHE_RE.search(os.path.basename(path)).group(1))
+                else:
+                    self._pending[path] = (last_event, sig)
+
+    def flush(self):
+        """Dispatch the ready ids as one batch, unless the previous batch is still running."""
+        with self._lock:
+            if not self._ready or (self._inflight is not None and not self._inflight.done()):
+                return None
+            batch, self._ready = sorted(self._ready), set()
+        print(f"Triggering ETL pipeline for {len(batch)} match(es): {', '.join(batch)}")
+        self._inflight = self.dispatch(batch)
+        if hasattr(self._inflight, "add_done_callback"):
+            self._inflight.add_done_callback(_report)
+        return batch
+
+    def _run(self):
+        while not self._stop.wait(self.poll):
+            self.settle()
+            self.flush()
+
+
 class MatchCacheHandler(FileSystemEventHandler):
+    def __init__(self, batcher):
+        super().__init__()
+        self.batcher = batcher
+
     def on_created(self, event):
-        if event.is_directory:
-            return
-        if event.src_path.endswith(".json") and "match_" in event.src_path and "_cache" in event.src_path:
-            print(f"New match cache detected: {event.src_path}")
-            print("Triggering ETL pipeline...")
-            # Run the parser
-            try:
-                subprocess.run(
-                    ["python", "-m", "EliteAnalytics.backend.parser"], 
-                    cwd=os.path.dirname(_ROOT),
-                    check=True
-                )
-                print("ETL pipeline completed successfully.")
-            except subprocess.CalledProcessError as e:
-                print(f"ETL pipeline failed: {e}")
+        if not event.is_directory:
+            self.batcher.touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.batcher.touch(event.src_path)
+
+    def on_moved(self, event):
+        # Atomic writers rename a temp file over the cache
+        if not event.is_directory:
+            self.batcher.touch(event.dest_path)
+
+
+def _report(future):
+    try:
+        loaded = future.result()
+        print(f"ETL pipeline completed successfully ({len(loaded)} match(es) loaded).")
+    except Exception as e:
+        print(f"ETL pipeline failed: {e}")
 
 def run_watcher():
     path_to_watch = _ROOT  # Watch the EliteAnalytics folder or the root BCNPROJECT folder
     # For now, let's watch the directory above EliteAnalytics where match_1914105_cache.json is
     root_path = os.path.dirname(_ROOT)
     data_path = os.path.join(root_path, "assets", "data")
-    
-    event_handler = MatchCacheHandler()
+
+    batcher = CacheBatcher().start()
+    event_handler = MatchCacheHandler(batcher)
     observer = Observer()
     observer.schedule(event_handler, data_path, recursive=False)
     observer.start()
@@ -41,6 +157,8 @@ def run_watcher():
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    batcher.stop()
+    pipeline.shutdown()
 
 if __name__ == "__main__":
     run_watcher()
@@ -0,0 +1,141 @@
+"""
+WhoScored match page helpers shared by the scrapers.
+
+The match centre payload is embedded in the page as a JavaScript object literal,
+    require.config.params["args"] = { ..., matchCentreData: {...json...}, matchCentreEventTypeJson: {...}, ... }
+so instead of parsing the whole ~900 KB page into a DOM and splitting the script text,
+`extract_match_centre` finds the key with a plain string search and lets
+json.JSONDecoder.raw_decode read exactly one JSON value from there.
+
+`wait_for_match_centre` replaces fixed sleeps after driver.get(): it returns as soon as the
+payload script is in the page, so a scrape takes as long as the page actually needs.
+"""
+import json
+import time
+
+MATCH_CENTRE_KEY = "matchCentreData:"
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def extract_match_centre(html, key=MATCH_CENTRE_KEY):
+    """
+    The matchCentreData dict embedded in a WhoScored match page, or None when the page has none
+    (not played yet, blocked by Cloudflare, or the value is null).
+    """
+    if not html:
+        return None
+    start = html.find(key)
+    while start >= 0:
+        idx = start + len(key)
+        while idx < len(html) and html[idx] in _WHITESPACE:
+            idx += 1
+        try:
+            data, _ = _decoder.raw_decode(html, idx)
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict):
+            return data
+        start = html.find(key, idx)
+    return None
+
+
+def has_match_centre(html, key=MATCH_CENTRE_KEY):
+    """Cheap presence check, without decoding the payload."""
+    return bool(html) and key in html
+
+
+# ---------------------------------------------------------------------------
+# Readiness waits
+# ---------------------------------------------------------------------------
+# Evaluated in the page: cheap, and never serializes the DOM the way page_source does
+_SCRIPT_LOOKUP = ("var s = document.scripts; for (var i = 0; i < s.length; i++) {"
+                  " if (s[i].text.indexOf(arguments[0]) !== -1) return %s; } return %s;")
+READY_JS = _SCRIPT_LOOKUP % ("true", "false")
+SCRIPT_TEXT_JS = _SCRIPT_LOOKUP % ("s[i].text", "null")
+
+PAGE_TIMEOUT = 45.0
+POLL_START, POLL_MAX, POLL_BACKOFF = 0.25, 1.0, 1.5
+
+
+def wait_for_match_centre(driver, timeout=PAGE_TIMEOUT, key=MATCH_CENTRE_KEY, progress_every=None):
+    """
+    Block until the page holds the matchCentreData script, polling a JS predicate with
+    exponential backoff (0.25 s up to 1 s between checks). Returns the seconds waited, or
+    None on timeout. A page still behind the Cloudflare check simply keeps the predicate false.
+    """
+    start = time.monotonic()
+    delay = POLL_START
+    last_report = 0.0
+    while True:
+        try:
+            if driver.execute_script(READY_JS, key):
+                return round(time.monotonic() - start, 2)
+        except Exception:
+            # Navigation in progress (or a challenge page reloading): try again
+            pass
+        elapsed = time.monotonic() - start
+        if elapsed >= timeout:
+            return None
+        if progress_every and elapsed - last_report >= progress_every:
+            print(f"Waiting for matchCentreData... {int(elapsed)}s/{int(timeout)}s")
+            last_report = elapsed
+        time.sleep(min(delay, timeout - elapsed))
+        delay = min(delay * POLL_BACKOFF, POLL_MAX)
+
+
+def read_match_centre(driver, key=MATCH_CENTRE_KEY):
+    """
+    matchCentreData from a loaded page. Only the one script's text is pulled out of the
+    browser; page_source is the fallback for drivers that cannot run scripts.
+    """
+    try:
+        text = driver.execute_script(SCRIPT_TEXT_JS, key)
+    except Exception:
+        text = None
+    return extract_match_centre(text or driver.page_source, key)
+
+
+# ---------------------------------------------------------------------------
+# Block detection and plain HTTP fetches
+# ---------------------------------------------------------------------------
+CHALLENGE_MARKERS = ("Just a moment", "Attention Required", "cf-challenge", "challenge-platform")
+BLOCK_STATUSES = (403, 429, 503)
+
+
+def is_challenge(html_or_title):
+    return bool(html_or_title) and any(m in html_or_title for m in CHALLENGE_MARKERS)
+
+
+def is_blocked(driver):
+    """True when the browser is sitting on a Cloudflare challenge page."""
+    try:
+        return is_challenge(driver.title)
+    except Exception:
+        return False
+
+
+def fetch_match_centre(url, timeout=30):
+    """
+    matchCentreData over plain HTTP (no browser), or None when the page has none. Raises
+    scheduler.Blocked on a challenge page or a 403/429/503, so the scheduler retries it.
+    Used against saved pages served locally and wherever the site lets plain requests through.
+    """
+    import urllib.request
+    import urllib.error
+    from EliteAnalytics.backend.scheduler import Blocked
+    req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            html = resp.read().decode("utf-8", errors="replace")
+    except urllib.error.HTTPError as e:
+        if e.code in BLOCK_STATUSES:
+            raise Blocked(f"HTTP {e.code}")
+        if e.code == 404:
+            return None
+        raise
+    data = extract_match_centre(html)
+    if data is None and is_challenge(html):
+        raise Blocked("challenge page")
+    return data
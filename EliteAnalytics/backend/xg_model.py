@@ -0,0 +1,412 @@
+"""
+Trainable logistic xG model.
+
+Shots are turned into a feature matrix (distance, angle, body part, situation, zone,
+big chance, one-on-one) and scored with a single matrix product, so a match or a whole
+season is scored in one call. The model is an L2-regularised logistic regression fitted
+offline on the cached matches by Newton's method. Where Understat has the match, its team
+xG spread over the shots is used as a soft target, blended with the actual outcomes.
+
+Artifacts are versioned JSON files under EliteAnalytics/data/models (xg_logit_v<N>.json).
+Scoring stays on the geometric curve in xg.py, the one metrics.calculate_xg and the Projects
+scripts use, unless the model is switched on with XG_MODEL=latest or XG_MODEL=<version>.
+Stored xG is only re-scored on request, so after changing XG_MODEL run --recompute.
+
+With XG_MODEL=latest the model also follows new matches: every ingested match's training
+rows are kept in a small store (xg_training.json), and after each ingest batch refresh()
+re-fits by Newton's method warm-started from the latest weights, which converges in a couple
+of steps. When the weights moved it is saved as the next version and stored shots re-scored.
+
+    python -m EliteAnalytics.backend.xg_model --l2 1.0
+    XG_MODEL=latest python -m EliteAnalytics.backend.xg_model --recompute
+"""
+import os
+import re
+import glob
+import json
+import argparse
+import datetime
+import numpy as np
+import pandas as pd
+
+from EliteAnalytics.backend.xg import estimate_xg, PENALTY_XG, XG_FLOOR, XG_CAP, round3
+from EliteAnalytics.backend.coords import ws_to_sb
+from EliteAnalytics.backend.cache_io import read_cache, write_cache
+from EliteAnalytics.backend.understat import attach as attach_understat
+
+_BACKEND = os.path.dirname(os.path.abspath(__file__))
+_ROOT = os.path.dirname(os.path.dirname(_BACKEND))
+MODELS_DIR = os.path.join(os.path.dirname(_BACKEND), "data", "models")
+TRAINING_PATH = os.path.join(os.path.dirname(_BACKEND), "data", "xg_training.json")
+CACHE_DIR = os.path.join(_ROOT, "assets", "data")
+_ARTIFACT_RE = re.compile(r"^xg_logit_v(\d+)\.json$")
+
+SHOT_TYPES = ("MissedShots", "SavedShot", "ShotOnPost", "Goal")
+SITUATIONS = ("Free Kick", "Fast Break", "Set Piece", "Corner")  # baseline: Open Play
+ZONES = ("6-Yard Box", "Inside Box", "Outside Box")              # baseline: Unknown
+NUMERIC = ("distance", "log_distance", "angle")
+FEATURES = NUMERIC + ("header",) + tuple(f"situation:{s}" for s in SITUATIONS) \
+    + tuple(f"zone:{z}" for z in ZONES) + ("big_chance", "one_on_one")
+
+# "geometric" (default), "latest", or an artifact version number
+XG_MODEL = os.environ.get("XG_MODEL", "geometric").lower()
+
+# Share of the target taken from the actual outcome when an Understat soft target exists
+GOAL_WEIGHT = 0.25
+DEFAULT_L2 = 1.0
+# Largest weight change of a warm-started refit that is not worth a new version and a re-score
+REFIT_TOLERANCE = 1e-3
+
+
+def extract_qualifiers(ev):
+    """Extract useful qualifier tags from a WhoScored shot event."""
+    quals = {q.get("type", {}).get("displayName", "")
+             for q in ev.get("qualifiers", []) or []}
+
+    # Body part
+    body = "Right Foot" if "RightFoot" in quals else \
+           "Left Foot"  if "LeftFoot"  in quals else \
+           "Header"     if "Head"      in quals else "Unknown"
+
+    # Situation
+    situation = "Penalty"     if "Penalty"     in quals else \
+                "Free Kick"   if "DirectFreekick" in quals else \
+                "Fast Break"  if "FastBreak"   in quals else \
+                "Set Piece"   if "SetPiece"    in quals else \
+                "Corner"      if "FromCorner"  in quals else \
+                "Open Play"
+
+    # Location zone (from WhoScored qualifiers — more accurate than coords)
+    if any(z in quals for z in ("SmallBoxCentre", "SmallBoxLeft", "SmallBoxRight",
+                                 "DeepBoxCentre", "DeepBoxLeft", "DeepBoxRight")):
+        zone = "6-Yard Box"
+    elif any(z in quals for z in ("BoxCentre", "BoxLeft", "BoxRight")):
+        zone = "Inside Box"
+    elif any(z in quals for z in ("OutOfBoxCentre", "OutOfBoxLeft", "OutOfBoxRight")):
+        zone = "Outside Box"
+    else:
+        zone = "Unknown"
+
+    big_chance = "BigChance" in quals
+    one_on_one = "OneOnOne"  in quals
+
+    return body, situation, zone, big_chance, one_on_one
+
+
+def shot_table(events):
+    """
+    DataFrame of the shots among WhoScored events, in StatsBomb coordinates:
+        team_id, x, y, is_goal, body_part, situation, zone, big_chance, one_on_one
+    """
+    rows = []
+    for ev in events:
+        if ev.get("type", {}).get("displayName", "") not in SHOT_TYPES:
+            continue
+        body, situation, zone, big_chance, one_on_one = extract_qualifiers(ev)
+        rows.append((ev.get("teamId"), ev.get("x", 0) or 0, ev.get("y", 0) or 0,
+                     ev.get("type", {}).get("displayName") == "Goal",
+                     body, situation, zone, big_chance, one_on_one))
+    df = pd.DataFrame(rows, columns=["team_id", "x", "y", "is_goal", "body_part", "situation",
+                                     "zone", "big_chance", "one_on_one"])
+    if df.empty:
+        return df
+    df["x"], df["y"] = ws_to_sb(df["x"].to_numpy(dtype=float), df["y"].to_numpy(dtype=float))
+    # Penalties sit exactly on the spot
+    pen = (df["situation"] == "Penalty").to_numpy()
+    df.loc[pen, "x"] = 108.0
+    df.loc[pen, "y"] = 40.0
+    return df
+
+
+def raw_features(df):
+    """Unscaled feature matrix (n_shots x len(FEATURES)) for a shot table."""
+    dx = 120.0 - df["x"].to_numpy(dtype=float)
+    dy = 40.0 - df["y"].to_numpy(dtype=float)
+    distance = np.maximum(np.hypot(dx, dy), 0.5)
+    # Angle subtended by the 8-unit goal mouth
+    angle = np.arctan2(8.0 * dx, dx**2 + dy**2 - 16.0)
+    angle = np.where(angle < 0, angle + np.pi, angle)
+    situation = df["situation"].to_numpy()
+    zone = df["zone"].to_numpy()
+    columns = [distance, np.log(distance), angle, (df["body_part"] == "Header").to_numpy()]
+    columns += [situation == s for s in SITUATIONS]
+    columns += [zone == z for z in ZONES]
+    columns += [df["big_chance"].to_numpy(dtype=bool), df["one_on_one"].to_numpy(dtype=bool)]
+    return np.column_stack(columns).astype(float)
+
+
+def design_matrix(df, model):
+    """Standardised features with a leading bias column, using the model's scaler."""
+    X = raw_features(df)
+    n = len(NUMERIC)
+    X[:, :n] = (X[:, :n] - np.asarray(model["mean"])) / np.asarray(model["std"])
+    return np.hstack([np.ones((len(X), 1)), X])
+
+
+def fit_logistic(X, y, l2=DEFAULT_L2, max_iter=50, tol=1e-8, w0=None):
+    """L2-regularised logistic regression on soft targets y in [0, 1] (bias unpenalised), optionally warm-started."""
+    w = np.zeros(X.shape[1]) if w0 is None else np.array(w0, dtype=float)
+    reg = np.full(X.shape[1], l2)
+    reg[0] = 0.0
+    for _ in range(max_iter):
+        p = 1 / (1 + np.exp(-(X @ w)))
+        grad = X.T @ (p - y) + reg * w
+        hess = (X * (p * (1 - p))[:, None]).T @ X + np.diag(reg)
+        step = np.linalg.solve(hess, grad)
+        w -= step
+        if np.max(np.abs(step)) < tol:
+            break
+    return w
+
+
+def _soft_targets(df, understat_total):
+    """Spread a team's Understat xG over its non-penalty shots in proportion to the geometric xG."""
+    pen = (df["situation"] == "Penalty").to_numpy()
+    geo = estimate_xg(df["x"].to_numpy(), df["y"].to_numpy(), pen,
+                      df["big_chance"].to_numpy(), (df["body_part"] == "Header").to_numpy())
+    target = understat_total - PENALTY_XG * pen.sum()
+    current = geo[~pen].sum()
+    if target <= 0 or current <= 0:
+        return None
+    return np.clip(geo * (target / current), 0.0, 0.99)
+
+
+def match_rows(match_data):
+    """(non-penalty shot table, target vector, has Understat totals) of one match; Understat already attached."""
+    shots = shot_table(match_data.get("events", []))
+    us = (match_data.get("understat") or {}).get("xG") or {}
+    frames, targets = [], []
+    for side, key in (("home", "h"), ("away", "a")):
+        df = shots[shots["team_id"] == match_data.get(side, {}).get("teamId")] if not shots.empty else shots
+        if df.empty:
+            continue
+        outcome = df["is_goal"].to_numpy(dtype=float)
+        soft = _soft_targets(df, float(us[key])) if us.get(key) is not None else None
+        y = outcome if soft is None else (1 - GOAL_WEIGHT) * soft + GOAL_WEIGHT * outcome
+        keep = (df["situation"] != "Penalty").to_numpy()
+        frames.append(df[keep])
+        targets.append(y[keep])
+    if not frames:
+        return pd.DataFrame(), np.zeros(0), bool(us)
+    return pd.concat(frames, ignore_index=True), np.concatenate(targets), bool(us)
+
+
+def training_set(cache_files):
+    """(non-penalty shot table, target vector, matches with Understat totals) from cached matches."""
+    frames, targets, with_understat = [], [], 0
+    for path in cache_files:
+        df, y, has_us = match_rows(attach_understat(read_cache(path), path))
+        if df.empty:
+            continue
+        with_understat += has_us
+        frames.append(df)
+        targets.append(y)
+    if not frames:
+        return pd.DataFrame(), np.zeros(0), 0
+    return pd.concat(frames, ignore_index=True), np.concatenate(targets), with_understat
+
+
+def train(cache_files=None, l2=DEFAULT_L2):
+    """Fit the model on the cached matches and return the artifact dict (not yet saved)."""
+    if cache_files is None:
+        cache_files = sorted(glob.glob(os.path.join(CACHE_DIR, "match_*_cache.json")))
+    df, y, with_understat = training_set(cache_files)
+    if df.empty:
+        raise ValueError("No shots found in the cached matches")
+
+    X = raw_features(df)
+    n = len(NUMERIC)
+    mean, std = X[:, :n].mean(axis=0), X[:, :n].std(axis=0)
+    model = {"mean": mean.tolist(), "std": np.where(std > 0, std, 1.0).tolist()}
+    Xd = design_matrix(df, model)
+    w = fit_logistic(Xd, y, l2)
+    return _artifact(model, Xd, df, y, w, l2, len(cache_files), with_understat)
+
+
+def _artifact(model, Xd, df, y, w, l2, matches, with_understat):
+    p = np.clip(1 / (1 + np.exp(-(Xd @ w))), 1e-9, 1 - 1e-9)
+    goals = df["is_goal"].to_numpy(dtype=float)
+    model.update({
+        "features": ["bias", *FEATURES],
+        "weights": w.tolist(),
+        "l2": l2,
+        "goal_weight": GOAL_WEIGHT,
+        "trained_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "matches": matches,
+        "matches_with_understat": with_understat,
+        "shots": int(len(df)),
+        "metrics": {
+            "log_loss": round(float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))), 5),
+            "brier_goals": round(float(np.mean((p - goals) ** 2)), 5),
+            "xg_total": round(float(p.sum()), 2),
+            "target_total": round(float(y.sum()), 2),
+            "goals": int(goals.sum()),
+        },
+    })
+    return model
+
+
+# ---------------------------------------------------------------------------
+# Incremental refits
+# ---------------------------------------------------------------------------
+def _load_training(path=None):
+    path = path or TRAINING_PATH
+    return read_cache(path) if os.path.exists(path) else {}
+
+
+def update_training(match_id, match_data, path=None):
+    """Keep (or replace) one match's training rows in the store. Returns its number of shots."""
+    path = path or TRAINING_PATH
+    df, y, has_us = match_rows(match_data)
+    store = _load_training(path)
+    store[str(match_id)] = {"rows": {c: df[c].tolist() for c in df.columns}, "y": y.tolist(), "understat": has_us}
+    write_cache(path, store, compression="none")
+    return len(y)
+
+
+def stored_training_set(path=None):
+    """training_set() from the store instead of re-reading every cache."""
+    store = _load_training(path)
+    frames = [pd.DataFrame(m["rows"]) for m in store.values() if m["y"]]
+    if not frames:
+        return pd.DataFrame(), np.zeros(0), 0, len(store)
+    y = np.concatenate([m["y"] for m in store.values() if m["y"]])
+    return pd.concat(frames, ignore_index=True), y, sum(m["understat"] for m in store.values()), len(store)
+
+
+def refit(model, path=None):
+    """
+    Re-fit `model` on the stored training rows, warm-started from its weights and keeping its
+    scaler. Returns (artifact, largest weight change), or (None, 0.0) without training rows.
+    """
+    df, y, with_understat, matches = stored_training_set(path)
+    if df.empty:
+        return None, 0.0
+    l2 = model.get("l2", DEFAULT_L2)
+    w0 = np.asarray(model["weights"])
+    Xd = design_matrix(df, model)
+    w = fit_logistic(Xd, y, l2, w0=w0)
+    artifact = _artifact({"mean": model["mean"], "std": model["std"]}, Xd, df, y, w, l2, matches, with_understat)
+    artifact["warm_start"] = model.get("version")
+    return artifact, float(np.max(np.abs(w - w0)))
+
+
+def refresh(tolerance=REFIT_TOLERANCE, models_dir=None):
+    """
+    Called once after an ingest batch. With XG_MODEL=latest, re-fits the latest model on the
+    stored rows and saves it as the next version when the weights moved by more than
+    tolerance. Returns the new artifact's path (stored shots need re-scoring) or None.
+    """
+    if XG_MODEL != "latest":
+        return None
+    models_dir = models_dir or MODELS_DIR
+    model = load_model(models_dir=models_dir)
+    if model is None:
+        return None
+    artifact, change = refit(model)
+    if artifact is None or change <= tolerance:
+        return None
+    return save_model(artifact, models_dir)
+
+
+def _versions(models_dir=MODELS_DIR):
+    try:
+        names = os.listdir(models_dir)
+    except FileNotFoundError:
+        return []
+    return sorted(int(m.group(1)) for m in map(_ARTIFACT_RE.match, names) if m)
+
+
+def save_model(model, models_dir=MODELS_DIR):
+    """Write the artifact as the next version and return its path."""
+    os.makedirs(models_dir, exist_ok=True)
+    version = (_versions(models_dir) or [0])[-1] + 1
+    model = dict(model, version=version)
+    path = os.path.join(models_dir, f"xg_logit_v{version}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(model, f, indent=2)
+    _model_cache.clear()
+    return path
+
+
+_model_cache = {}
+
+
+def load_model(version=None, models_dir=MODELS_DIR):
+    """The given (default: latest) artifact, or None if no model has been trained."""
+    versions = _versions(models_dir)
+    if not versions:
+        return None
+    version = versions[-1] if version is None else version
+    key = (models_dir, version)
+    if key not in _model_cache:
+        path = os.path.join(models_dir, f"xg_logit_v{version}.json")
+        with open(path, "r", encoding="utf-8") as f:
+            model = json.load(f)
+        if model.get("features") != ["bias", *FEATURES]:
+            raise ValueError(f"{path} was trained on a different feature set")
+        _model_cache[key] = model
+    return _model_cache[key]
+
+
+def active_model(setting=None):
+    """The artifact selected by XG_MODEL, or None for the geometric curve."""
+    setting = (setting or XG_MODEL).lower()
+    if setting in ("", "geometric"):
+        return None
+    if setting == "latest":
+        return load_model()
+    return load_model(int(setting.lstrip("v")))
+
+
+def predict_xg(df, model):
+    """Model xG for every shot of a shot table: one matrix product, penalties fixed at 0.76."""
+    if df.empty:
+        return np.zeros(0)
+    xg = 1 / (1 + np.exp(-(design_matrix(df, model) @ np.asarray(model["weights"]))))
+    xg = round3(np.clip(xg, XG_FLOOR, XG_CAP))
+    return np.where((df["situation"] == "Penalty").to_numpy(), PENALTY_XG, xg)
+
+
+def score_shots(df, model=None):
+    """xG for a shot table with the XG_MODEL artifact, or the geometric curve when none is selected."""
+    if df.empty:
+        return np.zeros(0)
+    model = model or active_model()
+    if model is not None:
+        return predict_xg(df, model)
+    return estimate_xg(df["x"].to_numpy(), df["y"].to_numpy(), (df["situation"] == "Penalty").to_numpy(),
+                       df["big_chance"].to_numpy(), (df["body_part"] == "Header").to_numpy())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the logistic xG model on the cached matches.")
+    parser.add_argument("--l2", type=float, default=DEFAULT_L2, help="L2 penalty on the feature weights")
+    parser.add_argument("--recompute", action="store_true",
+                        help="Do not train; re-score the stored shots with the XG_MODEL selection")
+    args = parser.parse_args(argv)
+
+    if args.recompute:
+        from sqlalchemy.orm import Session
+        from EliteAnalytics.backend.database import engine
+        from EliteAnalytics.backend.parser import recompute_xg
+        session = Session(bind=engine)
+        try:
+            n = recompute_xg(session)
+        finally:
+            session.close()
+        print(f"Re-scored {n} stored shots with the {XG_MODEL} xG model.")
+        return
+
+    model = train(l2=args.l2)
+    path = save_model(model)
+    m = model["metrics"]
+    print(f"Trained on {model['shots']} shots from {model['matches']} matches "
+          f"({model['matches_with_understat']} with Understat xG).")
+    print(f"log loss {m['log_loss']}  brier {m['brier_goals']}  xG {m['xg_total']} "
+          f"vs target {m['target_total']} ({m['goals']} goals)")
+    print(f"Saved {path}; scoring uses it once XG_MODEL=latest is set.")
+
+
+if __name__ == "__main__":
+    main()
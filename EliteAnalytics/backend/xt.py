@@ -0,0 +1,349 @@
+"""
+Grid-based Expected Threat (xT) fitted from the ingested event corpus.
+
+The pitch (WhoScored 0-100 x 0-100, attacking towards x=100) is split into a
+GRID_L x GRID_W grid. From every pass, derived carry and shot we estimate per cell
+the probability of shooting vs moving, the goal probability of a shot, and the
+transition matrix of successful moves, then solve
+
+    xT = P(shot) * P(goal) + P(move) * T @ xT
+
+by value iteration. The solved surface is persisted as JSON and a move is valued
+as xT[end cell] - xT[start cell], an O(1) lookup per event.
+
+The counts behind the probabilities live in the model_stats table and are updated
+once per ingest batch (see refresh), so the surface is re-solved from the counts
+instead of refitting the whole history; stored passes are only re-valued when the
+surface moves by more than RESCORE_TOLERANCE relative to its own size.
+
+    python -m EliteAnalytics.backend.xt --rebuild --rescore
+"""
+import os
+import json
+import argparse
+import datetime
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from EliteAnalytics.backend.database import engine, Event, ModelStats
+
+_BACKEND = os.path.dirname(os.path.abspath(__file__))
+SURFACE_PATH = os.path.join(os.path.dirname(_BACKEND), "data", "xt_surface.json")
+
+GRID_L, GRID_W = 16, 12
+MAX_ITER = 200
+TOLERANCE = 1e-6
+# Largest relative surface change (mean absolute change per move, weighted by where moves
+# start, over the mean absolute value per move) that does not warrant re-valuing stored
+# passes. Sparse cells near goal swing on every match, so a per-cell maximum or an absolute
+# threshold re-scores after most ingests; 5% re-scores 12 times over the 33 cached matches
+# ingested one by one, mostly while the corpus is small.
+RESCORE_TOLERANCE = 0.05
+
+SHOT_TYPES = ("MissedShots", "SavedShot", "ShotOnPost", "Goal")
+# A carry is the gap between a received pass and the receiver's next action
+CARRY_MIN, CARRY_MAX = 3.0, 60.0
+
+
+def cell_index(x, y, grid=(GRID_L, GRID_W)):
+    """Flat cell index (row = y band, column = x band) for arrays of WhoScored coordinates."""
+    l, w = grid
+    xi = np.clip((np.asarray(x, dtype=float) / 100.0 * l).astype(int), 0, l - 1)
+    yi = np.clip((np.asarray(y, dtype=float) / 100.0 * w).astype(int), 0, w - 1)
+    return yi * l + xi
+
+
+def load_actions(session, match_ids=None):
+    """Every located event of the corpus (or of match_ids) as a DataFrame, in match/event order."""
+    query = session.query(Event.match_id, Event.team_id, Event.type_name, Event.outcome,
+                          Event.x, Event.y, Event.end_x, Event.end_y, Event.is_shot, Event.is_penalty)\
+        .filter(Event.x.isnot(None), Event.y.isnot(None))
+    if match_ids:
+        query = query.filter(Event.match_id.in_(match_ids))
+    query = query.order_by(Event.match_id, Event.id)
+    return pd.read_sql(query.statement, session.bind)
+
+
+def derive_carries(df):
+    """
+    WhoScored has no carry events: a carry runs from where a completed pass was received
+    to where the same team's next action starts. Returns (x, y, end_x, end_y) arrays.
+    """
+    prev = df.shift(1)
+    linked = (
+        (prev["type_name"] == "Pass") & (prev["outcome"] == "Successful") & prev["end_x"].notna()
+        & (prev["match_id"] == df["match_id"]) & (prev["team_id"] == df["team_id"])
+    ).to_numpy()
+    sx, sy = prev["end_x"].to_numpy(dtype=float), prev["end_y"].to_numpy(dtype=float)
+    ex, ey = df["x"].to_numpy(dtype=float), df["y"].to_numpy(dtype=float)
+    dist = np.hypot(ex - sx, ey - sy)
+    mask = linked & (dist >= CARRY_MIN) & (dist <= CARRY_MAX)
+    return sx[mask], sy[mask], ex[mask], ey[mask]
+
+
+def count_actions(df, grid=(GRID_L, GRID_W)):
+    """
+    Sufficient statistics of the model for a set of events:
+    moves, shots and goals per cell and successful start -> end transition counts.
+    """
+    n = grid[0] * grid[1]
+    moves = np.zeros(n)
+    shots = np.zeros(n)
+    goals = np.zeros(n)
+    transitions = np.zeros((n, n))
+    if df.empty:
+        return {"moves": moves, "shots": shots, "goals": goals, "transitions": transitions}
+
+    passes = df[(df["type_name"] == "Pass") & df["end_x"].notna() & df["end_y"].notna()]
+    start = cell_index(passes["x"], passes["y"], grid)
+    np.add.at(moves, start, 1)
+    ok = (passes["outcome"] == "Successful").to_numpy()
+    np.add.at(transitions, (start[ok], cell_index(passes["end_x"][ok], passes["end_y"][ok], grid)), 1)
+
+    cx, cy, cex, cey = derive_carries(df)
+    c_start = cell_index(cx, cy, grid)
+    np.add.at(moves, c_start, 1)
+    np.add.at(transitions, (c_start, cell_index(cex, cey, grid)), 1)
+
+    shot_rows = df[df["type_name"].isin(SHOT_TYPES) & ~df["is_penalty"].fillna(False).astype(bool)]
+    s_cells = cell_index(shot_rows["x"], shot_rows["y"], grid)
+    np.add.at(shots, s_cells, 1)
+    np.add.at(goals, s_cells[(shot_rows["type_name"] == "Goal").to_numpy()], 1)
+    return {"moves": moves, "shots": shots, "goals": goals, "transitions": transitions}
+
+
+def solve(counts, max_iter=MAX_ITER, tol=TOLERANCE):
+    """Value iteration over the fitted probabilities. Returns (surface vector, iterations)."""
+    moves, shots, goals, transitions = counts["moves"], counts["shots"], counts["goals"], counts["transitions"]
+    total = moves + shots
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_shot = np.where(total > 0, shots / total, 0.0)
+        p_move = np.where(total > 0, moves / total, 0.0)
+        p_goal = np.where(shots > 0, goals / shots, 0.0)
+        # Failed moves keep their share of the row, so the matrix is sub-stochastic
+        t = np.where(moves[:, None] > 0, transitions / moves[:, None], 0.0)
+
+    shoot_value = p_shot * p_goal
+    xt = np.zeros_like(shoot_value)
+    for it in range(1, max_iter + 1):
+        new = shoot_value + p_move * (t @ xt)
+        if np.max(np.abs(new - xt)) < tol:
+            return new, it
+        xt = new
+    return xt, max_iter
+
+
+def _payload(counts, n_matches, grid):
+    xt, iterations = solve(counts)
+    return {
+        "grid": list(grid),
+        "surface": xt.reshape(grid[1], grid[0]).round(6).tolist(),
+        "iterations": iterations,
+        "matches": n_matches,
+        "moves": int(counts["moves"].sum()),
+        "shots": int(counts["shots"].sum()),
+        "fitted_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def fit(session, grid=(GRID_L, GRID_W)):
+    """Fit the surface over the whole events table. Returns the surface payload."""
+    df = load_actions(session)
+    counts = count_actions(df, grid)
+    return _payload(counts, int(df["match_id"].nunique()) if not df.empty else 0, grid)
+
+
+# ---------------------------------------------------------------------------
+# Incremental sufficient statistics
+# ---------------------------------------------------------------------------
+COUNT_FIELDS = ("moves", "shots", "goals", "transitions")
+
+
+def _stats_name(grid):
+    return f"xt_{grid[0]}x{grid[1]}"
+
+
+def _unpack(stats):
+    n = stats.grid_l * stats.grid_w
+    shapes = {"moves": (n,), "shots": (n,), "goals": (n,), "transitions": (n, n)}
+    return {k: np.frombuffer(getattr(stats, k), dtype=np.float64).reshape(shapes[k]).copy() for k in COUNT_FIELDS}
+
+
+def _store(stats, counts, match_ids):
+    for k in COUNT_FIELDS:
+        setattr(stats, k, counts[k].astype(np.float64).tobytes())
+    stats.match_ids = sorted(match_ids)
+    stats.updated_at = datetime.datetime.now().isoformat(timespec="seconds")
+
+
+def get_stats(session, grid=(GRID_L, GRID_W)):
+    return session.get(ModelStats, _stats_name(grid))
+
+
+def add_matches(session, match_ids, grid=(GRID_L, GRID_W)):
+    """
+    Adds the counts of match_ids to the stored statistics, skipping matches already
+    counted. Returns (counts, counted match ids) after the update.
+    """
+    stats = get_stats(session, grid)
+    if stats is None:
+        stats = ModelStats(name=_stats_name(grid), grid_l=grid[0], grid_w=grid[1])
+        session.add(stats)
+        counts, counted = count_actions(pd.DataFrame(), grid), set()
+    else:
+        counts, counted = _unpack(stats), set(stats.match_ids or [])
+
+    new_ids = [m for m in match_ids if m not in counted]
+    if new_ids:
+        delta = count_actions(load_actions(session, new_ids), grid)
+        for k in COUNT_FIELDS:
+            counts[k] += delta[k]
+        counted.update(new_ids)
+        _store(stats, counts, counted)
+        session.commit()
+    return counts, counted
+
+
+def remove_matches(session, match_ids, grid=(GRID_L, GRID_W)):
+    """
+    Subtracts the counts of already counted match_ids, computed from their stored events, so a
+    re-ingested match is counted once. Call before its events are deleted; the caller commits.
+    """
+    stats = get_stats(session, grid)
+    if stats is None:
+        return []
+    counted = set(stats.match_ids or [])
+    old_ids = [m for m in match_ids if m in counted]
+    if old_ids:
+        counts = _unpack(stats)
+        delta = count_actions(load_actions(session, old_ids), grid)
+        for k in COUNT_FIELDS:
+            counts[k] = np.maximum(counts[k] - delta[k], 0.0)
+        _store(stats, counts, counted - set(old_ids))
+    return old_ids
+
+
+def rebuild_stats(session, grid=(GRID_L, GRID_W)):
+    """Recount the statistics from the whole events table."""
+    df = load_actions(session)
+    counts = count_actions(df, grid)
+    stats = get_stats(session, grid)
+    if stats is None:
+        stats = ModelStats(name=_stats_name(grid), grid_l=grid[0], grid_w=grid[1])
+        session.add(stats)
+    _store(stats, counts, set(int(m) for m in df["match_id"].unique()) if not df.empty else set())
+    session.commit()
+    return counts, set(stats.match_ids)
+
+
+def surface_change(counts, old, new):
+    """
+    Mean absolute change of the surface per move, weighted by the move counts of each cell,
+    relative to the mean absolute value of the new surface under the same weights.
+    """
+    moves = counts["moves"]
+    if moves.sum() == 0:
+        moves = np.ones(new.size)
+    scale = (np.abs(new).ravel() * moves).sum()
+    if scale == 0:
+        return 0.0 if np.array_equal(new, old) else float("inf")
+    return float((np.abs(new - old).ravel() * moves).sum() / scale)
+
+
+def refresh(session, match_ids, grid=(GRID_L, GRID_W), tolerance=RESCORE_TOLERANCE):
+    """
+    Called once after a batch of matches is ingested: folds their counts into the statistics,
+    re-solves the surface and, only if it drifted from the persisted one by more than
+    tolerance, saves it and re-values every stored pass. Returns True when the surface was replaced.
+    """
+    counts, counted = add_matches(session, match_ids, grid)
+    payload = _payload(counts, len(counted), grid)
+    current = load_surface()
+    new = np.array(payload["surface"])
+    if current is not None and current.shape == new.shape and surface_change(counts, current, new) <= tolerance:
+        return False
+    save_surface(payload)
+    rescore(session, new)
+    return True
+
+
+def save_surface(payload, path=None):
+    path = path or SURFACE_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+    _surface_cache.clear()
+
+
+_surface_cache = {}
+
+
+def load_surface(path=None):
+    """The persisted surface as a (GRID_W, GRID_L) array, or None before the first fit."""
+    path = path or SURFACE_PATH
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    if mtime is None:
+        return None
+    cached = _surface_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, "r", encoding="utf-8") as f:
+        surface = np.array(json.load(f)["surface"], dtype=float)
+    _surface_cache[path] = (mtime, surface)
+    return surface
+
+
+def move_value(surface, x, y, end_x, end_y):
+    """xT added by moving the ball from (x, y) to (end_x, end_y). Vectorized."""
+    w, l = surface.shape
+    flat = surface.ravel()
+    value = flat[cell_index(end_x, end_y, (l, w))] - flat[cell_index(x, y, (l, w))]
+    return np.round(value, 4)
+
+
+def rescore(session, surface, match_ids=None):
+    """Re-value every completed pass (optionally limited to match_ids) against the surface."""
+    query = session.query(Event.id, Event.x, Event.y, Event.end_x, Event.end_y)\
+        .filter(Event.type_name == "Pass", Event.outcome == "Successful",
+                Event.x.isnot(None), Event.y.isnot(None), Event.end_x.isnot(None), Event.end_y.isnot(None))
+    if match_ids:
+        query = query.filter(Event.match_id.in_(match_ids))
+    rows = query.all()
+    if not rows:
+        return 0
+    ids, xs, ys, exs, eys = zip(*rows)
+    values = move_value(surface, xs, ys, exs, eys)
+    session.bulk_update_mappings(Event, [{"id": i, "xt": float(v)} for i, v in zip(ids, values)])
+    session.commit()
+    return len(ids)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit the grid xT surface from the events table.")
+    parser.add_argument("--rebuild", action="store_true", help="Recount the stored statistics from every event")
+    parser.add_argument("--rescore", action="store_true", help="Re-value stored passes with the new surface")
+    args = parser.parse_args(argv)
+
+    ModelStats.__table__.create(engine, checkfirst=True)
+    session = Session(bind=engine)
+    try:
+        if args.rebuild or get_stats(session) is None:
+            counts, counted = rebuild_stats(session)
+        else:
+            counts, counted = _unpack(get_stats(session)), set(get_stats(session).match_ids or [])
+        payload = _payload(counts, len(counted), (GRID_L, GRID_W))
+        save_surface(payload)
+        print(f"xT surface fitted on {payload['matches']} matches ({payload['moves']} moves, "
+              f"{payload['shots']} shots) in {payload['iterations']} iterations -> {SURFACE_PATH}")
+        if args.rescore:
+            n = rescore(session, np.array(payload["surface"]))
+            print(f"Re-scored {n} passes.")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 const API_BASE = "/api";
 let currentMatchId = null;
 let currentMatchEvents = [];
+let currentAssetSrcsets = {};
 
 // DOM Elements
 const matchSelector = document.getElementById("match-selector");
@@ -80,23 +81,27 @@ async function loadMatch(matchId) {
 
     // Fetch stats, events, momentum, zones concurrently
     try {
-        const [statsRes, eventsRes, momentumRes, zonesRes] = await Promise.all([
+        const [statsRes, eventsRes, momentumRes, zonesRes, assetsRes, playersRes] = await Promise.all([
             fetch(`${API_BASE}/matches/${matchId}/stats`),
             fetch(`${API_BASE}/matches/${matchId}/events`),
-            fetch(`${API_BASE}/matches/${matchId}/momentum`),
-            fetch(`${API_BASE}/tactics/zones?match_id=${matchId}`)
+            fetch(`${API_BASE}/matches/${matchId}/momentum?smoothing=ewm&span=3`),
+            fetch(`${API_BASE}/tactics/zones?match_id=${matchId}`),
+            fetch(`${API_BASE}/matches/${matchId}/assets`),
+            fetch(`${API_BASE}/matches/${matchId}/players`)
         ]);
 
         const stats = await statsRes.json();
         currentMatchEvents = await eventsRes.json();
         const momentum = await momentumRes.json();
         const zones = await zonesRes.json();
+        currentAssetSrcsets = assetsRes.ok ? await assetsRes.json() : {};
+        const players = playersRes.ok ? await playersRes.json() : [];
 
         updateKPIs(stats);
         renderShotMaps();
         renderPassMaps();
         renderMomentum(momentum, stats);
-        renderPlayerTable();
+        renderPlayerTable(players);
         renderPassNetwork(); // D3
 
     } catch (e) {
@@ -113,7 +118,8 @@ function updateKPIs(stats) {
     els.xg.textContent = `${stats.home_xg.toFixed(2)} - ${stats.away_xg.toFixed(2)}`;
     els.poss.textContent = `${stats.home_possession}% - ${stats.away_possession}%`;
     els.tilt.textContent = `${stats.home_field_tilt}% - ${stats.away_field_tilt}%`;
-    els.ppda.textContent = `${stats.home_ppda.toFixed(1)} - ${stats.away_ppda.toFixed(1)}`;
+    const ppda = v => (v === null ? "-" : v.toFixed(1));
+    els.ppda.textContent = `${ppda(stats.home_ppda)} - ${ppda(stats.away_ppda)}`;
 }
 
 // 4. Render Interactive Shot Maps
@@ -128,52 +134,176 @@ function renderShotMaps() {
     }
 }
 
-// 4.5 Render Static Pass Maps (Embedded Python Images)
+// Responsive <picture> for a generated map: AVIF/WebP and 2x variants when rendered, PNG fallback otherwise
+function assetPicture(stem, imgClass) {
+    const variants = currentAssetSrcsets[stem] || {};
+    const sources = ["avif", "webp"]
+        .filter(fmt => variants[fmt])
+        .map(fmt => `<source type="image/${fmt}" srcset="${variants[fmt]}">`)
+        .join("");
+    const pngSrcset = variants.png ? ` srcset="${variants.png}"` : "";
+    return `<picture>${sources}<img src="/assets/png/${stem}.png"${pngSrcset} loading="lazy" decoding="async" onerror="this.onerror=null;this.srcset='';this.src='/assets/png/placeholder.png'" class="${imgClass}"></picture>`;
+}
+
+// 4.5 Render Pass Maps: client-side from exported geometry, rendered images as fallback
+const geometryCache = {};
+
+// Only successful loads stay cached: a 404 or failed fetch is retried on the next view,
+// since the geometry may be exported (or the network back) by then
+function loadGeometry(name) {
+    if (!(name in geometryCache)) {
+        geometryCache[name] = fetch(`/assets/json/${name}.json`)
+            .then(res => res.ok ? res.json() : null)
+            .catch(() => null)
+            .then(geo => {
+                if (geo === null) delete geometryCache[name];
+                return geo;
+            });
+    }
+    return geometryCache[name];
+}
+
+// StatsBomb 120x80 pitch markings as [x1, y1, x2, y2] segments
+const PITCH_SEGMENTS = [
+    [0, 0, 120, 0], [120, 0, 120, 80], [120, 80, 0, 80], [0, 80, 0, 0], [60, 0, 60, 80],
+    [0, 18, 18, 18], [18, 18, 18, 62], [18, 62, 0, 62], [120, 18, 102, 18], [102, 18, 102, 62], [102, 62, 120, 62],
+    [0, 30, 6, 30], [6, 30, 6, 50], [6, 50, 0, 50], [120, 30, 114, 30], [114, 30, 114, 50], [114, 50, 120, 50]
+];
+
+// proj maps StatsBomb (x, y) to SVG user units; vertical pitches attack upwards like mplsoccer's VerticalPitch
+function pitchSvg(el, vertical, pitchColor, lineColor) {
+    const proj = vertical ? (x, y) => [y, 120 - x] : (x, y) => [x, y];
+    const [w, h] = vertical ? [80, 120] : [120, 80];
+    const svg = d3.select(el).append("svg")
+        .attr("viewBox", `-2 -8 ${w + 4} ${h + 10}`)
+        .attr("class", "w-full h-auto");
+    svg.append("rect").attr("x", -2).attr("y", -8).attr("width", w + 4).attr("height", h + 10).attr("fill", pitchColor);
+    const marks = svg.append("g").attr("stroke", lineColor).attr("stroke-width", 0.3).attr("fill", "none");
+    PITCH_SEGMENTS.forEach(([x1, y1, x2, y2]) => {
+        const [a1, b1] = proj(x1, y1), [a2, b2] = proj(x2, y2);
+        marks.append("line").attr("x1", a1).attr("y1", b1).attr("x2", a2).attr("y2", b2);
+    });
+    const [cx, cy] = proj(60, 40);
+    marks.append("circle").attr("cx", cx).attr("cy", cy).attr("r", 10);
+    [[12, 40], [108, 40], [60, 40]].forEach(([x, y]) => {
+        const [px, py] = proj(x, y);
+        marks.append("circle").attr("cx", px).attr("cy", py).attr("r", 0.4).attr("fill", lineColor);
+    });
+    return { svg, proj };
+}
+
+function drawPassGeometry(el, geo, filterCol, title) {
+    const { svg, proj } = pitchSvg(el, false, "#2d572c", "white");
+    const col = geo.columns.indexOf(filterCol);
+    const passes = col >= 0 ? geo.passes.filter(p => p[col]) : geo.passes;
+    const nSucc = passes.filter(p => p[4]).length;
+
+    // Incomplete underneath, completed on top (same order as the rendered PNG)
+    [[0, geo.styles.incomplete], [1, geo.styles.complete]].forEach(([complete, style]) => {
+        const layer = svg.append("g").attr("stroke", style.color).attr("stroke-opacity", style.alpha)
+            .attr("stroke-width", style.lw * 0.2).attr("stroke-linecap", "round");
+        passes.filter(p => p[4] === complete).forEach(p => {
+            const [x1, y1] = proj(p[0], p[1]), [x2, y2] = proj(p[2], p[3]);
+            layer.append("line").attr("x1", x1).attr("y1", y1).attr("x2", x2).attr("y2", y2);
+            layer.append("circle").attr("cx", x2).attr("cy", y2).attr("r", style.lw * 0.2)
+                .attr("fill", style.color).attr("stroke", "none");
+        });
+    });
+    svg.append("text").attr("x", 60).attr("y", -3).attr("text-anchor", "middle")
+        .attr("fill", "white").attr("font-size", 3.2).attr("font-weight", "bold")
+        .text(`${geo.team} - ${title} (${nSucc}/${passes.length} Successful)`);
+}
+
+function drawNetworkGeometry(el, geo) {
+    const { svg, proj } = pitchSvg(el, true, "#ffffff", "#c7c7c7");
+    const nodes = Object.fromEntries(geo.nodes.map(n => [n.id, n]));
+    const defs = svg.append("defs");
+    defs.append("marker").attr("id", `arrow-${geo.side}`).attr("viewBox", "0 0 10 10")
+        .attr("refX", 8).attr("refY", 5).attr("markerWidth", 4).attr("markerHeight", 4)
+        .attr("orient", "auto-start-reverse")
+        .append("path").attr("d", "M 0 0 L 10 5 L 0 10 z").attr("fill", geo.color);
+
+    geo.edges.forEach(e => {
+        const a = nodes[e.source], b = nodes[e.target];
+        if (!a || !b) return;
+        const [x1, y1] = proj(a.x, a.y), [x2, y2] = proj(b.x, b.y);
+        // Stop short of the target node, as in the rendered network
+        const dist = Math.hypot(x2 - x1, y2 - y1) || 1;
+        const k = Math.max(dist - 4, 0) / dist;
+        svg.append("line")
+            .attr("x1", x1).attr("y1", y1).attr("x2", x1 + (x2 - x1) * k).attr("y2", y1 + (y2 - y1) * k)
+            .attr("stroke", geo.color).attr("stroke-opacity", e.alpha).attr("stroke-width", e.lw * 0.15)
+            .attr("marker-end", `url(#arrow-${geo.side})`)
+            .append("title").text(`${a.label} → ${b.label}: ${e.count} passes`);
+    });
+    geo.nodes.forEach(n => {
+        const [x, y] = proj(n.x, n.y);
+        const r = Math.sqrt(n.size) * 0.11;
+        svg.append("circle").attr("cx", x).attr("cy", y).attr("r", r)
+            .attr("fill", "white").attr("stroke", geo.color).attr("stroke-width", 0.5);
+        svg.append("text").attr("x", x).attr("y", y).attr("dy", "0.35em").attr("text-anchor", "middle")
+            .attr("fill", geo.color).attr("font-size", 2.6).attr("font-weight", "bold").text(n.label);
+    });
+}
+
+// Fill a map slot from its geometry file when exported, otherwise with the rendered image
+async function fillMapSlot(slotId, geometryName, draw, fallbackHtml, isCurrent) {
+    const geo = await loadGeometry(geometryName);
+    const el = document.getElementById(slotId);
+    if (!el || !isCurrent()) return;
+    if (geo) {
+        el.innerHTML = "";
+        draw(el, geo);
+    } else {
+        el.innerHTML = fallbackHtml;
+    }
+}
+
 function renderPassMaps() {
     const container = document.getElementById("passmap-container");
     const overlayType = document.querySelector('input[name="passmap_overlay"]:checked').value;
 
-    if (overlayType === "total") {
-        container.innerHTML = `
-        <div class="grid grid-cols-1 lg:grid-cols-2 gap-4 h-full bg-[#0d0d1a] border border-gray-800 rounded-lg items-center text-center p-4 min-h-[500px]">
-            <div>
-                <img src="/assets/png/${currentMatchId}_home_total_passes.png" onerror="this.src='/assets/png/placeholder.png'" class="w-full h-auto max-h-[500px] object-contain mx-auto rounded shadow-lg">
-            </div>
-            <div>
-                <img src="/assets/png/${currentMatchId}_away_total_passes.png" onerror="this.src='/assets/png/placeholder.png'" class="w-full h-auto max-h-[500px] object-contain mx-auto rounded shadow-lg">
-            </div>
-        </div>`;
-    } else if (overlayType === "final_third") {
-        container.innerHTML = `
-        <div class="grid grid-cols-1 lg:grid-cols-2 gap-4 h-full bg-[#0d0d1a] border border-gray-800 rounded-lg items-center text-center p-4 min-h-[500px]">
-            <div>
-                <img src="/assets/png/${currentMatchId}_home_final_third.png" onerror="this.src='/assets/png/placeholder.png'" class="w-full h-auto max-h-[500px] object-contain mx-auto mix-blend-screen rounded shadow-lg">
-            </div>
-            <div>
-                <img src="/assets/png/${currentMatchId}_away_final_third.png" onerror="this.src='/assets/png/placeholder.png'" class="w-full h-auto max-h-[500px] object-contain mx-auto mix-blend-screen rounded shadow-lg">
-            </div>
-        </div>`;
-    } else if (overlayType === "progressive") {
-        container.innerHTML = `
-        <div class="grid grid-cols-1 lg:grid-cols-2 gap-4 h-full bg-[#0d0d1a] border border-gray-800 rounded-lg items-center text-center p-4 min-h-[500px]">
-            <div>
-                <img src="/assets/png/${currentMatchId}_home_progressive_passes.png" onerror="this.src='/assets/png/placeholder.png'" class="w-full h-auto max-h-[500px] object-contain mx-auto rounded shadow-lg">
-            </div>
-            <div>
-                <img src="/assets/png/${currentMatchId}_away_progressive_passes.png" onerror="this.src='/assets/png/placeholder.png'" class="w-full h-auto max-h-[500px] object-contain mx-auto rounded shadow-lg">
-            </div>
-        </div>`;
-    } else if (overlayType === "dribbles") {
-        container.innerHTML = `
+    const suffixes = {
+        total: "total_passes",
+        final_third: "final_third",
+        progressive: "progressive_passes",
+        dribbles: "dribbles"
+    };
+    const suffix = suffixes[overlayType];
+    if (!suffix) return;
+
+    // Pass overlays are client-side filters over one geometry file per team
+    const geometryViews = {
+        total: [null, "Total Passes"],
+        progressive: ["progressive", "Progressive Passes"],
+        final_third: ["final_third", "Final Third Entries"]
+    };
+    const useGeometry = overlayType in geometryViews;
+
+    const blend = overlayType === "final_third" ? " mix-blend-screen" : "";
+    const imgClass = `w-full h-auto max-h-[500px] object-contain mx-auto${blend} rounded shadow-lg`;
+    const slot = side => useGeometry ? "" : assetPicture(`${currentMatchId}_${side}_${suffix}`, imgClass);
+    container.innerHTML = `
         <div class="grid grid-cols-1 lg:grid-cols-2 gap-4 h-full bg-[#0d0d1a] border border-gray-800 rounded-lg items-center text-center p-4 min-h-[500px]">
-            <div>
-                <img src="/assets/png/${currentMatchId}_home_dribbles.png" onerror="this.src='/assets/png/placeholder.png'" class="w-full h-auto max-h-[500px] object-contain mx-auto rounded shadow-lg">
+            <div id="passmap-home">
+                ${slot("home")}
             </div>
-            <div>
-                <img src="/assets/png/${currentMatchId}_away_dribbles.png" onerror="this.src='/assets/png/placeholder.png'" class="w-full h-auto max-h-[500px] object-contain mx-auto rounded shadow-lg">
+            <div id="passmap-away">
+                ${slot("away")}
             </div>
         </div>`;
-    }
+    if (!useGeometry) return;
+
+    const [filterCol, title] = geometryViews[overlayType];
+    const matchId = currentMatchId;
+    const isCurrent = () => matchId === currentMatchId &&
+        document.querySelector('input[name="passmap_overlay"]:checked').value === overlayType;
+    ["home", "away"].forEach(side => fillMapSlot(
+        `passmap-${side}`, `${matchId}_${side}_passes`,
+        (el, geo) => drawPassGeometry(el, geo, filterCol, title),
+        assetPicture(`${matchId}_${side}_${suffix}`, imgClass),
+        isCurrent
+    ));
 }
 
 // 5. Render Momentum Graph (Plotly)
@@ -213,40 +343,24 @@ function renderMomentum(momentum, stats) {
 }
 
 // 6. Render Player Table
-function renderPlayerTable() {
-    // Aggregate event data per player
-    const pStats = {};
-    currentMatchEvents.forEach(e => {
-        if (!e.player || e.player === "Unknown") return;
-        if (!pStats[e.player]) {
-            pStats[e.player] = { team: e.team, xg: 0, xt: 0, passes: 0, prog_passes: 0 };
-        }
-
-        if (e.is_shot && e.xg) pStats[e.player].xg += e.xg;
-        if (e.type === "Pass") {
-            if (e.outcome === "Successful") pStats[e.player].passes += 1;
-            if (e.xt > 0) {
-                pStats[e.player].xt += e.xt;
-                pStats[e.player].prog_passes += 1;
-            }
-        }
-    });
-
-    const sortedPlayers = Object.entries(pStats).sort((a, b) => b[1].xt - a[1].xt);
+function renderPlayerTable(players) {
+    // Minutes and totals come from the player_matches rollup, sorted by xT added
+    const sortedPlayers = [...players].sort((a, b) => b.xt - a.xt);
 
     els.tableBody.innerHTML = "";
-    sortedPlayers.forEach(([name, s]) => {
+    sortedPlayers.forEach(s => {
         if (s.passes < 5 && s.xg === 0) return; // Skip minor subs for brevity
 
         const tr = document.createElement("tr");
         tr.className = "border-b border-gray-800 hover:bg-white hover:bg-opacity-5 cursor-pointer transition-colors";
+        tr.title = `${Math.round(s.minutes)}' played · xT/90 ${s.xt_p90.toFixed(3)} · xG/90 ${s.xg_p90.toFixed(2)}`;
         tr.innerHTML = `
-            <td class="px-6 py-3 font-medium text-white">${name}</td>
+            <td class="px-6 py-3 font-medium text-white">${s.player}</td>
             <td class="px-6 py-3">${s.team}</td>
             <td class="px-6 py-3">${s.xg.toFixed(2)}</td>
             <td class="px-6 py-3 font-bold text-[#edbb00]">${s.xt.toFixed(3)}</td>
-            <td class="px-6 py-3">${s.passes}</td>
-            <td class="px-6 py-3">${s.prog_passes}</td>
+            <td class="px-6 py-3">${s.completed_passes}</td>
+            <td class="px-6 py-3">${s.progressive_passes}</td>
         `;
         els.tableBody.appendChild(tr);
     });
@@ -263,17 +377,25 @@ async function renderPassNetwork() {
                     <div class="w-2.5 h-2.5 rounded-full bg-[#a50044] shrink-0"></div>
                     <h4 class="text-sm font-semibold tracking-wide text-[#ccccee]">${els.homeName.textContent} Pass Network</h4>
                 </div>
-                <img src="/assets/png/${currentMatchId}_home_passnetwork.png" onerror="this.src='/assets/png/placeholder.png'" class="w-full block bg-white border-t border-[#111128]">
+                <div id="network-home" class="bg-white border-t border-[#111128]"></div>
             </div>
             <div class="bg-[#111128] border border-[#222244] rounded-xl overflow-hidden shadow-lg transition-all duration-300 hover:border-[#4444aa] hover:shadow-2xl">
                 <div class="px-5 py-4 border-b border-[#222244] flex items-center gap-3">
                     <div class="w-2.5 h-2.5 rounded-full bg-[#004d98] shrink-0"></div>
                     <h4 class="text-sm font-semibold tracking-wide text-[#ccccee]">${els.awayName.textContent} Pass Network</h4>
                 </div>
-                <img src="/assets/png/${currentMatchId}_away_passnetwork.png" onerror="this.src='/assets/png/placeholder.png'" class="w-full block bg-white border-t border-[#111128]">
+                <div id="network-away" class="bg-white border-t border-[#111128]"></div>
             </div>
         </div>
     `;
+
+    const matchId = currentMatchId;
+    ["home", "away"].forEach(side => fillMapSlot(
+        `network-${side}`, `${matchId}_${side}_passnetwork`,
+        drawNetworkGeometry,
+        assetPicture(`${matchId}_${side}_passnetwork`, "w-full block"),
+        () => matchId === currentMatchId
+    ));
 }
 
 // 8. Season Leaderboard
@@ -292,9 +414,10 @@ async function loadSeasonLeaderboard() {
                 <td class="px-6 py-4 text-gray-400">${idx + 1}</td>
                 <td class="px-6 py-4 font-bold text-white">${p.player}</td>
                 <td class="px-6 py-4">${p.team}</td>
-                <td class="px-6 py-4 text-green-400 font-medium">${p.xt.toFixed(3)}</td>
-                <td class="px-6 py-4 text-[#edbb00] font-bold">${p.prog_passes}</td>
-                <td class="px-6 py-4 text-blue-400 font-medium">${p.xg.toFixed(2)}</td>
+                <td class="px-6 py-4 text-gray-400">${p.minutes}'</td>
+                <td class="px-6 py-4 text-green-400 font-medium">${p.xt_p90.toFixed(3)}</td>
+                <td class="px-6 py-4 text-[#edbb00] font-bold">${p.progressive_passes_p90.toFixed(2)}</td>
+                <td class="px-6 py-4 text-blue-400 font-medium">${p.xg_p90.toFixed(2)}</td>
             `;
             tbody.appendChild(tr);
         });
@@ -10,7 +10,7 @@ Sections (top to bottom):
   5. Final Third Entries (side-by-side PNGs)
 """
 
-import base64, json, math, os, sys
+import base64, math, os, sys
 
 # Allow importing from same Projects/ directory
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -23,6 +23,9 @@ except ImportError:
 # ---------------------------------------------------------------------------
 _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CACHE_FILE    = os.path.join(_PROJECT_ROOT, "match_1914105_cache.json")
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+from EliteAnalytics.backend.cache_io import read_cache
 OUTPUT_HTML   = os.path.join(_PROJECT_ROOT, "girona_barcelona_dashboard.html")
 
 IMGS = {
@@ -38,8 +41,7 @@ COMBINED_SHOTMAP_WS = os.path.join(_PROJECT_ROOT, "assets", "1914105_shotmap_ws.
 # STATS
 # ---------------------------------------------------------------------------
 def load_stats():
-    with open(CACHE_FILE, "r", encoding="utf-8") as f:
-        d = json.load(f)
+    d = read_cache(CACHE_FILE)
     home = d.get("home", {}); away = d.get("away", {})
     events = d.get("events", [])
     hid = home.get("teamId");  aid = away.get("teamId")
@@ -3,22 +3,27 @@ Fetch match stats from Understat for match 29395 (Girona 2-1 Barcelona).
 Reads all available fields directly from the match_info JSON blob.
 """
 
-import urllib.request, re, json, math, os
+import re, json, os, sys
+import numpy as np
 
 UNDERSTAT_URL = "https://understat.com/match/29395"
 _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+from EliteAnalytics.backend.xg import geometric_xg
+from EliteAnalytics.backend.coords import events_to_sb
+from EliteAnalytics.backend.cache_io import read_cache
+from EliteAnalytics.backend.http_client import get_client
+
 CACHE_FILE    = os.path.join(_PROJECT_ROOT, "match_1914105_cache.json")
 
 
 def _fetch_match_info():
     """Fetch and decode Understat match_info blob. Returns dict or None."""
-    req = urllib.request.Request(
-        UNDERSTAT_URL,
-        headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-    )
     try:
-        with urllib.request.urlopen(req, timeout=15) as r:
-            page = r.read().decode("utf-8")
+        r = get_client().get(UNDERSTAT_URL, timeout=15)
+        r.raise_for_status()
+        page = r.text
     except Exception as e:
         print(f"  [Understat] Request failed: {e}")
         return None
@@ -76,24 +81,20 @@ def fetch_understat_xg():
 
 def calc_ws_geometry_xg(cache_path):
     """Geometry-based xG from WhoScored coordinates. Returns (h_xg, a_xg, h_name, a_name)."""
-    with open(cache_path, "r", encoding="utf-8") as f:
-        d = json.load(f)
+    d = read_cache(cache_path)
     home_id = d["home"]["teamId"]
     away_id = d["away"]["teamId"]
     SHOT_TYPES = ("MissedShots", "SavedShot", "ShotOnPost", "Goal")
 
     def est(tid):
-        total = 0.0
-        for e in d.get("events", []):
-            if e.get("teamId") != tid: continue
-            if e.get("type", {}).get("displayName", "") not in SHOT_TYPES: continue
-            x_sb = e.get("x", 0) * 1.20
-            y_sb = 80 - e.get("y", 0) * 0.80
-            dx = 120 - x_sb; dy = 40 - y_sb
-            dist = max(math.sqrt(dx**2 + dy**2), 0.5)
-            angle = math.atan2(4.0, dist)
-            total += min(max((angle / (math.pi / 2)) * (1 / (1 + dist / 30)), 0.01), 0.95)
-        return round(total, 2)
+        shots = [e for e in d.get("events", [])
+                 if e.get("teamId") == tid and e.get("type", {}).get("displayName", "") in SHOT_TYPES]
+        if not shots:
+            return 0.0
+        x_sb, y_sb = events_to_sb(shots)
+        xg, _ = geometric_xg(x_sb, y_sb)
+        # cumsum keeps the shot-by-shot summation order of the old running total
+        return round(float(np.cumsum(np.clip(xg, 0.01, 0.95))[-1]), 2)
 
     return est(home_id), est(away_id), d["home"]["name"], d["away"]["name"]
 
@@ -1,7 +1,21 @@
-import soccerdata as sd
+import os
 import sys
+import soccerdata as sd
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+from EliteAnalytics.backend import fixtures
 
 def get_bcn_ids():
+    # The scraper daemon keeps the team schedule cached; only go to soccerdata when it is stale
+    schedule = fixtures.Schedule()
+    if not schedule.stale() and "--refresh" not in sys.argv:
+        match_ids = list(schedule.fixtures)
+        print(f"Cached schedule ({len(match_ids)} matches):")
+        print(match_ids)
+        return match_ids
+    
     match_ids = []
     
     try:
@@ -26,6 +40,7 @@ def get_bcn_ids():
 
     print("\nCombined True IDs:")
     print(match_ids)
+    return match_ids
     
 if __name__ == "__main__":
     get_bcn_ids()
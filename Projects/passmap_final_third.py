@@ -7,7 +7,7 @@ Generates two images:
   - girona_final_third_entries.png
 """
 
-import json, os
+import os, sys
 import pandas as pd
 from mplsoccer import Pitch
 from matplotlib.lines import Line2D
@@ -17,13 +17,14 @@ import matplotlib.pyplot as plt
 # CONFIG
 # ---------------------------------------------------------------------------
 _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+from EliteAnalytics.backend.coords import ws_to_sb
+from EliteAnalytics.backend.cache_io import read_cache
+
 CACHE_FILE    = os.path.join(_PROJECT_ROOT, "match_1914105_cache.json")
 MATCH_LABEL   = "Girona vs Barcelona (16/02/2026)"
 
-# WhoScored 0-100 → StatsBomb 0-120 x 0-80
-SCALE_X = 1.20
-SCALE_Y = 0.80
-
 # Final third starts at x = 80 in StatsBomb coordinates
 FINAL_THIRD_X = 80.0
 
@@ -32,8 +33,7 @@ FINAL_THIRD_X = 80.0
 # helpers
 # ---------------------------------------------------------------------------
 def load_cache():
-    with open(CACHE_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return read_cache(CACHE_FILE)
 
 
 def _team_id(match_data, team_name):
@@ -65,14 +65,19 @@ def build_pass_df(match_data, team_name):
             continue
 
         rows.append({
-            "x":            ev.get("x", 0) * SCALE_X,
-            "y":            80 - ev.get("y", 0) * SCALE_Y,   # flip Y
-            "end_x":        float(end_x_raw) * SCALE_X,
-            "end_y":        80 - float(end_y_raw) * SCALE_Y,  # flip Y
+            "x":            ev.get("x", 0),
+            "y":            ev.get("y", 0),
+            "end_x":        float(end_x_raw),
+            "end_y":        float(end_y_raw),
             "pass_outcome": "Complete" if outcome == "Successful" else "Incomplete",
         })
 
-    return pd.DataFrame(rows)
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        # WhoScored 0-100 → StatsBomb 0-120 x 0-80 (flips Y)
+        df["x"], df["y"] = ws_to_sb(df["x"], df["y"])
+        df["end_x"], df["end_y"] = ws_to_sb(df["end_x"], df["end_y"])
+    return df
 
 
 def draw_final_third(df, team_name, out_file):
@@ -3,8 +3,7 @@ Total and Progressive Pass Maps – Girona vs Barcelona (16/02/2026)
 Generates high-fidelity static PNGs using mplsoccer for total and progressive passes.
 """
 
-import json, os
-import pandas as pd
+import os, sys
 from mplsoccer import Pitch
 import matplotlib.pyplot as plt
 
@@ -12,16 +11,17 @@ import matplotlib.pyplot as plt
 # CONFIG
 # ---------------------------------------------------------------------------
 _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+from EliteAnalytics.backend.passes import pass_frame
+from EliteAnalytics.backend.cache_io import read_cache
+
 CACHE_FILE    = os.path.join(_PROJECT_ROOT, "match_1914105_cache.json")
 MATCH_LABEL   = "Girona vs Barcelona (16/02/2026)"
 
-# WhoScored 0-100 -> StatsBomb 0-120 x 0-80
-SCALE_X = 1.20
-SCALE_Y = 0.80
 
 def load_cache():
-    with open(CACHE_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return read_cache(CACHE_FILE)
 
 def _team_id(match_data, team_name):
     for side in ("home", "away"):
@@ -31,39 +31,13 @@ def _team_id(match_data, team_name):
     raise ValueError(f"Team '{team_name}' not found")
 
 def build_pass_df(match_data, team_name):
-    tid = _team_id(match_data, team_name)
-    rows = []
-    for ev in match_data.get("events", []):
-        if ev.get("type", {}).get("displayName") != "Pass": continue
-        if ev.get("teamId") != tid: continue
-
-        outcome = ev.get("outcomeType", {}).get("displayName", "")
-        end_x_raw = ev.get("endX")
-        end_y_raw = ev.get("endY")
-        if end_x_raw is None or end_y_raw is None: continue
-
-        # Progressive pass logic (from backend/parser.py)
-        is_prog = False
-        if outcome == "Successful":
-            x = ev.get("x", 0) * SCALE_X
-            y = 80 - ev.get("y", 0) * SCALE_Y
-            end_x = float(end_x_raw) * SCALE_X
-            end_y = 80 - float(end_y_raw) * SCALE_Y
-
-            if x >= 48:
-                if x < 60 and (end_x - x) >= 30: is_prog = True
-                elif 60 <= x <= 90 and (end_x - x) >= 15: is_prog = True
-                elif x > 90 and (end_x - x) >= 10: is_prog = True
-
-        rows.append({
-            "x": ev.get("x", 0) * SCALE_X,
-            "y": 80 - ev.get("y", 0) * SCALE_Y,
-            "end_x": float(end_x_raw) * SCALE_X,
-            "end_y": 80 - float(end_y_raw) * SCALE_Y,
-            "pass_outcome": "Complete" if outcome == "Successful" else "Incomplete",
-            "is_progressive": is_prog
-        })
-    return pd.DataFrame(rows)
+    # Passes in StatsBomb coordinates, classified like the parser and the dashboard assets
+    df = pass_frame(match_data.get("events", []))
+    df = df[df["team_id"] == _team_id(match_data, team_name)].reset_index(drop=True)
+    df["pass_outcome"] = df["outcome"].map(lambda o: "Complete" if o == "Successful" else "Incomplete")
+    # Successful progressive passes only
+    df["is_progressive"] = df["progressive"] & (df["pass_outcome"] == "Complete")
+    return df
 
 def draw_pass_map(df, team_name, title_suffix, out_file, color_val="#004d98"):
     pitch = Pitch(pitch_type="statsbomb", pitch_color="#2d572c", line_color="white")
@@ -12,6 +12,8 @@ approach using the lineups/heatmap data.
 import math
 import json
 import time
+import os
+import sys
 import requests
 import pandas as pd
 from mplsoccer import VerticalPitch
@@ -25,9 +27,12 @@ SOFASCORE_EVENT_ID = 14083491
 TEAM_NAME = "Barcelona"
 OUTPUT_IMG = "barcelona_girona_passnetwork_ss.png"
 
-# SofaScore uses 0-100 coords; StatsBomb uses 0-120 x 0-80
-SCALE_X = 1.20
-SCALE_Y = 0.80
+# SofaScore uses 0-100 coords; StatsBomb uses 0-120 x 0-80 (see backend/coords.py)
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+from EliteAnalytics.backend.coords import sofascore_to_sb
+from EliteAnalytics.backend.http_client import get_client
 
 HEADERS = {
     "User-Agent": (
@@ -47,11 +52,11 @@ BASE_URL = "https://www.sofascore.com/api/v1"
 # ---------------------------------------------------------------------------
 
 def api_get(path, retries=3, delay=2):
-    """GET a SofaScore API endpoint with retry logic."""
+    """GET a SofaScore API endpoint (pooled and cached, see backend/http_client.py) with retry logic."""
     url = f"{BASE_URL}{path}"
     for attempt in range(retries):
         try:
-            r = requests.get(url, headers=HEADERS, timeout=15)
+            r = get_client().get(url, headers=HEADERS, timeout=15)
             if r.status_code == 200:
                 return r.json()
             print(f"  [{r.status_code}] {url}")
@@ -169,12 +174,14 @@ def build_dataframe_from_coordinates_and_incidents(
                 "player_name":   player.get("name", "Unknown"),
                 "jersey_number": player.get("jerseyNumber"),
                 "position":      pos,
-                "x":             avg_x * SCALE_X,
-                "y":             avg_y * SCALE_Y,
+                "x":             avg_x,
+                "y":             avg_y,
                 "substitute":    p.get("substitute", False),
             })
 
     df = pd.DataFrame(rows)
+    if not df.empty:
+        df["x"], df["y"] = sofascore_to_sb(df["x"], df["y"])
     print(f"Built positions DataFrame: {len(df)} players for {team_name}")
 
     # Find first sub time from incidents
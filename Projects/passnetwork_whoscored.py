@@ -5,12 +5,8 @@ Based on the exact logic from 4.11 Pass Networks.ipynb
 """
 
 import math
-import json
-import time
 import numpy as np
 import pandas as pd
-from selenium import webdriver
-from bs4 import BeautifulSoup
 from mplsoccer import VerticalPitch
 import matplotlib.pyplot as plt
 import matplotlib.lines as mlines
@@ -30,13 +26,18 @@ OPPONENT  = "Girona"                     # opponent team
 # Resolve paths relative to the project root (one level up from Projects/)
 import os as _os
 _PROJECT_ROOT = _os.path.dirname(_os.path.dirname(_os.path.abspath(__file__)))
+import sys as _sys
+if _PROJECT_ROOT not in _sys.path:
+    _sys.path.insert(0, _PROJECT_ROOT)
+from EliteAnalytics.backend.coords import ws_to_sb
+from EliteAnalytics.backend.whoscored import wait_for_match_centre, read_match_centre
+from EliteAnalytics.backend.browser_pool import get_pool
+from EliteAnalytics.backend.cache_io import read_cache, write_cache
 OUTPUT_IMG      = _os.path.join(_PROJECT_ROOT, "barcelona_girona_passnetwork_ws.png")
 OUTPUT_IMG_OPP  = _os.path.join(_PROJECT_ROOT, "girona_barcelona_passnetwork_ws.png")
 CACHE_FILE      = _os.path.join(_PROJECT_ROOT, "match_1914105_cache.json")
 
-# WhoScored uses 0-100 coords; StatsBomb uses 0-120 x 0-80
-SCALE_X = 1.20   # 100 -> 120
-SCALE_Y = 0.80   # 100 -> 80
+# WhoScored uses 0-100 coords; StatsBomb uses 0-120 x 0-80 (see backend/coords.py)
 
 
 # ---------------------------------------------------------------------------
@@ -45,48 +46,25 @@ SCALE_Y = 0.80   # 100 -> 80
 
 def scrape_whoscored(url):
     """Open the WhoScored match page, return the parsed matchCentreData dict."""
-    print("Initialising Chrome ...")
-    opts = webdriver.ChromeOptions()
-    opts.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/91.0.4472.124 Safari/537.36"
-    )
-    opts.add_argument("--window-size=1920,1080")
-    opts.add_argument("--disable-blink-features=AutomationControlled")
-
-    driver = webdriver.Chrome(options=opts)
+    print("Initialising Chrome (pooled) ...")
+    pool = get_pool()
     try:
-        print(f"Navigating to {url}")
-        driver.get(url)
-
-        print("Waiting 25 s for JS to render ...")
-        time.sleep(25)
-
-        html = driver.page_source
+        with pool.driver() as driver:
+            print(f"Navigating to {url}")
+            driver.get(url)
+
+            print("Waiting for matchCentreData ...")
+            waited = wait_for_match_centre(driver)
+            data = read_match_centre(driver) if waited is not None else None
+            # Only serialized for the debug dump
+            html = driver.page_source if data is None else None
     finally:
-        driver.quit()
-
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Look for the <script> containing matchCentreData
-    for script in soup.find_all("script"):
-        text = script.string or ""
-        if "matchCentreData:" in text:
-            print("Found matchCentreData script block.")
-            start = text.find("matchCentreData:") + len("matchCentreData:")
-            content = text[start:].strip()
-
-            # Trim at the next JS variable boundary
-            if "matchCentreEventTypeJson" in content:
-                content = content.split("matchCentreEventTypeJson")[0].strip()
-                if content.endswith(","):
-                    content = content[:-1]
+        pool.shutdown()
 
-            data = json.loads(content)
-            n_events = len(data.get("events", []))
-            print(f"Parsed OK - {n_events} events found.")
-            return data
+    if data is not None:
+        print(f"Page ready after {waited} s.")
+        print(f"Parsed OK - {len(data.get('events', []))} events found.")
+        return data
 
     # If we get here, dump for debug
     with open("who_debug.html", "w", encoding="utf-8") as f:
@@ -165,8 +143,8 @@ def events_to_dataframe(match_data, team_name):
             "type":         evt_type,
             "player_id":    ev.get("playerId"),
             "team":         team_name,
-            "x":            ev.get("x", 0) * SCALE_X,
-            "y":            80 - ev.get("y", 0) * SCALE_Y,   # flip Y axis
+            "x":            ev.get("x", 0),
+            "y":            ev.get("y", 0),
             "minute":       ev.get("minute", 0),
             "second":       ev.get("second", 0),
             # WhoScored marks successful passes with outcomeType "Successful"
@@ -174,6 +152,8 @@ def events_to_dataframe(match_data, team_name):
         })
 
     df = pd.DataFrame(rows)
+    if not df.empty:
+        df["x"], df["y"] = ws_to_sb(df["x"], df["y"])   # flips Y axis
     print(f"DataFrame built: {len(df)} events for {team_name}")
     return df
 
@@ -352,13 +332,11 @@ if __name__ == "__main__":
     # 1. Scrape (or load from cache)
     if _os.path.exists(CACHE_FILE):
         print("Loading cached data ...")
-        with open(CACHE_FILE, "r", encoding="utf-8") as f:
-            match_data = json.load(f)
+        match_data = read_cache(CACHE_FILE)
         print(f"Loaded {len(match_data.get('events', []))} events from cache.")
     else:
         match_data = scrape_whoscored(URL)
-        with open(CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(match_data, f)
+        write_cache(CACHE_FILE, match_data)
         print("Cached data to file.")
 
     # 2. Process BOTH teams
@@ -16,7 +16,7 @@ Generates:
   - girona_shotmap.png     +  girona_shotmap.html
 """
 
-import json, os
+import os
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -24,33 +24,23 @@ import matplotlib.colors as mcolors
 from matplotlib.lines import Line2D
 from mplsoccer import VerticalPitch
 import plotly.graph_objects as go
+import sys
 
 # ---------------------------------------------------------------------------
 # CONFIG
 # ---------------------------------------------------------------------------
 _PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
+from EliteAnalytics.backend.xg_model import extract_qualifiers as _extract_qualifiers, score_shots
+from EliteAnalytics.backend.coords import events_to_sb
+from EliteAnalytics.backend.cache_io import read_cache
+
 CACHE_FILE    = os.path.join(_PROJECT_ROOT, "match_1914105_cache.json")
 MATCH_LABEL   = "Girona vs Barcelona (16/02/2026)"
 
-# WhoScored 0-100 → StatsBomb coordinate conversion
-# Simple 1.20 linear scaling has ~1-unit error at key landmarks.
-# Calibrated piecewise-linear mapping instead:
-#   WS 0   → SB 0
-#   WS 50  → SB 60   (halfway line)
-#   WS 89  → SB 108  (penalty spot)
-#   WS 100 → SB 120  (goal line)
-SCALE_Y = 0.80  # y: WhoScored 0-100 → StatsBomb 0-80 (linear, no offset)
-
-
-def _ws_to_sb_x(ws_x):
-    """Piecewise-linear WhoScored x → StatsBomb x using calibration points."""
-    # Segments: [0→0, 50→60], [50→60, 89→108], [89→108, 100→120]
-    if ws_x <= 50:
-        return ws_x * (60.0 / 50.0)    # 1.20
-    elif ws_x <= 89:
-        return 60.0 + (ws_x - 50) * (48.0 / 39.0)  # ≈1.231 per unit
-    else:
-        return 108.0 + (ws_x - 89) * (12.0 / 11.0)  # ≈1.091 per unit
+# WhoScored 0-100 → StatsBomb conversion uses the calibrated lookup table in
+# EliteAnalytics/backend/coords.py (halfway line, penalty spot and goal line pinned).
 
 
 # xG colour map: low xG → blue/cool, high xG → red/warm
@@ -61,8 +51,7 @@ XG_CMAP = plt.cm.RdYlGn  # reversed later so low=red, high=green
 # helpers
 # ---------------------------------------------------------------------------
 def load_cache():
-    with open(CACHE_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return read_cache(CACHE_FILE)
 
 
 def _team_id(match_data, team_name):
@@ -113,72 +102,6 @@ def _shot_is_on_target(ev):
     return type_name in ("SavedShot", "Goal")
 
 
-def _estimate_xg(x_sb, y_sb, is_penalty, is_big_chance, body_part):
-    """
-    Very rough geometry-based expected goals, augmented with event qualifiers.
-    Penalties strictly 0.76. Big chances boosted. Headers discounted.
-    """
-    if is_penalty:
-        return 0.76
-
-    goal_x, goal_y = 120.0, 40.0
-    dx = goal_x - x_sb
-    dy = goal_y - y_sb
-    distance = max(np.sqrt(dx**2 + dy**2), 0.5)
-
-    half_goal = 4.0
-    angle = np.arctan2(half_goal, distance)
-
-    xg = (angle / (np.pi / 2)) * (1 / (1 + distance / 30))
-
-    if body_part == "Header":
-        xg *= 0.4
-    
-    if is_big_chance:
-        xg = max(0.35, xg * 3.5)
-        xg = min(0.65, xg)
-        
-    if distance > 18:
-        xg *= (18 / distance)**2
-
-    return round(min(max(xg, 0.01), 0.95), 3)
-
-
-def _extract_qualifiers(ev):
-    """Extract useful qualifier tags from a WhoScored shot event."""
-    quals = {q.get("type", {}).get("displayName", "")
-             for q in ev.get("qualifiers", [])}
-
-    # Body part
-    body = "Right Foot" if "RightFoot" in quals else \
-           "Left Foot"  if "LeftFoot"  in quals else \
-           "Header"     if "Head"      in quals else "Unknown"
-
-    # Situation
-    situation = "Penalty"     if "Penalty"     in quals else \
-                "Free Kick"   if "DirectFreekick" in quals else \
-                "Fast Break"  if "FastBreak"   in quals else \
-                "Set Piece"   if "SetPiece"    in quals else \
-                "Corner"      if "FromCorner"  in quals else \
-                "Open Play"
-
-    # Location zone (from WhoScored qualifiers — more accurate than coords)
-    if any(z in quals for z in ("SmallBoxCentre", "SmallBoxLeft", "SmallBoxRight",
-                                 "DeepBoxCentre", "DeepBoxLeft", "DeepBoxRight")):
-        zone = "6-Yard Box"
-    elif any(z in quals for z in ("BoxCentre", "BoxLeft", "BoxRight")):
-        zone = "Inside Box"
-    elif any(z in quals for z in ("OutOfBoxCentre", "OutOfBoxLeft", "OutOfBoxRight")):
-        zone = "Outside Box"
-    else:
-        zone = "Unknown"
-
-    big_chance = "BigChance" in quals
-    one_on_one = "OneOnOne"  in quals
-
-    return body, situation, zone, big_chance, one_on_one
-
-
 def build_shot_df(match_data, team_name):
     """
     Build a DataFrame of shots for *team_name* with columns:
@@ -188,14 +111,10 @@ def build_shot_df(match_data, team_name):
     tid = _team_id(match_data, team_name)
     rows = []
 
-    for ev in match_data.get("events", []):
-        if ev.get("teamId") != tid:
-            continue
-        if not _is_shot(ev):
-            continue
+    shots = [ev for ev in match_data.get("events", []) if ev.get("teamId") == tid and _is_shot(ev)]
+    xs, ys = events_to_sb(shots)
 
-        x_sb = _ws_to_sb_x(ev.get("x", 0))
-        y_sb = 80 - ev.get("y", 0) * SCALE_Y  # flip Y
+    for ev, x_sb, y_sb in zip(shots, xs.tolist(), ys.tolist()):
         body, situation, zone, big_chance, one_on_one = _extract_qualifiers(ev)
 
         # Override coordinates for penalties → place exactly at penalty spot
@@ -212,7 +131,7 @@ def build_shot_df(match_data, team_name):
             "full_name":    _player_full_name(match_data, ev.get("playerId")),
             "is_goal":      _shot_is_goal(ev),
             "is_on_target": _shot_is_on_target(ev),
-            "xG":           _estimate_xg(x_sb, y_sb, is_penalty, big_chance, body),
+            "xG":           0.0,
             "body_part":    body,
             "situation":    situation,
             "zone":         zone,
@@ -220,7 +139,11 @@ def build_shot_df(match_data, team_name):
             "one_on_one":   one_on_one,
         })
 
-    return pd.DataFrame(rows)
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        # Score every shot of the team in one call (trained model if available)
+        df["xG"] = score_shots(df)
+    return df
 
 
 def rescale_xg_to_total(df, target_total):
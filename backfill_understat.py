@@ -1,8 +1,9 @@
 import os
-import json
 import re
 import time
 from selenium import webdriver
+from EliteAnalytics.backend.cache_io import read_cache
+from EliteAnalytics.backend.understat import UnderstatIndex, load_sidecar, update_sidecar
 
 DATA_DIR = os.path.join('assets', 'data')
 UNDERSTAT_URL = 'https://understat.com/team/Barcelona'
@@ -40,35 +41,42 @@ for container in soup.select('.calendar-date-container'):
     xg_home_el = match_info.select_one('.teams-xG .team-home')
     xg_away_el = match_info.select_one('.teams-xG .team-away')
     
+    # Team names let the index tell apart fixtures on the same date
+    home_el = match_info.select_one('.team-home a')
+    away_el = match_info.select_one('.team-away a')
+    
     if xg_home_el and xg_away_el:
         h_xg = xg_home_el.text.strip()
         a_xg = xg_away_el.text.strip()
         understat_matches.append({
             'datetime': formatted_date,
+            'h': home_el.text.strip() if home_el else None,
+            'a': away_el.text.strip() if away_el else None,
             'xG': {'h': h_xg, 'a': a_xg}
         })
 
 print(f"Extracted {len(understat_matches)} matches from Understat DOM.")
 
-count = 0
+index = UnderstatIndex(understat_matches)
+
+# Links go to a small sidecar next to the caches instead of rewriting every multi-MB cache
+enriched = load_sidecar(DATA_DIR)
+found = {}
 for f in os.listdir(DATA_DIR):
-    if f.endswith('_cache.json'):
-        path = os.path.join(DATA_DIR, f)
-        with open(path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            
-        if 'understat' in data: continue
-        
-        ws_date_str = data.get('startTime')
-        if not ws_date_str: continue
-        ws_date = ws_date_str.split('T')[0]
-        
-        for um in understat_matches:
-            if um.get('datetime', '').startswith(ws_date):
-                data['understat'] = um
-                with open(path, 'w', encoding='utf-8') as out:
-                    json.dump(data, out, indent=4)
-                count += 1
-                print(f'Backfilled Understat for {f}')
-                break
-print(f'Backfilled {count} matches')
+    m = re.match(r'match_(\d+)_cache\.json$', f)
+    if not m or m.group(1) in enriched: continue
+    data = read_cache(os.path.join(DATA_DIR, f))
+    if 'understat' in data: continue
+    
+    um = index.lookup_match(data)
+    if um:
+        found[m.group(1)] = um
+        print(f'Backfilled Understat for {f}')
+update_sidecar(DATA_DIR, found)
+print(f'Backfilled {len(found)} matches')
+
+# Already rendered shot maps were drawn without the Understat xG
+if found:
+    import generate_all_assets
+    from EliteAnalytics.backend import pipeline
+    pipeline.render(list(found), kinds=generate_all_assets.UNDERSTAT_KINDS)
@@ -1,20 +1,12 @@
-import urllib.request
 import json
-import re
+from EliteAnalytics.backend.http_client import get_client
 
 url = "https://www.fotmob.com/api/matchDetails?matchId=5173360"
 
-req = urllib.request.Request(
-    url, 
-    headers={
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "application/json"
-    }
-)
-
 try:
-    response = urllib.request.urlopen(req).read()
-    data = json.loads(response.decode('utf-8'))
+    response = get_client().get(url, headers={"Accept": "application/json"})
+    response.raise_for_status()
+    data = response.json()
     
     print("Match Name:", data.get("general", {}).get("matchName"))
     print("League:", data.get("general", {}).get("leagueName"))
@@ -1,6 +1,6 @@
 import cloudscraper
-import re
-import json
+from EliteAnalytics.backend.whoscored import extract_match_centre
+from EliteAnalytics.backend.cache_io import write_cache
 
 scraper = cloudscraper.create_scraper()
 url = "https://www.whoscored.com/Matches/1968936/Live/Spain-Copa-del-Rey-2025-2026-Atletico-Madrid-Barcelona"
@@ -8,21 +8,11 @@ url = "https://www.whoscored.com/Matches/1968936/Live/Spain-Copa-del-Rey-2025-20
 try:
     print(f"Fetching {url}...")
     html = scraper.get(url).text
-    found = False
-    for line in html.split("\n"):
-        if "matchCentreData:" in line:
-            found = True
-            start_str = "matchCentreData:"
-            start_idx = line.find(start_str) + len(start_str)
-            content = line[start_idx:].strip()
-            if "matchCentreEventTypeJson" in content:
-                content = content.split("matchCentreEventTypeJson")[0].strip()
-                if content.endswith(","): content = content[:-1]
-            data = json.loads(content)
-            with open("assets/data/match_1968936_cache.json", "w") as f:
-                json.dump(data, f)
-            print("Successfully extracted match data!", len(data["events"]), "events")
-            break
+    data = extract_match_centre(html)
+    found = data is not None
+    if found:
+        write_cache("assets/data/match_1968936_cache.json", data)
+        print("Successfully extracted match data!", len(data["events"]), "events")
             
     if not found:
         print("Data script not found. Cloudflare might be blocking us.")
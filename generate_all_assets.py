@@ -2,6 +2,9 @@ import os
 import glob
 import pandas as pd
 import numpy as np
+import matplotlib
+# Headless: also imported by the API process and by render workers, which have no display
+matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 from mplsoccer import Pitch, VerticalPitch
 import plotly.graph_objects as go
@@ -9,38 +12,76 @@ import plotly.offline as pyo
 import json
 import logging
 import math
-from concurrent.futures import ProcessPoolExecutor
+import time
+import argparse
+import traceback
+import datetime
+import io
+import re
+from functools import lru_cache
+from PIL import Image, features
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from EliteAnalytics.backend.coords import ws_to_sb, events_to_sb
+from EliteAnalytics.backend.passes import classify_passes
+from EliteAnalytics.backend.cache_io import read_cache
+from EliteAnalytics.backend.understat import attach as attach_understat, sidecar_path
+from EliteAnalytics.backend.pipeline import cache_path
 
 _PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 ASSETS_DIR = os.path.join(_PROJECT_ROOT, "assets")
 PNG_DIR = os.path.join(ASSETS_DIR, "png")
 HTML_DIR = os.path.join(ASSETS_DIR, "html")
+JSON_DIR = os.path.join(ASSETS_DIR, "json")
 DATA_DIR = os.path.join(ASSETS_DIR, "data")
+RUN_REPORT = os.path.join(ASSETS_DIR, "run_report.json")
 
 os.makedirs(PNG_DIR, exist_ok=True)
 os.makedirs(HTML_DIR, exist_ok=True)
+os.makedirs(JSON_DIR, exist_ok=True)
+
+# Raster output. The 1x PNG is always written (dashboard fallback and lazy-render target);
+# extra formats/scales are written alongside as <name>.webp, <name>@2x.webp etc.
+BASE_DPI = 100
+IMAGE_FORMATS = ("png", "webp", "avif")
+OUTPUT_FORMATS = tuple(os.environ.get("ASSET_FORMATS", "png").split(","))
+OUTPUT_SCALES = tuple(int(s) for s in os.environ.get("ASSET_SCALES", "1").split(","))
+ENCODER_OPTIONS = {
+    "webp": {"quality": 82, "method": 6},
+    "avif": {"quality": 60, "speed": 6},
+}
+
+def save_figure(fig, out_name):
+    """Write fig to PNG_DIR in every configured format and scale, then close it."""
+    stem, _ = os.path.splitext(out_name)
+    for scale in sorted(set(OUTPUT_SCALES) | {1}):
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=BASE_DPI * scale, facecolor=fig.get_facecolor(), edgecolor='none')
+        suffix = "" if scale == 1 else f"@{scale}x"
+        formats = (set(OUTPUT_FORMATS) | {"png"}) if scale == 1 else set(OUTPUT_FORMATS)
+        if "png" in formats:
+            with open(os.path.join(PNG_DIR, f"{stem}{suffix}.png"), "wb") as f:
+                f.write(buf.getvalue())
+        extra = formats - {"png"}
+        if extra:
+            img = Image.open(buf)
+            img.load()
+            for fmt in extra:
+                img.save(os.path.join(PNG_DIR, f"{stem}{suffix}.{fmt}"), format=fmt.upper(), **ENCODER_OPTIONS[fmt])
+    plt.close(fig)
 
-SCALE_X = 1.2
-SCALE_Y = 0.80
-
-def _ws_to_sb_x(ws_x):
-    if ws_x <= 50: return ws_x * (60.0 / 50.0)
-    elif ws_x <= 89: return 60.0 + (ws_x - 50) * (48.0 / 39.0)
-    else: return 108.0 + (ws_x - 89) * (12.0 / 11.0)
-
-def _estimate_xg(x_sb, y_sb, is_penalty, is_big_chance, body_part):
-    if is_penalty: return 0.76
-    dx = 120.0 - x_sb
-    dy = 40.0 - y_sb
-    distance = max(np.sqrt(dx**2 + dy**2), 0.5)
-    angle = np.arctan2(4.0, distance)
-    xg = (angle / (np.pi / 2)) * (1 / (1 + distance / 30))
-    if body_part == "Header": xg *= 0.4
-    if is_big_chance:
-        xg = max(0.35, xg * 3.5)
-        xg = min(0.65, xg)
-    if distance > 18: xg *= (18 / distance)**2
-    return round(min(max(xg, 0.01), 0.95), 3)
+def configure_output(formats, scales):
+    """Set output formats/scales for this process and for render workers (via the environment)."""
+    global OUTPUT_FORMATS, OUTPUT_SCALES
+    unknown = [f for f in formats if f not in IMAGE_FORMATS]
+    if unknown:
+        raise ValueError(f"Unsupported image format(s): {', '.join(unknown)}")
+    if "avif" in formats and not features.check("avif"):
+        raise ValueError("AVIF output needs Pillow built with libavif (Pillow >= 11.3)")
+    OUTPUT_FORMATS = tuple(formats)
+    OUTPUT_SCALES = tuple(scales)
+    os.environ["ASSET_FORMATS"] = ",".join(OUTPUT_FORMATS)
+    os.environ["ASSET_SCALES"] = ",".join(str(s) for s in OUTPUT_SCALES)
 
 def _player_name(match_data, player_id):
     for side in ("home", "away"):
@@ -52,9 +93,18 @@ def _player_name(match_data, player_id):
                 return name
     return str(player_id)
 
-def generate_passmaps(match_id, match_data, team_side, team_name, color_val):
+PASS_STYLES = {
+    "Complete": {"color": "#2ca02c", "alpha": 0.6, "lw": 2.5},
+    "Incomplete": {"color": "#d62728", "alpha": 0.5, "lw": 2.5},
+}
+
+def _write_json(out_name, payload):
+    with open(os.path.join(JSON_DIR, out_name), "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+
+def _passmap_df(match_data, team_side):
     tid = match_data.get(team_side, {}).get("teamId")
-    if not tid: return
+    if not tid: return pd.DataFrame()
     
     rows = []
     for ev in match_data.get("events", []):
@@ -64,27 +114,24 @@ def generate_passmaps(match_id, match_data, team_side, team_name, color_val):
         end_x_raw, end_y_raw = ev.get("endX"), ev.get("endY")
         if end_x_raw is None or end_y_raw is None: continue
 
-        is_prog, is_final_third = False, False
-        x = ev.get("x", 0) * SCALE_X
-        y = 80 - ev.get("y", 0) * SCALE_Y
-        end_x = float(end_x_raw) * SCALE_X
-        end_y = 80 - float(end_y_raw) * SCALE_Y
-        
-        if x >= 48:
-            if x < 60 and (end_x - x) >= 30: is_prog = True
-            elif 60 <= x <= 90 and (end_x - x) >= 15: is_prog = True
-            elif x > 90 and (end_x - x) >= 10: is_prog = True
-            
-        if x < 80 and end_x >= 80: is_final_third = True
-
         rows.append({
-            "x": x, "y": y,
-            "end_x": end_x, "end_y": end_y,
+            "x": ev.get("x", 0), "y": ev.get("y", 0),
+            "end_x": float(end_x_raw), "end_y": float(end_y_raw),
             "pass_outcome": "Complete" if outcome == "Successful" else "Incomplete",
-            "is_progressive": is_prog, "is_final_third": is_final_third
         })
         
     df = pd.DataFrame(rows)
+    if df.empty: return df
+    df["x"], df["y"] = ws_to_sb(df["x"], df["y"])
+    df["end_x"], df["end_y"] = ws_to_sb(df["end_x"], df["end_y"])
+
+    flags = classify_passes(df["x"], df["y"], df["end_x"], df["end_y"])
+    df["is_progressive"] = flags["progressive"]
+    df["is_final_third"] = flags["final_third"]
+    return df
+
+def generate_passmaps(match_id, match_data, team_side, team_name, color_val):
+    df = _passmap_df(match_data, team_side)
     if df.empty: return
     
     def draw_map(sub_df, title_prefix, out_name):
@@ -95,18 +142,17 @@ def generate_passmaps(match_id, match_data, team_side, team_name, color_val):
         
         if not fail.empty:
             pitch.lines(fail["x"], fail["y"], fail["end_x"], fail["end_y"], 
-                        lw=2.5, transparent=True, comet=True, ax=ax, color="#d62728", alpha=0.5)
+                        transparent=True, comet=True, ax=ax, **PASS_STYLES["Incomplete"])
         if not succ.empty:
             pitch.lines(succ["x"], succ["y"], succ["end_x"], succ["end_y"], 
-                        lw=2.5, transparent=True, comet=True, ax=ax, color="#2ca02c", alpha=0.6)
+                        transparent=True, comet=True, ax=ax, **PASS_STYLES["Complete"])
                         
         n_succ = len(succ)
         n_tot = len(sub_df)
         ax.set_title(f"{team_name} - {title_prefix} ({n_succ}/{n_tot} Successful)", fontsize=14, fontweight="bold", color="white", pad=10)
         fig.patch.set_facecolor('#0d0d1a')
         plt.tight_layout()
-        plt.savefig(os.path.join(PNG_DIR, out_name), dpi=100, facecolor=fig.get_facecolor(), edgecolor='none')
-        plt.close(fig)
+        save_figure(fig, out_name)
 
     draw_map(df, "Total Passes", f"{match_id}_{team_side}_total_passes.png")
     
@@ -116,9 +162,17 @@ def generate_passmaps(match_id, match_data, team_side, team_name, color_val):
     ft_df = df[df["is_final_third"] == True]
     draw_map(ft_df, "Final Third Entries", f"{match_id}_{team_side}_final_third.png")
 
-def generate_passnetwork(match_id, match_data, team_side, team_name, color_val):
+PASSNETWORK_MIN_PASSES = 3
+MIN_LW = 1.5
+MAX_LW = 8.0
+
+def _passnetwork_data(match_data, team_side):
+    """
+    Pre-substitution passing network for one team.
+    Returns (average_locs_and_count, passes_between, labels) or None if there is nothing to draw.
+    """
     tid = match_data.get(team_side, {}).get("teamId")
-    if not tid: return
+    if not tid: return None
     
     team_block = match_data.get(team_side, {})
     jersey_map = {}
@@ -141,14 +195,15 @@ def generate_passnetwork(match_id, match_data, team_side, team_name, color_val):
             "team_id": ev.get("teamId"),
             "type": ev.get("type", {}).get("displayName", ""),
             "player_id": pid,
-            "x": ev.get("x", 0) * SCALE_X,
-            "y": 80 - ev.get("y", 0) * SCALE_Y,
+            "x": ev.get("x", 0),
+            "y": ev.get("y", 0),
             "minute": ev.get("minute", 0),
             "second": ev.get("second", 0),
             "outcome": ev.get("outcomeType", {}).get("displayName", ""),
         })
     df = pd.DataFrame(rows)
-    if df.empty: return
+    if df.empty: return None
+    df["x"], df["y"] = ws_to_sb(df["x"], df["y"])
 
     df["newsecond"] = 60 * df["minute"] + df["second"]
     df = df.sort_values(by=["newsecond", "event_id"]).reset_index(drop=True)
@@ -178,7 +233,7 @@ def generate_passnetwork(match_id, match_data, team_side, team_name, color_val):
         
     df_pre_sub["recipient"] = recipients
     completions = df_pre_sub.loc[(df_pre_sub["team_id"] == tid) & (df_pre_sub["type"] == "Pass") & (df_pre_sub["outcome"] == "Successful")].dropna(subset=["recipient"]).copy()
-    if completions.empty: return
+    if completions.empty: return None
     
     # Node Positions: Average of ALL successful actions by the player (Passes made AND received etc)
     successful_actions = df_pre_sub.loc[(df_pre_sub["team_id"] == tid) & (df_pre_sub["outcome"] == "Successful")].copy()
@@ -193,19 +248,43 @@ def generate_passnetwork(match_id, match_data, team_side, team_name, color_val):
     passes_between = passes_between.merge(average_locs_and_count, left_on="passer", right_index=True)
     passes_between = passes_between.merge(average_locs_and_count, left_on="recipient", right_index=True, suffixes=["", "_end"])
     
-    threshold = 3
-    passes_between = passes_between.loc[passes_between["pass_count"] >= threshold]
+    passes_between = passes_between.loc[passes_between["pass_count"] >= PASSNETWORK_MIN_PASSES]
 
-    pitch = VerticalPitch(pitch_type="statsbomb", pitch_color="#ffffff", line_color="#c7c7c7")
-    fig, ax = pitch.draw(figsize=(10, 10))
-    fig.patch.set_facecolor('#ffffff')
-    
+    labels = {}
+    for player_id in average_locs_and_count.index:
+        try:
+            jn = jersey_map.get(int(player_id), "")
+        except:
+            jn = ""
+        if not jn:
+            pname = _player_name(match_data, player_id)
+            jn = "".join([n[0] for n in pname.split()[:2]]).upper()
+        labels[player_id] = str(jn)
+
+    return average_locs_and_count, passes_between, labels
+
+def _edge_styles(passes_between):
+    """Line width and alpha per edge, scaled between the weakest and strongest link."""
     min_passes = passes_between["pass_count"].min() if not passes_between.empty else 1
     max_passes = passes_between["pass_count"].max() if not passes_between.empty else 1
     rng = max_passes - min_passes if max_passes != min_passes else 1
     
-    MIN_LW = 1.5
-    MAX_LW = 8.0
+    styles = []
+    for count in passes_between["pass_count"]:
+        lw = MIN_LW + (count - min_passes) / rng * (MAX_LW - MIN_LW) if rng > 0 else 2.5
+        alpha_val = 0.4 + (count - min_passes) / rng * 0.6 if rng > 0 else 0.7
+        styles.append((lw, alpha_val))
+    return styles
+
+def generate_passnetwork(match_id, match_data, team_side, team_name, color_val):
+    network = _passnetwork_data(match_data, team_side)
+    if network is None: return
+    average_locs_and_count, passes_between, labels = network
+    threshold = PASSNETWORK_MIN_PASSES
+
+    pitch = VerticalPitch(pitch_type="statsbomb", pitch_color="#ffffff", line_color="#c7c7c7")
+    fig, ax = pitch.draw(figsize=(10, 10))
+    fig.patch.set_facecolor('#ffffff')
     
     def pass_line_template(ax, x, y, end_x, end_y, line_color, lw=4, alpha=0.85):
         ax.annotate(
@@ -225,9 +304,7 @@ def generate_passnetwork(match_id, match_data, team_side, team_name, color_val):
         upd_y = y + (dist - dist_delta) * math.sin(angle)
         pass_line_template(ax, x, y, upd_x, upd_y, line_color=line_color, lw=lw, alpha=alpha)
 
-    for _, row in passes_between.iterrows():
-        lw = MIN_LW + (row["pass_count"] - min_passes) / rng * (MAX_LW - MIN_LW) if rng > 0 else 2.5
-        alpha_val = 0.4 + (row["pass_count"] - min_passes) / rng * 0.6 if rng > 0 else 0.7
+    for (_, row), (lw, alpha_val) in zip(passes_between.iterrows(), _edge_styles(passes_between)):
         pass_line_template_shrink(
             ax, row["x"], row["y"], row["x_end"], row["y_end"],
             color_val, dist_delta=4.0, lw=lw, alpha=alpha_val
@@ -237,62 +314,115 @@ def generate_passnetwork(match_id, match_data, team_side, team_name, color_val):
     pitch.scatter(average_locs_and_count.x, average_locs_and_count.y, s=node_sizes, color="white", edgecolors=color_val, linewidth=2.5, alpha=1, ax=ax, zorder=2)
     
     for player_id, row in average_locs_and_count.iterrows():
-        try:
-            jn = jersey_map.get(int(player_id), "")
-        except:
-            jn = ""
-        if not jn:
-            pname = _player_name(match_data, player_id)
-            jn = "".join([n[0] for n in pname.split()[:2]]).upper()
-        pitch.annotate(str(jn), xy=(row['x'], row['y']), c=color_val, va='center', ha='center', size=11, weight='bold', ax=ax, zorder=3)
+        pitch.annotate(labels[player_id], xy=(row['x'], row['y']), c=color_val, va='center', ha='center', size=11, weight='bold', ax=ax, zorder=3)
         
     ax.set_title(f"{team_name} - Passing Network (11 Starters, Min Pass: {threshold})", fontsize=18, fontweight="bold", color="#333333", pad=15)
     plt.tight_layout()
-    plt.savefig(os.path.join(PNG_DIR, f"{match_id}_{team_side}_passnetwork.png"), dpi=100, facecolor=fig.get_facecolor(), edgecolor='none')
-    plt.close(fig)
+    save_figure(fig, f"{match_id}_{team_side}_passnetwork.png")
+
+# ---------------------------------------------------------------------------
+# Vector geometry export: the plotted layers as compact JSON, drawn client-side
+# ---------------------------------------------------------------------------
+def _match_meta(match_data, team_side):
+    other = "away" if team_side == "home" else "home"
+    return {
+        "date": match_data.get("startTime"),
+        "opponent": match_data.get(other, {}).get("name"),
+    }
+
+def export_passmap_geometry(match_id, match_data, team_side, team_name, color_val):
+    """
+    Writes every pass as [x, y, end_x, end_y, complete, progressive, final_third] in StatsBomb
+    120x80 coordinates, so the dashboard can draw and filter the map without a re-render.
+    """
+    df = _passmap_df(match_data, team_side)
+    if df.empty: return
+    
+    coords = df[["x", "y", "end_x", "end_y"]].round(1).values.tolist()
+    flags = zip(
+        (df["pass_outcome"] == "Complete").astype(int),
+        df["is_progressive"].astype(int),
+        df["is_final_third"].astype(int),
+    )
+    _write_json(f"{match_id}_{team_side}_passes.json", {
+        "match_id": match_id,
+        "team": team_name,
+        "side": team_side,
+        **_match_meta(match_data, team_side),
+        "pitch": "statsbomb",
+        "columns": ["x", "y", "end_x", "end_y", "complete", "progressive", "final_third"],
+        "styles": {"complete": PASS_STYLES["Complete"], "incomplete": PASS_STYLES["Incomplete"]},
+        "passes": [c + list(map(int, f)) for c, f in zip(coords, flags)],
+    })
+
+def export_passnetwork_geometry(match_id, match_data, team_side, team_name, color_val):
+    """Writes pass network nodes (average positions) and weighted edges in StatsBomb coordinates."""
+    network = _passnetwork_data(match_data, team_side)
+    if network is None: return
+    average_locs_and_count, passes_between, labels = network
+    
+    nodes = [
+        {"id": int(pid), "label": labels[pid], "x": round(row["x"], 1), "y": round(row["y"], 1),
+         "count": int(row["count"]), "size": 200 + int(row["count"]) * 25}
+        for pid, row in average_locs_and_count.iterrows()
+    ]
+    edges = [
+        {"source": int(row["passer"]), "target": int(row["recipient"]), "count": int(row["pass_count"]),
+         "lw": round(lw, 2), "alpha": round(alpha_val, 2)}
+        for (_, row), (lw, alpha_val) in zip(passes_between.iterrows(), _edge_styles(passes_between))
+    ]
+    _write_json(f"{match_id}_{team_side}_passnetwork.json", {
+        "match_id": match_id,
+        "team": team_name,
+        "side": team_side,
+        **_match_meta(match_data, team_side),
+        "pitch": "statsbomb",
+        "color": color_val,
+        "min_passes": PASSNETWORK_MIN_PASSES,
+        "nodes": nodes,
+        "edges": edges,
+    })
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from Projects.shotmap_whoscored import build_shot_df, draw_combined_shotmap
 
 def generate_shotmap(match_id, match_data, home_name, away_name):
-    try:
-        df_home = build_shot_df(match_data, home_name)
-        df_away = build_shot_df(match_data, away_name)
-        out_html = os.path.join(HTML_DIR, f"{match_id}_shotmap_ws.html")
-        lbl = f"{home_name} vs {away_name} (Match ID: {match_id})"
+    df_home = build_shot_df(match_data, home_name)
+    df_away = build_shot_df(match_data, away_name)
+    out_html = os.path.join(HTML_DIR, f"{match_id}_shotmap_ws.html")
+    lbl = f"{home_name} vs {away_name} (Match ID: {match_id})"
+    
+    us_xg_home, us_xg_away = None, None
+    if "understat" in match_data and match_data["understat"].get("xG"):
+        us_xg_home = float(match_data["understat"]["xG"].get("h", 0))
+        us_xg_away = float(match_data["understat"]["xG"].get("a", 0))
+        lbl += " | Powered by Understat xG"
         
-        us_xg_home, us_xg_away = None, None
-        if "understat" in match_data and match_data["understat"].get("xG"):
-            us_xg_home = float(match_data["understat"]["xG"].get("h", 0))
-            us_xg_away = float(match_data["understat"]["xG"].get("a", 0))
-            lbl += " | Powered by Understat xG"
-            
-        draw_combined_shotmap(df_home, home_name, df_away, away_name, out_html, match_label=lbl,
-                             xg_override_home=us_xg_home, xg_override_away=us_xg_away)
-    except Exception as e:
-        print(f"Error drawing shotmap for {match_id}: {e}")
+    draw_combined_shotmap(df_home, home_name, df_away, away_name, out_html, match_label=lbl,
+                         xg_override_home=us_xg_home, xg_override_away=us_xg_away)
 
-def generate_dribblemap(match_id, match_data, team_side, team_name):
+def _dribble_df(match_data, team_side):
     tid = match_data.get(team_side, {}).get("teamId")
-    if not tid: return
+    if not tid: return pd.DataFrame()
+    
+    takeons = [ev for ev in match_data.get("events", [])
+               if ev.get("type", {}).get("displayName") == "TakeOn" and ev.get("teamId") == tid]
+    xs, ys = events_to_sb(takeons)
     
     rows = []
-    for ev in match_data.get("events", []):
-        if ev.get("type", {}).get("displayName") != "TakeOn": continue
-        if ev.get("teamId") != tid: continue
-        
+    for ev, x, y in zip(takeons, xs.tolist(), ys.tolist()):
         outcome = ev.get("outcomeType", {}).get("displayName", "")
-        x = ev.get("x", 0) * SCALE_X
-        y = 80 - ev.get("y", 0) * SCALE_Y
         
         rows.append({
             "x": x, "y": y,
             "outcome": "Successful" if outcome == "Successful" else "Unsuccessful",
             "player": _player_name(match_data, ev.get("playerId"))
         })
-        
-    df = pd.DataFrame(rows)
+    return pd.DataFrame(rows)
+
+def generate_dribblemap(match_id, match_data, team_side, team_name):
+    df = _dribble_df(match_data, team_side)
     if df.empty: return
     
     pitch = Pitch(pitch_type="statsbomb", pitch_color="#2d572c", line_color="white")
@@ -311,39 +441,261 @@ def generate_dribblemap(match_id, match_data, team_side, team_name):
     fig.patch.set_facecolor('#0d0d1a')
     
     plt.tight_layout()
-    plt.savefig(os.path.join(PNG_DIR, f"{match_id}_{team_side}_dribbles.png"), dpi=100, facecolor=fig.get_facecolor(), edgecolor='none')
-    plt.close(fig)
+    save_figure(fig, f"{match_id}_{team_side}_dribbles.png")
 
-def process_match(filepath):
+def export_shot_geometry(match_id, match_data, team_side, team_name, color_val):
+    """Writes shots as [x, y, xG, goal, big_chance] in StatsBomb coordinates."""
+    df = build_shot_df(match_data, team_name)
+    if df.empty: return
+    
+    _write_json(f"{match_id}_{team_side}_shots.json", {
+        "match_id": match_id,
+        "team": team_name,
+        "side": team_side,
+        **_match_meta(match_data, team_side),
+        "pitch": "statsbomb",
+        "columns": ["x", "y", "xg", "goal", "big_chance"],
+        "shots": [
+            [round(r.x, 1), round(r.y, 1), float(r.xG), int(r.is_goal), int(r.big_chance)]
+            for r in df.itertuples()
+        ],
+    })
+
+def export_dribble_geometry(match_id, match_data, team_side, team_name, color_val):
+    """Writes take-ons as [x, y, successful] in StatsBomb coordinates."""
+    df = _dribble_df(match_data, team_side)
+    if df.empty: return
+    
+    _write_json(f"{match_id}_{team_side}_dribbles.json", {
+        "match_id": match_id,
+        "team": team_name,
+        "side": team_side,
+        **_match_meta(match_data, team_side),
+        "pitch": "statsbomb",
+        "columns": ["x", "y", "successful"],
+        "dribbles": [
+            [round(r.x, 1), round(r.y, 1), int(r.outcome == "Successful")]
+            for r in df.itertuples()
+        ],
+    })
+
+TEAM_COLORS = {"home": "#a50044", "away": "#004d98"}
+
+# Independent render units. Per-side kinds run once per team, shotmap once per match.
+SIDE_KINDS = ("passmaps", "passnetwork", "dribbles",
+              "passmap_geometry", "passnetwork_geometry", "shot_geometry", "dribble_geometry")
+MATCH_KINDS = ("shotmap",)
+# Kinds that show the Understat xG, re-rendered when a match is newly linked
+UNDERSTAT_KINDS = ("shotmap",)
+
+# Rough resident size of one render worker (interpreter + pandas + matplotlib + a cached match)
+WORKER_MEMORY_MB = 400
+
+# Output files produced by each task kind, keyed by the file name suffix after "{match_id}_"
+SIDE_OUTPUTS = {
+    "total_passes.png": "passmaps",
+    "progressive_passes.png": "passmaps",
+    "final_third.png": "passmaps",
+    "passnetwork.png": "passnetwork",
+    "dribbles.png": "dribbles",
+    "passes.json": "passmap_geometry",
+    "passnetwork.json": "passnetwork_geometry",
+    "shots.json": "shot_geometry",
+    "dribbles.json": "dribble_geometry",
+}
+MATCH_OUTPUTS = {
+    "shotmap_ws.html": "shotmap",
+}
+
+def match_cache_path(match_id):
+    """The match's cache in assets/data or data/ (see pipeline.CACHE_DIRS), else where the parser would put it."""
+    return cache_path(match_id) or os.path.join(DATA_DIR, f"match_{match_id}_cache.json")
+
+# <stem>[@<scale>x].<format> of a raster output, e.g. 1913888_home_dribbles@2x.webp
+_RASTER_VARIANT = re.compile(r"^(?P<stem>.+?)(?:@(?P<scale>\d+)x)?\.(?P<fmt>png|webp|avif)$")
+
+def raster_variant(filename):
+    """(1x PNG name, format, scale) of a raster output name, or None for other files."""
+    m = _RASTER_VARIANT.match(filename)
+    if not m:
+        return None
+    return f"{m.group('stem')}.png", m.group("fmt"), int(m.group("scale") or 1)
+
+def asset_task(filename):
+    """Map an asset file name (any format / scale variant) back to the (filepath, kind, side) task that renders it, or None."""
+    variant = raster_variant(filename)
+    if variant is not None:
+        filename = variant[0]
+    match_id, _, rest = filename.partition("_")
+    if not match_id.isdigit():
+        return None
+    if rest in MATCH_OUTPUTS:
+        return (match_cache_path(match_id), MATCH_OUTPUTS[rest], None)
+    side, _, suffix = rest.partition("_")
+    if side in ("home", "away") and suffix in SIDE_OUTPUTS:
+        return (match_cache_path(match_id), SIDE_OUTPUTS[suffix], side)
+    return None
+
+def _match_id_from_path(filepath):
+    filename = os.path.basename(filepath)
+    return int(filename.split("_")[1]) if "_" in filename else None
+
+def _load_match(filepath):
+    """The cached match with its Understat link, re-read once the cache or the sidecar is rewritten."""
+    sidecar = sidecar_path(os.path.dirname(os.path.abspath(filepath)))
+    stamps = tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in (filepath, sidecar))
+    return _read_match(filepath, stamps)
+
+@lru_cache(maxsize=4)
+def _read_match(filepath, stamps):
+    return attach_understat(read_cache(filepath), filepath)
+
+def _available_memory_mb():
     try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            match_data = json.load(f)
-        
-        filename = os.path.basename(filepath)
-        match_id = int(filename.split("_")[1]) if "_" in filename else match_data.get("matchId")
-        
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def default_workers():
+    """Size the pool from usable cores, capped so every worker fits in free memory."""
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    workers = max(1, cores - 1)
+    mem_mb = _available_memory_mb()
+    if mem_mb is not None:
+        workers = min(workers, max(1, int(mem_mb // WORKER_MEMORY_MB)))
+    return workers
+
+def build_tasks(files, kinds=None):
+    """Expand match cache files into (filepath, kind, side) render tasks, optionally limited to kinds."""
+    tasks = []
+    for filepath in files:
+        for kind in SIDE_KINDS:
+            if kinds and kind not in kinds: continue
+            for side in ("home", "away"):
+                tasks.append((filepath, kind, side))
+        for kind in MATCH_KINDS:
+            if kinds and kind not in kinds: continue
+            tasks.append((filepath, kind, None))
+    return tasks
+
+def render_task(task):
+    """Render one asset kind for one side of a match. Returns a report entry, never raises."""
+    filepath, kind, side = task
+    entry = {
+        "match_id": _match_id_from_path(filepath),
+        "kind": kind,
+        "side": side,
+        "status": "ok",
+        "seconds": 0.0,
+        "error": None,
+    }
+    started = time.perf_counter()
+    try:
+        match_data = _load_match(filepath)
+        match_id = entry["match_id"] or match_data.get("matchId")
+        entry["match_id"] = match_id
         home_name = match_data.get("home", {}).get("name", "Home")
         away_name = match_data.get("away", {}).get("name", "Away")
-        
-        generate_passmaps(match_id, match_data, "home", home_name, "#a50044")
-        generate_passmaps(match_id, match_data, "away", away_name, "#004d98")
-        
-        generate_passnetwork(match_id, match_data, "home", home_name, "#a50044")
-        generate_passnetwork(match_id, match_data, "away", away_name, "#004d98")
-        
-        generate_shotmap(match_id, match_data, home_name, away_name)
-        
-        generate_dribblemap(match_id, match_data, "home", home_name)
-        generate_dribblemap(match_id, match_data, "away", away_name)
-        
-        return True
+        team_name = home_name if side == "home" else away_name
+
+        if kind == "passmaps":
+            generate_passmaps(match_id, match_data, side, team_name, TEAM_COLORS[side])
+        elif kind == "passnetwork":
+            generate_passnetwork(match_id, match_data, side, team_name, TEAM_COLORS[side])
+        elif kind == "dribbles":
+            generate_dribblemap(match_id, match_data, side, team_name)
+        elif kind == "passmap_geometry":
+            export_passmap_geometry(match_id, match_data, side, team_name, TEAM_COLORS[side])
+        elif kind == "passnetwork_geometry":
+            export_passnetwork_geometry(match_id, match_data, side, team_name, TEAM_COLORS[side])
+        elif kind == "shot_geometry":
+            export_shot_geometry(match_id, match_data, side, team_name, TEAM_COLORS[side])
+        elif kind == "dribble_geometry":
+            export_dribble_geometry(match_id, match_data, side, team_name, TEAM_COLORS[side])
+        elif kind == "shotmap":
+            generate_shotmap(match_id, match_data, home_name, away_name)
+        else:
+            raise ValueError(f"Unknown asset kind: {kind}")
     except Exception as e:
-        print(f"Error on {os.path.basename(filepath)}: {e}")
-        return False
+        plt.close("all")
+        entry["status"] = "failed"
+        entry["error"] = f"{type(e).__name__}: {e}"
+        entry["traceback"] = traceback.format_exc()
+    entry["seconds"] = round(time.perf_counter() - started, 3)
+    return entry
+
+def process_match(filepath):
+    """Render every asset for a single match in-process."""
+    entries = [render_task(task) for task in build_tasks([filepath])]
+    for e in entries:
+        if e["status"] == "failed":
+            print(f"Error on {os.path.basename(filepath)} [{e['kind']}/{e['side']}]: {e['error']}")
+    return all(e["status"] == "ok" for e in entries)
+
+def run_tasks(tasks, workers):
+    """Schedule render tasks on a process pool, yielding report entries as they finish."""
+    if workers <= 1:
+        for task in tasks:
+            yield render_task(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(render_task, task) for task in tasks]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+def write_run_report(entries, workers, started_at, elapsed, path=RUN_REPORT):
+    failed = [e for e in entries if e["status"] == "failed"]
+    by_kind = {}
+    for e in entries:
+        k = by_kind.setdefault(e["kind"], {"tasks": 0, "failed": 0, "seconds": 0.0})
+        k["tasks"] += 1
+        k["failed"] += e["status"] == "failed"
+        k["seconds"] = round(k["seconds"] + e["seconds"], 3)
+    report = {
+        "started_at": started_at,
+        "elapsed_seconds": round(elapsed, 3),
+        "workers": workers,
+        "matches": len({e["match_id"] for e in entries}),
+        "tasks": len(entries),
+        "failed": len(failed),
+        "by_kind": by_kind,
+        "entries": sorted(entries, key=lambda e: (str(e["match_id"]), e["kind"], e["side"] or "")),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render dashboard assets for every cached match.")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Render processes (default: sized from available cores and memory)")
+    parser.add_argument("--report", default=RUN_REPORT, help="Where to write the JSON run report")
+    parser.add_argument("--kinds", default=None,
+                        help=f"Comma-separated task kinds to run (default: all of {', '.join(SIDE_KINDS + MATCH_KINDS)})")
+    parser.add_argument("--formats", default=",".join(OUTPUT_FORMATS),
+                        help="Comma-separated image formats: png, webp, avif (1x PNG is always written)")
+    parser.add_argument("--scales", default=",".join(str(s) for s in OUTPUT_SCALES),
+                        help="Comma-separated pixel densities, e.g. 1,2")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    files = glob.glob(os.path.join(DATA_DIR, "match_*_cache.json"))
-    print(f"Generating assets for {len(files)} matches...")
-    with ProcessPoolExecutor(max_workers=4) as executor:
-        results = list(executor.map(process_match, files))
-    print(f"Generation complete! Success: {sum(results)} / {len(results)}")
+    args = parse_args()
+    configure_output(args.formats.split(","), [int(x) for x in args.scales.split(",")])
+    workers = args.workers if args.workers else default_workers()
+    files = sorted(glob.glob(os.path.join(DATA_DIR, "match_*_cache.json")))
+    tasks = build_tasks(files, args.kinds.split(",") if args.kinds else None)
+    print(f"Generating assets for {len(files)} matches ({len(tasks)} tasks, {workers} workers)...")
+
+    started_at = datetime.datetime.now().isoformat(timespec="seconds")
+    t0 = time.perf_counter()
+    entries = []
+    for entry in run_tasks(tasks, workers):
+        entries.append(entry)
+        if entry["status"] == "failed":
+            print(f"Failed {entry['match_id']} [{entry['kind']}/{entry['side']}]: {entry['error']}")
+    report = write_run_report(entries, workers, started_at, time.perf_counter() - t0, args.report)
+    print(f"Generation complete! Success: {report['tasks'] - report['failed']} / {report['tasks']} tasks "
+          f"in {report['elapsed_seconds']}s. Report: {args.report}")
@@ -0,0 +1,174 @@
+"""
+Season overview sheets: one team's pass networks, shot maps or dribble maps for every
+cached match, laid out as an mplsoccer grid.
+
+Panels are drawn from the per-match geometry JSON written by generate_all_assets
+(assets/json/<match>_<side>_<kind>.json), exporting any that are missing first.
+Each panel payload is loaded once, when the season is indexed; the payloads are small, and
+pages are drawn and closed one at a time so no figure holds more than --per-page panels,
+whatever the size of the season.
+
+    python generate_season_sheet.py --kind passnetwork --team Barcelona
+"""
+import os
+import glob
+import json
+import math
+import argparse
+import matplotlib.pyplot as plt
+from mplsoccer import Pitch, VerticalPitch
+
+import generate_all_assets as assets
+from EliteAnalytics.backend.understat import normalize_team
+
+# kind -> (geometry file suffix, export task kind)
+SHEET_KINDS = {
+    "passnetwork": ("passnetwork", "passnetwork_geometry"),
+    "shots": ("shots", "shot_geometry"),
+    "dribbles": ("dribbles", "dribble_geometry"),
+}
+TEAM_COLOR = "#a50044"
+
+
+def _geometry_path(match_id, side, suffix):
+    return os.path.join(assets.JSON_DIR, f"{match_id}_{side}_{suffix}.json")
+
+
+def load_panel(match_id, kind, team):
+    """Return the team's geometry payload for one match, exporting it if needed. None if absent."""
+    suffix, task_kind = SHEET_KINDS[kind]
+    key = normalize_team(team)
+    cache_path = assets.match_cache_path(match_id)
+    for side in ("home", "away"):
+        path = _geometry_path(match_id, side, suffix)
+        if not os.path.exists(path) and os.path.exists(cache_path):
+            assets.render_task((cache_path, task_kind, side))
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            geo = json.load(f)
+        # Same club, not a substring: "Barcelona" must not pick "Barcelona B" or "Espanyol de Barcelona"
+        if normalize_team(geo.get("team")) == key:
+            return geo
+    return None
+
+
+def season_index(match_ids, kind, team):
+    """(date, match_id, panel) for every match the team has a panel for, in date order."""
+    index = []
+    for match_id in match_ids:
+        geo = load_panel(match_id, kind, team)
+        if geo is not None:
+            index.append((geo.get("date") or "", match_id, geo))
+    return sorted(index, key=lambda entry: entry[:2])
+
+
+def draw_passnetwork(pitch, ax, geo):
+    nodes = {n["id"]: n for n in geo["nodes"]}
+    for e in geo["edges"]:
+        a, b = nodes.get(e["source"]), nodes.get(e["target"])
+        if a is None or b is None: continue
+        pitch.lines(a["x"], a["y"], b["x"], b["y"], lw=e["lw"] * 0.5, color=TEAM_COLOR,
+                    alpha=e["alpha"], ax=ax, zorder=1)
+    pitch.scatter([n["x"] for n in geo["nodes"]], [n["y"] for n in geo["nodes"]],
+                  s=[n["size"] * 0.3 for n in geo["nodes"]], color="white", edgecolors=TEAM_COLOR,
+                  linewidth=1.2, ax=ax, zorder=2)
+    for n in geo["nodes"]:
+        pitch.annotate(n["label"], xy=(n["x"], n["y"]), c=TEAM_COLOR, va="center", ha="center",
+                       size=6, weight="bold", ax=ax, zorder=3)
+
+
+def draw_shots(pitch, ax, geo):
+    shots = geo["shots"]
+    if not shots: return
+    goals = [s for s in shots if s[3]]
+    misses = [s for s in shots if not s[3]]
+    if misses:
+        pitch.scatter([s[0] for s in misses], [s[1] for s in misses], s=[s[2] * 400 + 15 for s in misses],
+                      color="#cccccc", edgecolors="black", alpha=0.7, ax=ax, zorder=2)
+    if goals:
+        pitch.scatter([s[0] for s in goals], [s[1] for s in goals], s=[s[2] * 400 + 15 for s in goals],
+                      color=TEAM_COLOR, edgecolors="white", marker="*", ax=ax, zorder=3)
+    xg = sum(s[2] for s in shots)
+    ax.text(0.5, 0.02, f"{len(shots)} shots · xG {xg:.2f}", transform=ax.transAxes, ha="center",
+            fontsize=7, color="white")
+
+
+def draw_dribbles(pitch, ax, geo):
+    rows = geo["dribbles"]
+    fail = [r for r in rows if not r[2]]
+    succ = [r for r in rows if r[2]]
+    if fail:
+        pitch.scatter([r[0] for r in fail], [r[1] for r in fail], color="#d62728", marker="x", s=18, ax=ax, zorder=2)
+    if succ:
+        pitch.scatter([r[0] for r in succ], [r[1] for r in succ], color="#2ca02c", edgecolors="black",
+                      s=18, ax=ax, zorder=3)
+
+
+PANEL_STYLES = {
+    "passnetwork": (lambda: VerticalPitch(pitch_type="statsbomb", pitch_color="#ffffff", line_color="#c7c7c7"),
+                    draw_passnetwork, "#333333", "#ffffff"),
+    "shots": (lambda: VerticalPitch(pitch_type="statsbomb", half=True, pitch_color="#2d572c", line_color="white"),
+              draw_shots, "white", "#0d0d1a"),
+    "dribbles": (lambda: Pitch(pitch_type="statsbomb", pitch_color="#2d572c", line_color="white"),
+                 draw_dribbles, "white", "#0d0d1a"),
+}
+
+
+def render_page(page, kind, ncols, title, out_name):
+    """Draw one sheet page from its (date, match_id, panel) entries."""
+    make_pitch, draw_panel, text_color, background = PANEL_STYLES[kind]
+    pitch = make_pitch()
+    nrows = math.ceil(len(page) / ncols)
+    panel_w, panel_h = (2.6, 3.6) if kind == "passnetwork" else (3.6, 2.8)
+    fig, axs = pitch.draw(nrows=nrows, ncols=ncols, figsize=(panel_w * ncols, panel_h * nrows + 0.8))
+    fig.patch.set_facecolor(background)
+    axs = [axs] if nrows * ncols == 1 else list(getattr(axs, "flat", axs))
+
+    for ax, (date, match_id, geo) in zip(axs, page):
+        draw_panel(pitch, ax, geo)
+        label = f"vs {geo.get('opponent') or '?'} ({date[:10]})" if date else f"Match {match_id}"
+        ax.set_title(label, fontsize=8, color=text_color, pad=3)
+    for ax in axs[len(page):]:
+        ax.remove()
+
+    fig.suptitle(title, fontsize=16, fontweight="bold", color=text_color)
+    plt.tight_layout()
+    assets.save_figure(fig, out_name)
+
+
+def render_season_sheet(kind, team, match_ids=None, per_page=20, ncols=5):
+    if match_ids is None:
+        match_ids = sorted(assets._match_id_from_path(p)
+                           for p in glob.glob(os.path.join(assets.DATA_DIR, "match_*_cache.json")))
+    index = season_index(match_ids, kind, team)
+    if not index:
+        print(f"No {kind} panels found for {team}.")
+        return []
+
+    pages = [index[i:i + per_page] for i in range(0, len(index), per_page)]
+    slug = team.lower().replace(" ", "_")
+    outputs = []
+    for n, page in enumerate(pages, start=1):
+        out_name = f"season_{slug}_{kind}_p{n}.png"
+        title = f"{team} - Season {kind.title()} ({n}/{len(pages)})"
+        render_page(page, kind, min(ncols, len(page)), title, out_name)
+        outputs.append(out_name)
+        print(f"Saved {out_name} ({len(page)} matches)")
+    return outputs
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render season overview sheets from per-match aggregates.")
+    parser.add_argument("--kind", choices=sorted(SHEET_KINDS), default="passnetwork")
+    parser.add_argument("--team", default="Barcelona")
+    parser.add_argument("--per-page", type=int, default=20, help="Matches per sheet (bounds memory)")
+    parser.add_argument("--cols", type=int, default=5)
+    parser.add_argument("--matches", default=None, help="Comma-separated match ids (default: every cached match)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    ids = [int(m) for m in args.matches.split(",")] if args.matches else None
+    render_season_sheet(args.kind, args.team, ids, per_page=args.per_page, ncols=args.cols)
@@ -1,88 +1,14 @@
 import os
-import json
 import time
-import re
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-DATA_DIR = os.path.join(PROJECT_ROOT, "assets", "data")
-os.makedirs(DATA_DIR, exist_ok=True)
-
-# URL for Barcelona 2025/26 Fixtures. Since 25/26 might not be listed fully yet, we point to the main tracking page.
-# Using standard team fixtures view
-TEAM_FIXTURES_URL = "https://www.whoscored.com/Teams/65/Fixtures/Spain-Barcelona"
-
-def setup_driver():
-    options = webdriver.ChromeOptions()
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36")
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    # Uncomment to run headless if preferred (may increase Cloudflare detection risk)
-    # options.add_argument('--headless')
-    driver = webdriver.Chrome(options=options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    return driver
-
-def extract_match_data(driver, url, match_id):
-    print(f"Navigating to {url}...")
-    driver.get(url)
-    
-    # Random organic wait
-    time.sleep(15)
-    
-    html = driver.page_source
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    script_content = None
-    for script in soup.find_all('script'):
-        if script.string and 'matchCentreData:' in script.string:
-            script_content = script.string
-            break
-            
-    if script_content:
-        print(f"[{match_id}] Found data script. Parsing JSON...")
-        try:
-            start_str = "matchCentreData:"
-            start_idx = script_content.find(start_str) + len(start_str)
-            content = script_content[start_idx:].strip()
-            
-            if 'matchCentreEventTypeJson' in content:
-                json_str = content.split('matchCentreEventTypeJson')[0].strip()
-                if json_str.endswith(','): json_str = json_str[:-1]
-            else:
-                json_str = content
-                
-            data = json.loads(json_str)
-            
-            output_file = os.path.join(DATA_DIR, f"match_{match_id}_cache.json")
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
-                
-            print(f"[{match_id}] Generated successfully. Events: {len(data.get('events', []))}")
-            return True
-            
-        except Exception as pe:
-            print(f"[{match_id}] JSON Parse Error: {pe}")
-            return False
-    else:
-        print(f"[{match_id}] matchCentreData script not found. Likely blocked by Cloudflare or no data available yet.")
-        return False
-
-
-import os
-import json
-import time
-import re
-import urllib.request
-import subprocess
 import datetime
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from bs4 import BeautifulSoup
+import argparse
+from urllib.parse import urlparse
+from EliteAnalytics.backend.whoscored import wait_for_match_centre, read_match_centre, is_blocked, fetch_match_centre
+from EliteAnalytics.backend.browser_pool import get_pool
+from EliteAnalytics.backend.scheduler import Blocked, Checkpoint, HostLimiter, run_jobs
+from EliteAnalytics.backend import fixtures, pipeline
+from EliteAnalytics.backend.cache_io import write_cache
+from EliteAnalytics.backend.understat import UnderstatIndex, fetch_team_matches
 
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
@@ -91,134 +17,175 @@ os.makedirs(DATA_DIR, exist_ok=True)
 FIXTURES_URL = "https://www.whoscored.com/teams/65/fixtures/spain-barcelona"
 UNDERSTAT_URL = "https://understat.com/team/Barcelona/2025"
 
-def setup_driver():
-    options = webdriver.ChromeOptions()
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36")
-    options.add_argument('--window-size=1920,1080')
-    options.add_argument('--disable-blink-features=AutomationControlled')
-    driver = webdriver.Chrome(options=options)
-    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    return driver
+WHOSCORED_BASE = "https://www.whoscored.com"
+MATCH_URL = "{base}/Matches/{match_id}/Live"
+# Concurrent browsers and the politeness budget per host (requests per minute, plus jitter)
+SCRAPE_WORKERS = int(os.environ.get("SCRAPE_WORKERS", "2"))
+SCRAPE_RATE_PER_MIN = float(os.environ.get("SCRAPE_RATE_PER_MIN", "4"))
+# Matches already scraped by an earlier (possibly interrupted) --backfill run; the daemon
+# keeps its state in the queue instead
+CHECKPOINT_PATH = os.path.join(DATA_DIR, "scrape_checkpoint.json")
+# Cached team schedule and the queue of finished matches still to scrape (backend/fixtures.py)
+SCHEDULE_PATH = os.path.join(DATA_DIR, "fixtures_schedule.json")
+QUEUE_PATH = os.path.join(DATA_DIR, "scrape_queue.json")
 
 def fetch_understat_team_data():
-    """Fetches all Barcelona matches from Understat for cross-referencing xG."""
+    """Index of all Barcelona matches on Understat, for cross-referencing xG."""
     print("Fetching Understat season data...")
-    req = urllib.request.Request(UNDERSTAT_URL, headers={'User-Agent': 'Mozilla/5.0'})
     try:
-        html = urllib.request.urlopen(req).read().decode('utf-8')
-        m = re.search(r"var datesData\s*=\s*JSON\.parse\('(.+?)'\);", html)
-        if m:
-            data = json.loads(m.group(1).encode('utf-8').decode('unicode_escape'))
-            return [d for d in data if d.get('isResult') == True]
+        return UnderstatIndex(fetch_team_matches(UNDERSTAT_URL))
     except Exception as e:
         print(f"Failed to fetch Understat data: {e}")
-    return []
+    return UnderstatIndex()
 
-def match_understat_data(ws_date_str, understat_matches):
-    """Fuzzy link a WhoScored match to an Understat match by Date."""
-    if not ws_date_str or not understat_matches: return None
+def store_match_data(data, match_id, understat_index):
+    """Attach the Understat match (if any) and write the cache file."""
     try:
-        ws_date = ws_date_str.split('T')[0]
-        for um in understat_matches:
-            if um.get('datetime', '').startswith(ws_date):
-                return um
-    except Exception:
-        pass
-    return None
+        # Cross-reference Understat by date and teams
+        us_match = understat_index.lookup_match(data)
+        if us_match:
+            print(f"[{match_id}] Matched Understat game! Home xG: {us_match['xG']['h']}, Away xG: {us_match['xG']['a']}")
+            data["understat"] = us_match
+        
+        output_file = os.path.join(DATA_DIR, f"match_{match_id}_cache.json")
+        size = write_cache(output_file, data)
+            
+        print(f"[{match_id}] Cached successfully ({size / 1024:.0f} KB). Events: {len(data.get('events', []))}")
+        return True
+        
+    except Exception as pe:
+        print(f"[{match_id}] Failed to cache match data: {pe}")
+        return False
 
-def extract_match_data(driver, url, match_id, understat_matches):
+def extract_match_data(driver, url, match_id, understat_index):
     print(f"Navigating to {url}...")
     driver.get(url)
-    time.sleep(15)
+    waited = wait_for_match_centre(driver)
+    if waited is None and is_blocked(driver):
+        raise Blocked("Cloudflare challenge")
+    data = read_match_centre(driver) if waited is not None else None
     
-    html = driver.page_source
-    soup = BeautifulSoup(html, 'html.parser')
-    script_content = None
-    for script in soup.find_all('script'):
-        if script.string and 'matchCentreData:' in script.string:
-            script_content = script.string
-            break
-            
-    if script_content:
-        print(f"[{match_id}] Found data script. Parsing JSON...")
-        try:
-            start_str = "matchCentreData:"
-            start_idx = script_content.find(start_str) + len(start_str)
-            content = script_content[start_idx:].strip()
-            if 'matchCentreEventTypeJson' in content:
-                json_str = content.split('matchCentreEventTypeJson')[0].strip()
-                if json_str.endswith(','): json_str = json_str[:-1]
-            else:
-                json_str = content
-                
-            data = json.loads(json_str)
-            
-            # Cross-reference Understat
-            ws_date = data.get("startTime")
-            us_match = match_understat_data(ws_date, understat_matches)
-            if us_match:
-                print(f"[{match_id}] Matched Understat game! Home xG: {us_match['xG']['h']}, Away xG: {us_match['xG']['a']}")
-                data["understat"] = us_match
-            
-            output_file = os.path.join(DATA_DIR, f"match_{match_id}_cache.json")
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4)
-                
-            print(f"[{match_id}] Cached successfully. Events: {len(data.get('events', []))}")
-            return True
-            
-        except Exception as pe:
-            print(f"[{match_id}] JSON Parse Error: {pe}")
-            return False
+    if data is not None:
+        print(f"[{match_id}] Page ready after {waited}s, found matchCentreData.")
+        return store_match_data(data, match_id, understat_index)
     else:
         print(f"[{match_id}] matchCentreData not found. Not played yet or blocked.")
         return False
 
-def trigger_data_pipeline():
-    """Run the ETL pipeline (DB Parser + Asset Generator)"""
-    print(">>> Triggering DB Parser...")
-    subprocess.run(["python", os.path.join(PROJECT_ROOT, "EliteAnalytics", "backend", "parser.py")])
-    print(">>> Triggering Asset Generator...")
-    subprocess.run(["python", os.path.join(PROJECT_ROOT, "generate_all_assets.py")])
-    print(">>> Pipeline Complete!")
-
-def run_scraper_cycle():
+def browser_task(pool, understat_index):
+    """Scrape job for the scheduler: one pooled browser per concurrent match."""
+    def task(match_id):
+        with pool.driver() as driver:
+            return extract_match_data(driver, MATCH_URL.format(base=WHOSCORED_BASE, match_id=match_id), match_id, understat_index)
+    return task
+
+def http_task(base_url, understat_index):
+    """Scrape job over plain HTTP, e.g. against saved pages served by a local stand-in."""
+    def task(match_id):
+        data = fetch_match_centre(MATCH_URL.format(base=base_url.rstrip("/"), match_id=match_id))
+        if data is None:
+            print(f"[{match_id}] matchCentreData not found.")
+            return False
+        return store_match_data(data, match_id, understat_index)
+    return task
+
+def is_cached(match_id):
+    return os.path.exists(os.path.join(DATA_DIR, f"match_{match_id}_cache.json"))
+
+def scrape_matches(match_ids, understat_index, pool=None, source=None, workers=SCRAPE_WORKERS,
+                   rate_per_min=SCRAPE_RATE_PER_MIN, checkpoint_path=None):
+    """
+    Scrape every uncached match concurrently behind the per-host rate limiter. With
+    `checkpoint_path` progress is checkpointed so an interrupted backfill resumes (ids whose
+    cache has since been deleted are scraped again). `source` swaps the browser for plain HTTP
+    against another base URL. Returns the scheduler report.
+    """
+    match_ids = [m for m in match_ids if not is_cached(m)]
+    if source:
+        task, host = http_task(source, understat_index), urlparse(source).netloc
+    else:
+        task, host = browser_task(pool or get_pool(size=workers), understat_index), urlparse(WHOSCORED_BASE).netloc
+    limiter = HostLimiter(rate_per_min=rate_per_min)
+    checkpoint = Checkpoint(checkpoint_path, exists=is_cached)
+    return run_jobs(match_ids, task, host, workers=workers, limiter=limiter, checkpoint=checkpoint)
+
+def trigger_data_pipeline(match_ids):
+    """Ingest just the new matches in-process (and render them when PREGENERATE_ASSETS=1)."""
+    pipeline.process(match_ids)
+
+def run_scraper_cycle(pool=None, schedule=None, queue=None):
+    """
+    One daemon step: refresh the cached schedule if it is stale, queue finished matches that
+    have no cache yet, scrape the queued ones that are due. Returns the seconds to sleep.
+    """
     print(f"\n[{datetime.datetime.now()}] Starting Scraper Cycle...")
-    driver = setup_driver()
-    new_match_found = False
+    # The browsers (and their Cloudflare cookies) outlive the cycle
+    pool = pool or get_pool(size=SCRAPE_WORKERS)
+    schedule = schedule or fixtures.Schedule(SCHEDULE_PATH)
+    queue = queue or fixtures.WorkQueue(QUEUE_PATH)
+    new_matches = []
     
     try:
-        understat_matches = fetch_understat_team_data()
-        match_ids = ["1968936"]
-            
-        print(f"Targeting {len(match_ids)} fixture links.")
+        fixtures.refresh(schedule, pool, FIXTURES_URL)
+        added = queue.add([m for m in schedule.finished() if not is_cached(m)])
+        if added:
+            print(f"Queued {len(added)} finished matches: {', '.join(added)}")
+        match_ids = queue.ready()
         
-        for match_id in match_ids:
-            if os.path.exists(os.path.join(DATA_DIR, f"match_{match_id}_cache.json")):
-                continue
-                
-            url = f"https://www.whoscored.com/Matches/{match_id}/Live"
-            if extract_match_data(driver, url, match_id, understat_matches):
-                new_match_found = True
-                
-            time.sleep(15) # Wait between requests to avoid bans
+        if match_ids:
+            print(f"Targeting {len(match_ids)} queued matches.")
+            report = scrape_matches(match_ids, fetch_understat_team_data(), pool=pool)
+            retry = set(report["unavailable"]) | set(report["failed"])
+            # Anything else is cached now
+            queue.done([m for m in match_ids if m not in retry])
+            queue.defer(sorted(retry))
+            new_matches = report["done"]
             
     except Exception as e:
         print(f"Cycle error: {e}")
-    finally:
-        driver.quit()
         
-    if new_match_found:
-        trigger_data_pipeline()
+    if new_matches:
+        trigger_data_pipeline(new_matches)
     else:
         print("No new matches processed.")
-
-def main():
-    print("Elite Scraper Daemon Started. Will check for new matches periodically.")
-    while True:
-        run_scraper_cycle()
-        print("Sleeping for 60 minutes before next check...")
-        time.sleep(3600)  # Check every hour
+    return fixtures.sleep_for(schedule, queue, cached=[m for m in schedule.fixtures if is_cached(m)])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="WhoScored scraper daemon, or a one-off concurrent backfill.")
+    parser.add_argument("--backfill", default=None, help="Comma-separated match ids to scrape once, then exit")
+    parser.add_argument("--workers", type=int, default=SCRAPE_WORKERS, help="Concurrent browsers / requests")
+    parser.add_argument("--rate", type=float, default=SCRAPE_RATE_PER_MIN, help="Requests per minute per host")
+    parser.add_argument("--source", default=None, help="Fetch pages over plain HTTP from this base URL instead of a browser")
+    args = parser.parse_args(argv)
+    
+    if args.backfill:
+        ids = [m.strip() for m in args.backfill.split(",") if m.strip()]
+        understat_index = UnderstatIndex() if args.source else fetch_understat_team_data()
+        pool = None if args.source else get_pool(size=args.workers)
+        try:
+            report = scrape_matches(ids, understat_index, pool=pool, source=args.source,
+                                    workers=args.workers, rate_per_min=args.rate, checkpoint_path=CHECKPOINT_PATH)
+        finally:
+            if pool: pool.shutdown()
+        print(f"Backfill: {len(report['done'])} scraped, {len(report['unavailable'])} unavailable, {len(report['failed'])} failed.")
+        try:
+            if report["done"]:
+                trigger_data_pipeline(report["done"])
+        finally:
+            pipeline.shutdown()
+        return
+    
+    print("Elite Scraper Daemon Started. Will check for new matches around full time.")
+    pool = get_pool(size=SCRAPE_WORKERS)
+    schedule, queue = fixtures.Schedule(SCHEDULE_PATH), fixtures.WorkQueue(QUEUE_PATH)
+    try:
+        while True:
+            wait = run_scraper_cycle(pool, schedule, queue)
+            print(f"Sleeping for {wait // 60} minutes (until {datetime.datetime.now() + datetime.timedelta(seconds=wait):%Y-%m-%d %H:%M})...")
+            time.sleep(wait)
+    finally:
+        pool.shutdown()
+        pipeline.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,40 @@
+import os
+import sys
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+DATA_DIR = os.path.join(PROJECT_ROOT, "assets", "data")
+
+
+@pytest.fixture(autouse=True)
+def xt_surface_path(tmp_path, monkeypatch):
+    """Keep the fitted xT surface out of EliteAnalytics/data."""
+    from EliteAnalytics.backend import xt
+    path = str(tmp_path / "xt_surface.json")
+    monkeypatch.setattr(xt, "SURFACE_PATH", path)
+    xt._surface_cache.clear()
+    return path
+
+
+@pytest.fixture(autouse=True)
+def xg_training_path(tmp_path, monkeypatch):
+    """Keep the xG refit's training rows out of EliteAnalytics/data."""
+    from EliteAnalytics.backend import xg_model
+    path = str(tmp_path / "xg_training.json")
+    monkeypatch.setattr(xg_model, "TRAINING_PATH", path)
+    return path
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """An empty SQLite database with the full schema."""
+    from sqlalchemy import create_engine
+    from EliteAnalytics.backend.database import Base, ensure_columns
+    eng = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(eng)
+    ensure_columns(eng)
+    yield eng
+    eng.dispose()
@@ -0,0 +1,79 @@
+import os
+from EliteAnalytics.backend import assets, pipeline
+
+
+def test_match_cache_path_searches_every_cache_dir(tmp_path, monkeypatch):
+    import generate_all_assets
+    parser_dir, scraper_dir = tmp_path / "assets_data", tmp_path / "data"
+    parser_dir.mkdir()
+    scraper_dir.mkdir()
+    (scraper_dir / "match_42_cache.json").write_text("{}")
+    monkeypatch.setattr(pipeline, "CACHE_DIRS", (str(parser_dir), str(scraper_dir)))
+
+    assert generate_all_assets.match_cache_path("42") == str(scraper_dir / "match_42_cache.json")
+    assert generate_all_assets.asset_task("42_home_passes.json")[0] == str(scraper_dir / "match_42_cache.json")
+
+
+def test_failed_render_is_not_retried_within_ttl(tmp_path, monkeypatch):
+    cache = tmp_path / "match_42_cache.json"
+    cache.write_text("{}")
+    (tmp_path / "png").mkdir()
+    task = (str(cache), "passmaps", "home")
+    calls = []
+
+    def failing_render(t, formats=None, scales=None):
+        calls.append(t)
+        return {"status": "failed", "error": "boom"}
+
+    monkeypatch.setattr(assets, "ASSETS_DIR", str(tmp_path))
+    monkeypatch.setattr(assets, "_task_for", lambda filename: task)
+    monkeypatch.setattr(assets, "_render", failing_render)
+    monkeypatch.setattr(assets, "_failed", {})
+
+    assert assets.ensure_asset("png", "42_home_total_passes.png") is None
+    assert assets.ensure_asset("png", "42_home_total_passes.png") is None
+    assert len(calls) == 1
+
+    monkeypatch.setattr(assets, "FAILED_TTL", 0)
+    assert assets.ensure_asset("png", "42_home_total_passes.png") is None
+    assert len(calls) == 2
+
+
+def test_asset_task_maps_every_variant():
+    import generate_all_assets
+    base = generate_all_assets.asset_task("1913888_home_total_passes.png")
+    assert base[1:] == ("passmaps", "home")
+    for name in ("1913888_home_total_passes.webp", "1913888_home_total_passes@2x.webp",
+                 "1913888_home_total_passes@3x.avif", "1913888_home_total_passes@2x.png"):
+        assert generate_all_assets.asset_task(name) == base
+    assert generate_all_assets.asset_task("1913888_home_total_passes.gif") is None
+
+
+def test_lazy_render_writes_requested_variant(tmp_path, monkeypatch):
+    import generate_all_assets
+    monkeypatch.setattr(assets, "ASSETS_DIR", str(tmp_path))
+    monkeypatch.setattr(generate_all_assets, "PNG_DIR", str(tmp_path / "png"))
+    (tmp_path / "png").mkdir()
+    monkeypatch.setattr(assets, "_failed", {})
+    batch_formats = generate_all_assets.OUTPUT_FORMATS
+
+    path = assets.ensure_asset("png", "1913888_home_dribbles@2x.webp")
+    assert path == str(tmp_path / "png" / "1913888_home_dribbles@2x.webp")
+    names = set(os.listdir(tmp_path / "png"))
+    # The lazy defaults are written alongside, and the batch settings are restored
+    assert {"1913888_home_dribbles.png", "1913888_home_dribbles.webp"} <= names
+    assert generate_all_assets.OUTPUT_FORMATS == batch_formats
+
+    path = assets.ensure_asset("png", "1913888_home_dribbles@3x.avif")
+    assert path == str(tmp_path / "png" / "1913888_home_dribbles@3x.avif")
+
+
+def test_loaded_match_follows_new_understat_links(tmp_path):
+    import generate_all_assets
+    from EliteAnalytics.backend.understat import update_sidecar
+    cache = tmp_path / "match_42_cache.json"
+    cache.write_text('{"matchId": 42}')
+
+    assert "understat" not in generate_all_assets._load_match(str(cache))
+    update_sidecar(str(tmp_path), {"42": {"xG": {"h": "1.2", "a": "0.4"}}})
+    assert generate_all_assets._load_match(str(cache))["understat"]["xG"]["h"] == "1.2"
@@ -0,0 +1,126 @@
+import json
+import pytest
+
+from EliteAnalytics.backend.browser_pool import BrowserPool
+
+
+class WebDriverException(Exception):
+    """Stands in for selenium.common.exceptions.WebDriverException."""
+
+
+class StubDriver:
+    """Just enough of a Selenium driver for the pool."""
+    instances = []
+
+    def __init__(self):
+        self.alive = True
+        self.quit_calls = 0
+        self.cookies = []
+        self.visited = []
+        StubDriver.instances.append(self)
+
+    def execute_script(self, js, *args):
+        if not self.alive:
+            raise WebDriverException("chrome not reachable")
+        return 1
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def quit(self):
+        self.quit_calls += 1
+
+
+@pytest.fixture
+def make_pool(tmp_path):
+    StubDriver.instances = []
+    pools = []
+
+    def make(**kwargs):
+        kwargs.setdefault("cookie_path", str(tmp_path / "cookies.json"))
+        pool = BrowserPool(StubDriver, **kwargs)
+        pools.append(pool)
+        return pool
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+def _use(pool):
+    with pool.driver() as driver:
+        return driver
+
+
+def test_reuses_a_driver_until_max_pages(make_pool):
+    pool = make_pool(max_pages=3)
+    drivers = [_use(pool) for _ in range(7)]
+    assert drivers[0] is drivers[1] is drivers[2]
+    assert drivers[3] is drivers[4] is drivers[5] and drivers[3] is not drivers[0]
+    assert drivers[0].quit_calls == 1
+    assert pool.stats["started"] == 3 and pool.stats["recycled"] == 2
+
+
+def test_recycles_after_max_age(make_pool):
+    pool = make_pool(max_age=3600)
+    first = _use(pool)
+    assert _use(pool) is first
+    pool._idle.queue[-1].created -= 7200
+    # Aged out on the next checkin, so the page after that gets a new browser
+    assert _use(pool) is first
+    assert first.quit_calls == 1
+    assert _use(pool) is not first
+
+
+def test_replaces_a_driver_that_fails_its_health_check(make_pool):
+    pool = make_pool()
+    first = _use(pool)
+    first.alive = False
+    second = _use(pool)
+    assert second is not first
+    assert first.quit_calls == 1
+    assert pool.stats["crashed"] == 1
+
+
+def test_webdriver_error_retires_the_driver(make_pool):
+    pool = make_pool()
+    with pytest.raises(WebDriverException):
+        with pool.driver() as driver:
+            first = driver
+            raise WebDriverException("tab crashed")
+    assert first.quit_calls == 1 and pool.stats["crashed"] == 1
+
+    # Other errors are the caller's: the driver goes back to the pool
+    with pytest.raises(ValueError):
+        with pool.driver() as driver:
+            second = driver
+            raise ValueError("bad page")
+    assert _use(pool) is second
+
+
+def test_cookies_survive_recycling(make_pool, tmp_path):
+    pool = make_pool(max_pages=1)
+    with pool.driver() as driver:
+        driver.cookies = [{"name": "cf_clearance", "value": "ok", "sameSite": "bogus"}]
+    saved = json.loads((tmp_path / "cookies.json").read_text())
+    assert saved[0]["name"] == "cf_clearance"
+
+    fresh = _use(pool)
+    assert fresh is not StubDriver.instances[0]
+    assert fresh.cookies == [{"name": "cf_clearance", "value": "ok"}]
+    assert fresh.visited[0] == pool.base_url
+
+
+def test_shutdown_twice(make_pool):
+    pool = make_pool(size=2)
+    driver = _use(pool)
+    pool.shutdown()
+    pool.shutdown()
+    assert driver.quit_calls == 1
+    with pytest.raises(RuntimeError):
+        _use(pool)
@@ -0,0 +1,36 @@
+import numpy as np
+from EliteAnalytics.backend import coords
+
+
+def test_whoscored_calibration_points():
+    assert coords.ws_to_sb_x([0, 50, 89, 100]).tolist() == [0.0, 60.0, 108.0, 120.0]
+    assert coords.sb_to_ws_x([0, 60, 108, 120]).tolist() == [0.0, 50.0, 89.0, 100.0]
+    assert coords.ws_to_sb_y([0, 50, 100]).tolist() == [80.0, 40.0, 0.0]
+    # The penalty spot, where a plain 1.20 stretch is about a unit off
+    x, y = coords.ws_to_sb(89, 50)
+    assert (float(x), float(y)) == (108.0, 40.0)
+
+
+def test_whoscored_round_trip():
+    rng = np.random.default_rng(0)
+    x, y = rng.uniform(-5, 105, 1000), rng.uniform(0, 100, 1000)
+    bx, by = coords.sb_to_ws(*coords.ws_to_sb(x, y))
+    assert np.allclose(bx, x) and np.allclose(by, y)
+    # Outside 0-100 the end segments are extrapolated
+    assert coords.ws_to_sb_x([-10, 110]).tolist() == [-12.0, 120.0 + 10 * 12 / 11]
+
+
+def test_sofascore_to_statsbomb():
+    x, y = coords.sofascore_to_sb([0, 50, 100], [0, 50, 100])
+    assert x.tolist() == [0.0, 60.0, 120.0]
+    assert y.tolist() == [0.0, 40.0, 80.0]
+    rng = np.random.default_rng(1)
+    sx, sy = rng.uniform(0, 100, 500), rng.uniform(0, 100, 500)
+    x, y = coords.sofascore_to_sb(sx, sy)
+    assert np.allclose(x / coords.SOFASCORE_X_SCALE, sx) and np.allclose(y / coords.SOFASCORE_Y_SCALE, sy)
+
+
+def test_events_to_sb_reads_missing_as_zero():
+    x, y = coords.events_to_sb([{"x": 89, "y": 50}, {"x": None}])
+    assert x.tolist() == [108.0, 0.0]
+    assert y.tolist() == [40.0, 80.0]
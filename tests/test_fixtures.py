@@ -0,0 +1,26 @@
+import json
+from EliteAnalytics.backend import fixtures
+
+
+def test_abandoned_matches_are_not_queued_again(tmp_path):
+    path = str(tmp_path / "queue.json")
+    queue = fixtures.WorkQueue(path)
+    assert queue.add(["111", "222"], now=1000) == ["111", "222"]
+
+    queue.defer(["111", "222"], now=1000 + fixtures.RETRY_AFTER)
+    assert queue.items["111"]["attempts"] == 1
+    queue.defer(["111"], now=1000 + fixtures.GIVE_UP_AFTER)
+    assert "111" not in queue.items and "111" in queue.abandoned
+
+    # A fresh daemon reads the abandoned set back and skips the id
+    queue = fixtures.WorkQueue(path)
+    assert queue.add(["111", "222", "333"], now=2000 + fixtures.GIVE_UP_AFTER) == ["333"]
+    assert queue.next_attempt() is not None
+
+
+def test_reads_items_only_queue_files(tmp_path):
+    path = tmp_path / "queue.json"
+    path.write_text(json.dumps({"111": {"added": 1, "attempts": 0, "next_attempt": 1}}))
+    queue = fixtures.WorkQueue(str(path))
+    assert queue.ready(now=2) == ["111"]
+    assert queue.abandoned == {}
@@ -0,0 +1,151 @@
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+import requests
+
+from EliteAnalytics.backend import http_client
+from EliteAnalytics.backend.http_client import HttpClient, OfflineMiss
+
+BODY = b'{"v": 1}'
+ETAG = '"v1"'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def server():
+    """Local HTTP server: /boom answers 503, everything else BODY with an ETag (304 when it matches)."""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body=b"", headers=()):
+            self.send_response(status)
+            for k, v in headers:
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            hits.append((self.path, self.headers.get("If-None-Match")))
+            if self.path.startswith("/boom"):
+                self._send(503)
+            elif self.headers.get("If-None-Match") == ETAG:
+                self._send(304, headers=[("ETag", ETAG)])
+            else:
+                self._send(200, BODY, [("ETag", ETAG), ("Content-Type", "application/json")])
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    state = {"base": f"http://127.0.0.1:{srv.server_port}", "hits": hits, "server": srv}
+    yield state
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def client(tmp_path, clock):
+    c = HttpClient(cache_dir=str(tmp_path / "http_cache"), ttls=[(r"/short", 10)], default_ttl=100,
+                   retries=0, backoff=0, clock=clock)
+    yield c
+    c.close()
+
+
+def test_ttl_hit_makes_no_request(server, client, clock):
+    r = client.get(server["base"] + "/a")
+    assert (r.status_code, r.json(), r.from_cache) == (200, {"v": 1}, False)
+    clock.now += 50
+    r = client.get(server["base"] + "/a")
+    assert r.from_cache and r.json() == {"v": 1}
+    assert len(server["hits"]) == 1
+    assert client.stats["hits"] == 1
+
+
+def test_expired_entry_revalidates_with_etag(server, client, clock):
+    client.get(server["base"] + "/short")
+    clock.now += 20
+    r = client.get(server["base"] + "/short")
+    assert r.from_cache and r.content == BODY
+    assert server["hits"][-1] == ("/short", ETAG)
+    assert client.stats["revalidated"] == 1
+    # The 304 refreshed the entry, so it is fresh again
+    clock.now += 5
+    client.get(server["base"] + "/short")
+    assert len(server["hits"]) == 2
+
+
+def test_stale_copy_on_server_error(server, client, clock):
+    # 503 without a cached copy: passed through, nothing stored
+    with pytest.raises(requests.HTTPError):
+        client.get(server["base"] + "/boom").raise_for_status()
+
+    # With a cached copy (seeded from another path's response) the 503 serves it instead
+    key = client.cache_key(server["base"] + "/boom")
+    client._store(key, server["base"] + "/boom", requests.get(server["base"] + "/a"))
+    clock.now += 1000
+    r = client.get(server["base"] + "/boom")
+    assert r.from_cache and r.status_code == 200 and r.json() == {"v": 1}
+    assert client.stats["stale"] == 1
+
+
+def test_stale_copy_on_connection_error(server, client, clock):
+    client.get(server["base"] + "/a")
+    server["server"].shutdown()
+    server["server"].server_close()
+    # Drop the kept-alive connection, whose handler thread outlives the server
+    client.session.close()
+    clock.now += 1000
+    r = client.get(server["base"] + "/a")
+    assert r.from_cache and r.json() == {"v": 1}
+    assert client.stats["stale"] == 1
+    with pytest.raises(requests.ConnectionError):
+        client.get(server["base"] + "/never-fetched")
+
+
+def test_identical_bodies_are_stored_once(server, client, tmp_path):
+    for path in ("/a", "/b", "/c?x=1"):
+        client.get(server["base"] + path)
+    bodies = [f for _, _, files in os.walk(tmp_path / "http_cache" / "bodies") for f in files]
+    metas = [f for _, _, files in os.walk(tmp_path / "http_cache" / "meta") for f in files]
+    assert len(bodies) == 1 and len(metas) == 3
+
+
+def test_offline_replay_and_miss(server, client, tmp_path, monkeypatch):
+    client.get(server["base"] + "/a")
+    n = len(server["hits"])
+    monkeypatch.setenv("HTTP_OFFLINE", "1")
+    offline = HttpClient(cache_dir=str(tmp_path / "http_cache"),
+                         offline=os.environ.get("HTTP_OFFLINE") == "1", clock=lambda: 10**12)
+    try:
+        # Replayed however old the entry is
+        assert offline.get(server["base"] + "/a").json() == {"v": 1}
+        with pytest.raises(OfflineMiss):
+            offline.get(server["base"] + "/missing")
+    finally:
+        offline.close()
+    assert len(server["hits"]) == n
+    assert issubclass(OfflineMiss, requests.ConnectionError)
+
+
+def test_default_cache_dir_is_ignored_by_git():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, ".gitignore"), encoding="utf-8") as f:
+        ignored = f.read().split()
+    assert "/" + os.path.relpath(http_client.CACHE_DIR, root).replace(os.sep, "/") + "/" in ignored
@@ -0,0 +1,71 @@
+from sqlalchemy.orm import Session
+from EliteAnalytics.backend import pipeline, xt
+from EliteAnalytics.backend.database import Event, Possession, Pressing, PlayerMatch, MatchSeries
+
+MATCH_ID = "1913888"
+
+
+def _counts(engine):
+    session = Session(bind=engine)
+    try:
+        counts = {model.__name__: session.query(model).count()
+                  for model in (Event, Possession, Pressing, PlayerMatch, MatchSeries)}
+        stats = xt.get_stats(session)
+        counts["xt_moves"] = float(xt._unpack(stats)["moves"].sum())
+        counts["xt_matches"] = list(stats.match_ids)
+        return counts
+    finally:
+        session.close()
+
+
+def test_ingest_twice_keeps_row_counts(db_engine):
+    assert pipeline.ingest([MATCH_ID], bind=db_engine) == [MATCH_ID]
+    first = _counts(db_engine)
+    assert first["Event"] > 0 and first["Possession"] > 0
+
+    assert pipeline.ingest([MATCH_ID], bind=db_engine) == [MATCH_ID]
+    assert _counts(db_engine) == first
+
+
+def test_ingest_refreshes_xt_once_per_batch(db_engine, monkeypatch):
+    calls = []
+    refresh = xt.refresh
+    monkeypatch.setattr(xt, "refresh", lambda session, ids, **kw: calls.append(list(ids)) or refresh(session, ids, **kw))
+
+    ids = ["1913888", "1913903", "1913904"]
+    assert pipeline.ingest(ids, bind=db_engine) == ids
+    assert calls == [[int(m) for m in ids]]
+    assert _counts(db_engine)["xt_matches"] == [int(m) for m in ids]
+
+
+def _xt_sums(engine, model, column):
+    from sqlalchemy import func
+    session = Session(bind=engine)
+    try:
+        rows = session.query(model.match_id, func.sum(getattr(model, column))).group_by(model.match_id).all()
+        return {m: round(v or 0.0, 4) for m, v in rows}
+    finally:
+        session.close()
+
+
+def test_derived_xt_follows_rescore(db_engine):
+    # A fresh database: passes are first valued without a surface, then re-scored by the first fit
+    pipeline.ingest(["1913888", "1913903"], bind=db_engine)
+    events = _xt_sums(db_engine, Event, "xt")
+    assert _xt_sums(db_engine, PlayerMatch, "xt") == events
+    assert _xt_sums(db_engine, Possession, "xt_gained") == _chain_xt_sums(db_engine)
+
+
+def _chain_xt_sums(engine):
+    """Event xT of each chain's possessing team, the way possessions.summarise sums it."""
+    from EliteAnalytics.backend import possessions
+    session = Session(bind=engine)
+    try:
+        out = {}
+        for match_id in (1913888, 1913903):
+            df = possessions.load_events(session, match_id)
+            chains = possessions.summarise(df, possessions.segment(df))
+            out[match_id] = round(float(chains["xt_gained"].sum()), 4)
+        return out
+    finally:
+        session.close()
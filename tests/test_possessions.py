@@ -0,0 +1,21 @@
+import pandas as pd
+from EliteAnalytics.backend import possessions
+
+
+def _chain(*events):
+    rows = [{"id": i, "team_id": team, "type_name": kind, "outcome": "Successful", "period": 1,
+             "minute": i, "second": 0, "x": 50.0, "y": 50.0, "xt": 0.0, "xg": 0.1 if kind in possessions.SHOT_TYPES else None,
+             "set_piece": False} for i, (team, kind) in enumerate(events)]
+    df = pd.DataFrame(rows)
+    return possessions.summarise(df, [1] * len(df)).iloc[0]
+
+
+def test_ends_in_shot_only_when_the_shot_ends_the_chain():
+    assert bool(_chain((1, "Pass"), (1, "Pass"), (1, "SavedShot"))["ends_in_shot"])
+    # The opponent's defensive action after the shot is not an on-ball action of the team
+    assert bool(_chain((1, "Pass"), (1, "MissedShots"), (2, "Aerial"))["ends_in_shot"])
+
+    # Rebound kept and recycled: a shot in the chain, but it ends with a pass
+    row = _chain((1, "Pass"), (1, "SavedShot"), (1, "BallRecovery"), (1, "Pass"))
+    assert row["shots"] == 1
+    assert not bool(row["ends_in_shot"])
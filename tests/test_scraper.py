@@ -0,0 +1,101 @@
+import os
+import json
+import functools
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+
+import scraper
+from EliteAnalytics.backend.scheduler import Checkpoint, HostLimiter
+from EliteAnalytics.backend.understat import UnderstatIndex
+from EliteAnalytics.backend.cache_io import read_cache
+
+PAGE = '<html><body><script>require.config.params["args"] = {{ matchId: {id}, matchCentreData: {payload}, matchCentreEventTypeJson: {{}} }};</script></body></html>'
+
+
+def _payload(match_id):
+    return {"matchId": int(match_id), "home": {"teamId": 65, "name": "Barcelona"},
+            "away": {"teamId": 2, "name": "Girona"}, "events": [{"id": 1, "type": {"displayName": "Pass"}}]}
+
+
+@pytest.fixture
+def stand_in():
+    """Local WhoScored stand-in: /Matches/<id>/Live serves a page with matchCentreData for known ids, 404 otherwise."""
+    pages = {m: PAGE.format(id=m, payload=json.dumps(_payload(m))) for m in ("111", "222")}
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            match_id = self.path.split("/")[2]
+            hits.append(match_id)
+            body = pages.get(match_id)
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}", hits
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def scrape(tmp_path, monkeypatch, stand_in):
+    monkeypatch.setattr(scraper, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(scraper, "HostLimiter", functools.partial(HostLimiter, jitter=0))
+    base_url, hits = stand_in
+
+    def run(ids, checkpoint_path=None):
+        hits.clear()
+        return scraper.scrape_matches(ids, UnderstatIndex(), source=base_url, workers=2,
+                                      rate_per_min=6000, checkpoint_path=checkpoint_path)
+    return run, hits
+
+
+def test_scrape_matches_from_stand_in(tmp_path, scrape):
+    run, hits = scrape
+    report = run(["111", "222", "999"])
+    assert sorted(report["done"]) == ["111", "222"]
+    assert report["unavailable"] == ["999"]
+    assert report["failed"] == []
+    assert read_cache(str(tmp_path / "match_111_cache.json")) == _payload("111")
+    assert sorted(hits) == ["111", "222", "999"]
+
+    # Cached matches are not requested again
+    assert run(["111", "222"])["done"] == []
+    assert hits == []
+
+
+def test_checkpoint_rescrapes_deleted_caches(tmp_path, scrape):
+    run, hits = scrape
+    checkpoint = str(tmp_path / "checkpoint.json")
+    run(["111", "222"], checkpoint_path=checkpoint)
+    assert Checkpoint(checkpoint).done == {"111", "222"}
+
+    os.remove(tmp_path / "match_111_cache.json")
+    report = run(["111", "222"], checkpoint_path=checkpoint)
+    assert report["done"] == ["111"]
+    assert hits == ["111"]
+    assert os.path.exists(tmp_path / "match_111_cache.json")
+
+
+def test_checkpoint_pending_drops_missing_outputs(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path)
+    checkpoint.mark_done("1")
+    checkpoint.mark_done("2")
+    assert Checkpoint(path).pending(["1", "2", "3"]) == ["3"]
+
+    checkpoint = Checkpoint(path, exists=lambda m: m == "2")
+    assert checkpoint.pending(["1", "2", "3"]) == ["1", "3"]
+    assert Checkpoint(path).done == {"2"}
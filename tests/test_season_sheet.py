@@ -0,0 +1,16 @@
+import json
+import generate_season_sheet as sheet
+
+
+def test_panels_match_the_club_not_a_substring(tmp_path, monkeypatch):
+    monkeypatch.setattr(sheet.assets, "JSON_DIR", str(tmp_path))
+    monkeypatch.setattr(sheet.assets, "match_cache_path", lambda match_id: str(tmp_path / "missing.json"))
+    fixtures = {1: ("Barcelona", "Girona", "2026-02-16"), 2: ("Espanyol", "Barcelona B", "2026-01-01"),
+                3: ("Espanyol de Barcelona", "FC Barcelona", "2025-12-01")}
+    for match_id, (home, away, date) in fixtures.items():
+        for side, team in (("home", home), ("away", away)):
+            (tmp_path / f"{match_id}_{side}_passnetwork.json").write_text(json.dumps({"team": team, "date": date}))
+
+    index = sheet.season_index(list(fixtures), "passnetwork", "Barcelona")
+    assert [(date, match_id, geo["team"]) for date, match_id, geo in index] == [
+        ("2025-12-01", 3, "FC Barcelona"), ("2026-02-16", 1, "Barcelona")]
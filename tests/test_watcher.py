@@ -0,0 +1,49 @@
+import os
+from EliteAnalytics.backend.watcher import CacheBatcher
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _settled(batcher, clock):
+    # Two checks past the quiet period: the first records the signature, the second confirms it
+    clock.now += batcher.quiet + 1
+    batcher.settle()
+    batcher.settle()
+    return batcher.flush()
+
+
+def test_unchanged_content_is_not_dispatched_again(tmp_path):
+    clock, batches = FakeClock(), []
+    batcher = CacheBatcher(dispatch=lambda ids: batches.append(ids), clock=clock)
+    path = str(tmp_path / "match_123_cache.json")
+    with open(path, "w") as f:
+        f.write('{"events": []}')
+
+    batcher.touch(path)
+    assert _settled(batcher, clock) == ["123"]
+
+    # Touched / rewritten with the same bytes: nothing to ingest
+    os.utime(path, None)
+    batcher.touch(path)
+    assert _settled(batcher, clock) is None
+
+    with open(path, "w") as f:
+        f.write('{"events": [1]}')
+    batcher.touch(path)
+    assert _settled(batcher, clock) == ["123"]
+    assert batches == [["123"], ["123"]]
+
+
+def test_other_files_are_ignored(tmp_path):
+    clock = FakeClock()
+    batcher = CacheBatcher(dispatch=lambda ids: None, clock=clock)
+    path = str(tmp_path / "understat_enrichment.json")
+    open(path, "w").close()
+    batcher.touch(path)
+    assert _settled(batcher, clock) is None
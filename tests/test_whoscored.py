@@ -0,0 +1,77 @@
+import os
+import json
+import pytest
+
+from EliteAnalytics.backend.whoscored import extract_match_centre, has_match_centre, is_challenge
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEBUG_PAGE = os.path.join(ROOT, "who_debug.html")
+MATCH_PAGE = os.path.join(ROOT, "tests", "fixtures", "whoscored_match_page.html")
+
+
+def legacy_extract(html):
+    """The old parse: everything after the key up to matchCentreEventTypeJson, minus the comma."""
+    start_str = "matchCentreData:"
+    if start_str not in html:
+        return None
+    content = html[html.find(start_str) + len(start_str):].strip()
+    if "matchCentreEventTypeJson" in content:
+        json_str = content.split("matchCentreEventTypeJson")[0].strip()
+        if json_str.endswith(","):
+            json_str = json_str[:-1]
+    else:
+        json_str = content
+    return json.loads(json_str)
+
+
+def _read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture(scope="module")
+def debug_page():
+    return _read(DEBUG_PAGE)
+
+
+def _inject(page, value):
+    script = ('<script>require.config.params["args"] = { matchId: 1, matchCentreData: '
+              + value + ', matchCentreEventTypeJson: {"goal": 16} };</script>')
+    return page.replace("</body>", script + "</body>")
+
+
+def test_saved_page_without_payload(debug_page):
+    assert not has_match_centre(debug_page)
+    assert extract_match_centre(debug_page) is None
+    assert extract_match_centre("") is None
+    assert extract_match_centre(None) is None
+
+
+def test_injected_payload_matches_legacy_parse(debug_page):
+    payload = {"home": {"name": "Barcelona", "players": [{"name": "Odd } name {", "playerId": 1}]},
+               "events": [{"id": 1, "qualifiers": [{"type": {"displayName": "Zone"}, "value": "}}"}]}],
+               "commentary": "closing brace } inside a string"}
+    page = _inject(debug_page, json.dumps(payload))
+    assert has_match_centre(page)
+    assert extract_match_centre(page) == legacy_extract(page) == payload
+
+
+def test_null_payload(debug_page):
+    page = _inject(debug_page, "null")
+    assert legacy_extract(page) is None
+    assert extract_match_centre(page) is None
+
+
+def test_trimmed_match_page_fixture():
+    page = _read(MATCH_PAGE)
+    data = extract_match_centre(page)
+    assert data == legacy_extract(page)
+    assert data["home"]["name"] == "Levante" and data["away"]["name"] == "Barcelona"
+    assert len(data["events"]) == 25
+    assert data["home"]["players"][0]["name"].endswith("{}}")
+
+
+def test_challenge_page_is_not_a_payload():
+    page = "<html><head><title>Just a moment...</title></head><body>cf-challenge</body></html>"
+    assert extract_match_centre(page) is None
+    assert is_challenge(page)
@@ -0,0 +1,101 @@
+"""The vectorized xG engine against the scalar formula it replaced, bit for bit."""
+import os
+import glob
+import math
+import random
+import numpy as np
+import pytest
+
+from EliteAnalytics.backend import xg_model
+from EliteAnalytics.backend.metrics import calculate_xg, calculate_xg_array
+from EliteAnalytics.backend.xg import estimate_xg, round3
+from EliteAnalytics.backend.coords import ws_to_sb
+from EliteAnalytics.backend.cache_io import read_cache
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "data")
+SHOT_TYPES = ("MissedShots", "SavedShot", "ShotOnPost", "Goal")
+
+
+def legacy_calculate_xg(x_ws, y_ws, is_penalty=False, is_big_chance=False, body_part="Unknown"):
+    """metrics.calculate_xg as it was before the shared engine (one shot at a time)."""
+    if is_penalty:
+        return 0.76
+    if x_ws <= 50:
+        x_sb = x_ws * (60.0 / 50.0)
+    elif x_ws <= 89:
+        x_sb = 60.0 + (x_ws - 50) * (48.0 / 39.0)
+    else:
+        x_sb = 108.0 + (x_ws - 89) * (12.0 / 11.0)
+    y_sb = 80 - y_ws * 0.80
+    dx = 120.0 - x_sb
+    dy = 40.0 - y_sb
+    distance = max(math.sqrt(dx**2 + dy**2), 0.5)
+    angle = math.atan2(4.0, distance)
+    base_xg = (angle / (math.pi / 2)) * (1 / (1 + distance / 30))
+    if body_part == "Header":
+        base_xg *= 0.4
+    if is_big_chance:
+        base_xg = max(0.35, base_xg * 3.5)
+        base_xg = min(0.65, base_xg)
+    if distance > 18:
+        base_xg *= (18 / distance)**2
+    return round(min(max(base_xg, 0.01), 0.95), 3)
+
+
+def legacy_shot(ev):
+    """The old parser's per-event qualifier handling before calling calculate_xg."""
+    quals = {q.get("type", {}).get("displayName", "") for q in ev.get("qualifiers", [])}
+    body_part = "Foot"
+    if "Head" in quals: body_part = "Header"
+    if "RightFoot" in quals: body_part = "Right Foot"
+    if "LeftFoot" in quals: body_part = "Left Foot"
+    return legacy_calculate_xg(float(ev["x"]), float(ev["y"]), "Penalty" in quals, "BigChance" in quals, body_part)
+
+
+def _grid(n=20000, seed=1):
+    rng = random.Random(seed)
+    rows = [(rng.uniform(-5, 105), rng.uniform(-5, 105), rng.random() < .05, rng.random() < .2, rng.random() < .2)
+            for _ in range(n)]
+    # Calibration knots and the goal mouth, where segment choice and the distance floor matter
+    rows += [(x, y, False, bc, hd) for x in (0.0, 50.0, 89.0, 100.0, 99.9) for y in (0.0, 45.0, 50.0, 55.0)
+             for bc in (False, True) for hd in (False, True)]
+    return rows
+
+
+def _cached_shots():
+    shots = []
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "match_*_cache.json"))):
+        shots += [ev for ev in read_cache(path).get("events", [])
+                  if ev.get("type", {}).get("displayName") in SHOT_TYPES and ev.get("x") is not None]
+    return shots
+
+
+def test_calculate_xg_matches_legacy():
+    for x, y, pen, bc, hd in _grid(5000):
+        assert calculate_xg(x, y, pen, bc, "Header" if hd else "Foot") == legacy_calculate_xg(x, y, pen, bc, "Header" if hd else "Foot")
+
+
+def test_estimate_xg_matches_legacy():
+    x, y, pen, bc, hd = map(np.array, zip(*_grid()))
+    expected = [legacy_calculate_xg(*row[:4], "Header" if row[4] else "Foot") for row in zip(x, y, pen, bc, hd)]
+    assert calculate_xg_array(x, y, pen, bc, hd).tolist() == expected
+    x_sb, y_sb = ws_to_sb(x, y)
+    assert estimate_xg(x_sb, y_sb, pen, bc, hd).tolist() == expected
+
+
+def test_batch_parser_scores_match_legacy(monkeypatch):
+    monkeypatch.setattr(xg_model, "XG_MODEL", "geometric")
+    shots = _cached_shots()
+    if not shots:
+        pytest.skip("no cached matches")
+    scores = xg_model.score_shots(xg_model.shot_table(shots))
+    assert scores.tolist() == [legacy_shot(ev) for ev in shots]
+
+
+def test_round3_half_way_ties():
+    # k.5 thousandths are not exact in binary; np.round(x, 3) can fall on the other side of them
+    ties = np.array([k / 1000 + 0.0005 for k in range(1000)])
+    near = np.concatenate([np.nextafter(ties, 0), ties, np.nextafter(ties, 1)])
+    assert round3(near).tolist() == [round(float(v), 3) for v in near]
+    assert (np.round(ties, 3) != [round(float(v), 3) for v in ties]).any()
+    assert round3(np.array([[0.0125, 0.9995]])).tolist() == [[round(0.0125, 3), round(0.9995, 3)]]
@@ -0,0 +1,80 @@
+import glob
+import os
+import pandas as pd
+import pytest
+from EliteAnalytics.backend import xg_model
+from EliteAnalytics.backend.xg import estimate_xg
+
+
+def _shots():
+    return pd.DataFrame({
+        "team_id": [1, 1, 2], "x": [108.0, 100.0, 115.0], "y": [40.0, 30.0, 38.0],
+        "is_goal": [True, False, False], "body_part": ["Right Foot", "Left Foot", "Header"],
+        "situation": ["Penalty", "Open Play", "Corner"], "zone": ["Inside Box", "Outside Box", "6-Yard Box"],
+        "big_chance": [False, False, True], "one_on_one": [False, False, False],
+    })
+
+
+def _geometric(df):
+    return estimate_xg(df["x"].to_numpy(), df["y"].to_numpy(), (df["situation"] == "Penalty").to_numpy(),
+                       df["big_chance"].to_numpy(), (df["body_part"] == "Header").to_numpy())
+
+
+def test_trained_model_is_opt_in(monkeypatch):
+    df = _shots()
+    monkeypatch.setattr(xg_model, "XG_MODEL", "geometric")
+    assert xg_model.active_model() is None
+    assert (xg_model.score_shots(df) == _geometric(df)).all()
+
+
+@pytest.mark.skipif(not xg_model._versions(), reason="no trained artifact")
+def test_latest_model_when_selected(monkeypatch):
+    df = _shots()
+    monkeypatch.setattr(xg_model, "XG_MODEL", "latest")
+    model = xg_model.active_model()
+    assert model["version"] == xg_model._versions()[-1]
+    assert (xg_model.score_shots(df) == xg_model.predict_xg(df, model)).all()
+    assert xg_model.score_shots(df)[0] == xg_model.PENALTY_XG
+
+
+def _caches(n):
+    return sorted(glob.glob(os.path.join(xg_model.CACHE_DIR, "match_*_cache.json")))[:n]
+
+
+def _store(paths):
+    for path in paths:
+        match_id = os.path.basename(path).split("_")[1]
+        xg_model.update_training(match_id, xg_model.attach_understat(xg_model.read_cache(path), path))
+
+
+def test_warm_start_refit_matches_full_fit():
+    paths = _caches(4)
+    if len(paths) < 4:
+        pytest.skip("needs cached matches")
+    model = xg_model.train(paths[:2])
+    _store(paths)
+
+    artifact, change = xg_model.refit(model)
+    df, y, _ = xg_model.training_set(paths)
+    cold = xg_model.fit_logistic(xg_model.design_matrix(df, model), y, model["l2"])
+    assert artifact["matches"] == 4
+    assert change > 0
+    assert max(abs(a - b) for a, b in zip(artifact["weights"], cold)) < 1e-6
+
+
+def test_refresh_saves_a_new_version_only_when_selected(tmp_path, monkeypatch):
+    paths = _caches(3)
+    if len(paths) < 3:
+        pytest.skip("needs cached matches")
+    models = str(tmp_path / "models")
+    xg_model.save_model(xg_model.train(paths[:1]), models)
+    _store(paths)
+
+    monkeypatch.setattr(xg_model, "XG_MODEL", "geometric")
+    assert xg_model.refresh(models_dir=models) is None
+    monkeypatch.setattr(xg_model, "XG_MODEL", "latest")
+    path = xg_model.refresh(models_dir=models)
+    assert path.endswith("xg_logit_v2.json")
+    assert xg_model.load_model(models_dir=models)["warm_start"] == 1
+    # Nothing new since, so the refit has converged and is not saved again
+    assert xg_model.refresh(models_dir=models) is None
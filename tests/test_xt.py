@@ -0,0 +1,28 @@
+import numpy as np
+from EliteAnalytics.backend import xt
+
+
+def test_surface_change_is_relative():
+    counts = {"moves": np.array([10.0, 5.0, 1.0, 0.0])}
+    old = np.array([0.01, 0.02, 0.10, 0.30])
+    new = old * 1.04
+    assert abs(xt.surface_change(counts, old, new) - 0.04 / 1.04) < 1e-9
+    # Same relative drift at a different scale
+    assert abs(xt.surface_change(counts, old * 10, new * 10) - xt.surface_change(counts, old, new)) < 1e-9
+    assert xt.surface_change(counts, old, old) == 0.0
+
+
+def test_refresh_skips_rescore_within_tolerance(db_engine, monkeypatch):
+    from sqlalchemy.orm import Session
+    from EliteAnalytics.backend import pipeline
+
+    pipeline.ingest(["1913888"], bind=db_engine)
+    rescored = []
+    monkeypatch.setattr(xt, "rescore", lambda session, surface, match_ids=None: rescored.append(1))
+    session = Session(bind=db_engine)
+    try:
+        # Nothing new to count: the surface is unchanged
+        assert xt.refresh(session, [1913888]) is False
+        assert rescored == []
+    finally:
+        session.close()